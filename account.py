@@ -0,0 +1,116 @@
+import threading
+
+
+class AccountBook:
+    """계좌별 보유 종목/주문/손익 관리 클래스"""
+
+    def __init__(self, accno):
+        self.accno = accno
+        self.positions = {}  # 종목코드 -> 보유 정보
+        self.orders = {}  # 주문번호 -> 주문 정보
+        self.total_investment = 0
+        self.available_funds = 0
+        self.listeners = []  # 변경 통지 함수 목록 (listener(kind, key, old, new), 등록/해제 시 목록을 새로 만들어 교체)
+        self._lock = threading.RLock()
+
+    def add_listener(self, listener):
+        """보유 종목/주문 변경 통지 등록 (kind: "position" 또는 "order", 삭제 시 new는 None)"""
+        with self._lock:
+            self.listeners = self.listeners + [listener]
+
+    def remove_listener(self, listener):
+        """변경 통지 해제 (등록되지 않았으면 무시, 통지 중 해제해도 진행 중인 통지에는 영향 없음)"""
+        with self._lock:
+            if listener in self.listeners:
+                listeners = list(self.listeners)
+                listeners.remove(listener)
+                self.listeners = listeners
+
+    def snapshot(self, listener=None):
+        """보유 종목/주문 사본 (positions, orders), listener를 주면 같은 잠금 안에서 변경 통지 등록"""
+        with self._lock:
+            if listener:
+                self.listeners = self.listeners + [listener]
+            return {code: dict(p) for code, p in self.positions.items()}, {no: dict(o) for no, o in self.orders.items()}
+
+    def _notify(self, kind, key, old, new):
+        for listener in self.listeners:
+            listener(kind, key, old, new)
+
+    def update_holdings(self, holdings, total_investment=None):
+        """opw00018 조회 결과로 보유 종목 전체 갱신"""
+        with self._lock:
+            old_positions = self.positions
+            positions = {}
+            for h in holdings:
+                prev = old_positions.get(h["code"], {})
+                positions[h["code"]] = dict(h, realized_pnl=prev.get("realized_pnl", 0))
+            # 전량 매도된 종목의 당일 실현손익은 유지
+            for code, prev in old_positions.items():
+                if code not in positions and prev.get("realized_pnl"):
+                    positions[code] = dict(prev, quantity=0)
+            self.positions = positions
+            if total_investment is not None:
+                self.total_investment = total_investment
+
+            for code in set(old_positions) | set(positions):
+                old, new = old_positions.get(code), positions.get(code)
+                if old != new:
+                    self._notify("position", code, old, new and dict(new))
+
+    def update_position(self, code, **fields):
+        """체결잔고(잔고통보)로 종목 보유 정보 갱신"""
+        with self._lock:
+            old = self.positions.get(code)
+            old = dict(old) if old else None
+            position = self.positions.setdefault(code, {
+                "code": code,
+                "name": "",
+                "quantity": 0,
+                "purchase_price": 0,
+                "current_price": 0,
+                "realized_pnl": 0,
+            })
+            position.update(fields)
+            if position["quantity"] <= 0 and not position["realized_pnl"]:
+                del self.positions[code]
+                position = None
+            self._notify("position", code, old, position and dict(position))
+
+    def update_order(self, order_no, **fields):
+        """주문 접수/체결 정보 갱신"""
+        with self._lock:
+            old = self.orders.get(order_no)
+            old = dict(old) if old else None
+            order = self.orders.setdefault(order_no, {"order_no": order_no})
+            order.update(fields)
+            self._notify("order", order_no, old, dict(order))
+            return order
+
+    def get_holdings(self):
+        """보유 수량이 있는 종목 목록"""
+        with self._lock:
+            return [dict(p) for p in self.positions.values() if p["quantity"] > 0]
+
+    def get_open_orders(self):
+        """미체결 주문 목록"""
+        with self._lock:
+            return [dict(o) for o in self.orders.values() if o.get("unfilled", 0) > 0]
+
+    def get_pnl(self):
+        """계좌 손익 요약"""
+        with self._lock:
+            purchase = evaluation = realized = 0
+            for p in self.positions.values():
+                purchase += p["purchase_price"] * p["quantity"]
+                evaluation += p["current_price"] * p["quantity"]
+                realized += p.get("realized_pnl", 0)
+            unrealized = evaluation - purchase
+            return {
+                "accno": self.accno,
+                "purchase_amount": purchase,
+                "evaluation_amount": evaluation,
+                "unrealized_pnl": unrealized,
+                "realized_pnl": realized,
+                "return_rate": round(unrealized / purchase * 100, 2) if purchase else 0.0,
+            }
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""키움 OCX 시뮬레이터 기반 성능 측정 (브로커 연결 불필요)
+
+사용법:
+    python benchmark.py --output benchmark_results.json
+    python benchmark.py --compare benchmark_results.json
+"""
+
+import sys
+import json
+import time
+import logging
+import argparse
+import platform
+import subprocess
+from config import Config
+from logger import logger
+from metrics import LatencyHistogram
+from simulator import SimulatedOCX
+
+ACCNO = "0000000000"
+ROW_COUNTS = (10, 100, 1000, 10000)
+
+
+def make_rows(trcode, count):
+    """TR 반복 데이터 생성 (실제 OCX와 같은 0 채움/부호 형식)"""
+    rows = []
+    for i in range(count):
+        code = f"{i:06d}"
+        price = 1000 + i
+        if trcode == "opw00018":
+            rows.append({
+                "종목번호": f"A{code}",
+                "종목명": f"종목{i}",
+                "보유수량": f"{10 + i % 100:015d}",
+                "매입가": f"{price:015d}",
+                "현재가": f"{price + i % 50:015d}",
+            })
+        elif trcode == "OPT10030":
+            rows.append({
+                "종목코드": code,
+                "종목명": f"종목{i}",
+                "거래량": f"{100000 + i}",
+                "거래금액": f"{5000 + i}",
+                "현재가": f"-{price}",
+            })
+        elif trcode == "OPT10023":
+            rows.append({
+                "종목코드": code,
+                "종목명": f"종목{i}",
+                "이전거래량": f"{50000 + i}",
+                "현재거래량": f"{150000 + i}",
+                "등락률": "+3.25",
+                "현재가": f"+{price}",
+            })
+    return rows
+
+
+def make_tick(i):
+    """주식체결 실시간 FID 데이터 생성"""
+    price = 70000 + (i % 20) * 100
+    return {
+        20: f"{90000 + i % 60000:06d}",  # 체결시간
+        10: f"+{price}",  # 현재가
+        15: f"+{1 + i % 100}",  # 거래량
+        13: f"{1000000 + i}",  # 누적거래량
+        27: f"+{price + 100}",  # (최우선)매도호가
+        28: f"+{price}",  # (최우선)매수호가
+    }
+
+
+def make_hoga(i):
+    """주식호가잔량 실시간 FID 데이터 생성"""
+    fields = {21: f"{90000 + i % 60000:06d}", 121: f"{50000 + i}", 125: f"{60000 + i}"}
+    for level in range(10):
+        fields[41 + level] = f"+{70100 + level * 100}"  # 매도호가
+        fields[51 + level] = f"-{70000 - level * 100}"  # 매수호가
+        fields[61 + level] = f"{1000 + i % 500 + level}"  # 매도호가수량
+        fields[71 + level] = f"{1200 + i % 300 + level}"  # 매수호가수량
+    return fields
+
+
+class Benchmark:
+    """성능 측정 실행 클래스"""
+
+    def __init__(self, min_time=0.5):
+        self.min_time = min_time
+        self.results = []
+
+    def _new_session(self, latency_ms=0):
+        """시뮬레이터 기반 API/거래 인스턴스 생성"""
+        from kiwoom_api import KiwoomAPI
+        from trading import Trading
+
+        ocx = SimulatedOCX(latency_ms=latency_ms, login_info={"ACCLIST": f"{ACCNO};"})
+        api = KiwoomAPI(ocx=ocx)
+        # 요청 제한은 측정 대상이 아니므로 해제
+        api.tr_limiter.max_calls = 10 ** 9
+        api.order_limiter.max_calls = 10 ** 9
+        api.connect()
+        trading = Trading(api, ACCNO)
+        # 반복 주문으로 미체결 금액이 누적되므로 노출 한도 해제
+        trading.risk.max_position_size = trading.risk.max_total_exposure = 0
+        return api, trading
+
+    def _repeat(self, func):
+        """최소 측정 시간 동안 반복 실행 (반복 횟수, 총 소요시간 반환)"""
+        iterations = 0
+        start = time.perf_counter()
+        while True:
+            func()
+            iterations += 1
+            elapsed = time.perf_counter() - start
+            if elapsed >= self.min_time and iterations >= 3:
+                return iterations, elapsed
+
+    def record(self, name, value, unit, **params):
+        self.results.append({"name": name, "params": params, "value": value, "unit": unit})
+        param_text = " ".join(f"{k}={v}" for k, v in params.items())
+        print(f"{name:<24} {param_text:<28} {value:>16,.2f} {unit}")
+
+    def bench_tr_parsing(self, row_counts=ROW_COUNTS):
+        """TR 수신 데이터 파싱 처리량"""
+        api, trading = self._new_session()
+        requests = {
+            "opw00018": "opw00018_req",
+            "OPT10030": "volume_rank_req",
+            "OPT10023": "upsurge_volume_rank_req",
+        }
+        for trcode, rqname in requests.items():
+            for rows in row_counts:
+                api.ocx.tr_rows[trcode] = make_rows(trcode, rows)
+                api.ocx.tr_single[trcode] = {"총매입금액": "000000012345678"}
+                full_rqname = trading._rqname(rqname)
+                api.ocx._responses.pop(full_rqname, None)
+
+                def parse():
+                    trading._on_receive_tr_data("2000", full_rqname, trcode, "", "0", 0, "", "", "")
+
+                iterations, elapsed = self._repeat(parse)
+                self.record("tr_parse", iterations * rows / elapsed, "rows/s", trcode=trcode, rows=rows)
+
+    def bench_real_ticks(self, count=50000):
+        """실시간 체결 데이터 처리량 (운영과 같이 PnLEngine 주식체결 처리기 등록, 전 종목 보유)"""
+        from pnl import PnLEngine
+
+        api, trading = self._new_session()
+        ticks = [make_tick(i) for i in range(1000)]
+        codes = [f"{i:06d}" for i in range(100)]
+        trading.book.update_holdings(
+            [{"code": code, "name": code, "quantity": 10, "purchase_price": 70000, "current_price": 70000} for code in codes], 0
+        )
+        pnl = PnLEngine(api)
+        pnl.start()
+
+        try:
+            start = time.perf_counter()
+            for i in range(count):
+                api.ocx.emit_real(codes[i % len(codes)], "주식체결", ticks[i % len(ticks)])
+            elapsed = time.perf_counter() - start
+        finally:
+            pnl.stop()
+        self.record("real_tick", count / elapsed, "ticks/s", codes=len(codes))
+
+    def bench_orderbook(self, count=20000):
+        """실시간 호가잔량 처리량 (10단계 호가 갱신 + 파생값 계산)"""
+        api, trading = self._new_session()
+        updates = [make_hoga(i) for i in range(100)]
+        codes = [f"{i:06d}" for i in range(100)]
+
+        start = time.perf_counter()
+        for i in range(count):
+            api.ocx.emit_real(codes[i % len(codes)], "주식호가잔량", updates[i % len(updates)])
+        elapsed = time.perf_counter() - start
+        self.record("orderbook_update", count / elapsed, "updates/s", codes=len(codes))
+
+        book = api.order_books.get(codes[0])
+        iterations, elapsed = self._repeat(book.snapshot)
+        self.record("orderbook_snapshot", iterations / elapsed, "reads/s")
+
+    def bench_order_round_trip(self, count=200):
+        """주문 전송 -> 접수 결과 수신 지연시간"""
+        api, trading = self._new_session()
+        histogram = LatencyHistogram()
+        for i in range(count):
+            start = time.perf_counter()
+            trading.buy_stock("005930", 1, 70000, "지정가")
+            histogram.record(time.perf_counter() - start)
+
+        summary = histogram.summary()
+        for key in ("p50", "p99", "max"):
+            self.record("order_round_trip", summary[key] * 1_000_000, "us", stat=key)
+
+    def bench_risk_check(self, positions=500):
+        """주문 전 리스크 검사 지연시간 (보유 종목 수 positions)"""
+        api, trading = self._new_session()
+        codes = [f"{i:06d}" for i in range(positions)]
+        trading.book.update_holdings([
+            {"code": code, "name": code, "quantity": 10, "purchase_price": 10000, "current_price": 10000}
+            for code in codes
+        ])
+        for code in codes:
+            api.price_limits.set_reference_price(code, 10000)
+        risk = trading.risk
+        orders = [(1 + i % 2, codes[i % positions], 1, 10000) for i in range(1000)]
+
+        def check_batch():
+            for order in orders:
+                risk.check(*order)
+
+        iterations, elapsed = self._repeat(check_batch)
+        self.record("risk_check", elapsed / (iterations * len(orders)) * 1_000_000_000, "ns", positions=positions)
+
+    def bench_universe_filter(self, count=2500):
+        """종목 속성 인덱스 필터링 지연시간 (종목 수 count)"""
+        api, trading = self._new_session()
+        for i in range(count):
+            api.ocx.master[f"{i:05d}{i % 7 == 0 and 5 or 0}"] = {
+                "name": f"종목{i}" if i % 50 else f"스팩{i}",
+                "market": "0" if i % 2 else "10",
+                "last_price": 500 + i * 97 % 200000,
+                "listed_count": 1000000 + i,
+                "state": "증거금40%|관리종목" if i % 40 == 0 else "증거금20%",
+                "construction": "정상" if i % 30 else "투자주의",
+            }
+        universe = api.universe
+        universe.path = ""
+        universe.refresh(api)
+
+        def screen():
+            mask = universe.is_kospi & universe.tradable() & ~universe.is_preferred & ~universe.is_spac
+            return universe.select(mask & (universe.last_price >= 5000) & (universe.market_cap >= 10 ** 10))
+
+        iterations, elapsed = self._repeat(screen)
+        self.record("universe_filter", elapsed / iterations * 1_000_000, "us", codes=len(universe))
+
+    def bench_startup(self, holdings=20, latency_ms=50):
+        """KiwoomTradingApp 생성부터 초기화/로그인/첫 계좌 조회 완료까지 소요시간 (TR 응답 지연 latency_ms 재현, 이벤트 루프 진입 전까지)"""
+        import main
+        import kiwoom_api
+
+        KiwoomAPI = kiwoom_api.KiwoomAPI
+
+        def api_factory():
+            ocx = SimulatedOCX(latency_ms=latency_ms, login_info={"ACCLIST": f"{ACCNO};"})
+            ocx.tr_rows["opw00018"] = make_rows("opw00018", holdings)
+            ocx.tr_single["opw00018"] = {"총매입금액": "000000012345678"}
+            ocx.tr_single["opw00001"] = {"주문가능금액": "000000050000000"}
+            return KiwoomAPI(ocx=ocx)
+
+        original_accounts = Config.ACCOUNTS
+        kiwoom_api.KiwoomAPI, Config.ACCOUNTS = api_factory, [ACCNO]
+        try:
+            start = time.perf_counter()
+            app = main.KiwoomTradingApp()
+            app.initialize()
+            app.connect()
+            elapsed = time.perf_counter() - start
+        finally:
+            kiwoom_api.KiwoomAPI, Config.ACCOUNTS = KiwoomAPI, original_accounts
+        self.record("startup", elapsed * 1000, "ms", holdings=holdings, latency_ms=latency_ms)
+
+    def run_all(self):
+        self.bench_tr_parsing()
+        self.bench_real_ticks()
+        self.bench_orderbook()
+        self.bench_order_round_trip()
+        self.bench_risk_check()
+        self.bench_universe_filter()
+        self.bench_startup()
+
+
+def _git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except Exception:
+        return ""
+
+
+def compare(results, baseline_path):
+    """이전 결과 대비 변화율 출력"""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    previous = {(r["name"], json.dumps(r["params"], sort_keys=True)): r["value"] for r in baseline["results"]}
+    print(f"\n기준 결과 대비 ({baseline.get('revision', '')}):")
+    for r in results:
+        before = previous.get((r["name"], json.dumps(r["params"], sort_keys=True)))
+        if before:
+            change = (r["value"] - before) / before * 100
+            print(f"{r['name']:<24} {json.dumps(r['params'], ensure_ascii=False):<40} {change:+8.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="키움 API 시뮬레이터 성능 측정")
+    parser.add_argument("--output", default="benchmark_results.json", help="결과 저장 파일 (JSON)")
+    parser.add_argument("--compare", help="비교할 이전 결과 파일 (JSON)")
+    parser.add_argument("--min-time", type=float, default=0.5, help="측정 항목별 최소 반복 시간 (초)")
+    args = parser.parse_args()
+
+    # 측정 중 로그 출력 최소화
+    logger.logger.setLevel(logging.WARNING)
+
+    benchmark = Benchmark(min_time=args.min_time)
+    benchmark.run_all()
+
+    output = {
+        "version": Config.API_VERSION,
+        "revision": _git_revision(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": benchmark.results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(output, f, ensure_ascii=False, indent=2)
+    print(f"\n결과 저장: {args.output}")
+
+    if args.compare:
+        compare(benchmark.results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -15,6 +15,8 @@ class Config:
     # 계좌 정보
     ACCNO = os.getenv('ACCNO', '8105608311')
     ACCNO_PASSWORD = os.getenv('ACCNO_PASSWORD', '0000')
+    # 다중 계좌 (콤마 구분, 미설정 시 ACCNO 단일 계좌)
+    ACCOUNTS = [a.strip() for a in os.getenv('ACCOUNTS', '').split(',') if a.strip()] or [ACCNO]
 
     # 거래 설정
     TRADE_MODE = os.getenv('TRADE_MODE', 'SIMULATION')  # REAL 또는 SIMULATION
@@ -22,6 +24,17 @@ class Config:
     STOP_LOSS_RATE = float(os.getenv('STOP_LOSS_RATE', 0.02))
     TAKE_PROFIT_RATE = float(os.getenv('TAKE_PROFIT_RATE', 0.05))
     
+    # 손익 계산 설정
+    FEE_RATE = float(os.getenv('FEE_RATE', 0.00015))  # 매매 수수료율
+    SELL_TAX_RATE = float(os.getenv('SELL_TAX_RATE', 0.002))  # 매도 시 거래세율 (농특세 포함)
+    PNL_SNAPSHOT_INTERVAL = float(os.getenv('PNL_SNAPSHOT_INTERVAL', 1.0))  # 손익 스냅샷 주기 (초)
+    
+    # 주문 전 리스크 검사 설정
+    RISK_CHECK_ENABLED = os.getenv('RISK_CHECK_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    MAX_TOTAL_EXPOSURE = int(os.getenv('MAX_TOTAL_EXPOSURE', 0))  # 계좌 총 노출 한도 (0이면 제한 없음)
+    MAX_DAILY_LOSS = int(os.getenv('MAX_DAILY_LOSS', 0))  # 일일 실현손실 한도 (0이면 제한 없음)
+    PRICE_LIMIT_RATE = float(os.getenv('PRICE_LIMIT_RATE', 0.30))  # 가격제한폭 (기준가 대비)
+    
     # 로깅 설정
     LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
     LOG_FILE = os.getenv('LOG_FILE', 'kiwoom_trading.log')
@@ -29,11 +42,72 @@ class Config:
     # API 설정
     API_VERSION = "0.1"
     CONNECT_TIMEOUT = 60  # 연결 타임아웃 (초)
+    TR_TIMEOUT = int(os.getenv('TR_TIMEOUT', 10))  # TR/주문 응답 타임아웃 (초)
+    TR_RATE_LIMIT = int(os.getenv('TR_RATE_LIMIT', 5))  # 초당 TR 요청 횟수 제한
+    ORDER_RATE_LIMIT = int(os.getenv('ORDER_RATE_LIMIT', 5))  # 초당 주문 횟수 제한
+    
+    # 시작 설정
+    FAST_START = os.getenv('FAST_START', 'false').lower() in ('1', 'true', 'yes')  # 빠른 시작 모드
+    MASTER_CACHE_FILE = os.getenv('MASTER_CACHE_FILE', 'master_cache.json')  # 종목 마스터 캐시 파일
+    UNIVERSE_CACHE_FILE = os.getenv('UNIVERSE_CACHE_FILE', 'universe_cache.npz')  # 종목 속성 인덱스 캐시 파일
+    MASTER_REFRESH_CHUNK = int(os.getenv('MASTER_REFRESH_CHUNK', 200))  # 마스터/인덱스 갱신 시 이벤트 루프 한 번에 조회할 종목 수
+    
+    # 연결 감시 설정
+    WATCHDOG_INTERVAL = int(os.getenv('WATCHDOG_INTERVAL', 5))  # 연결 상태 확인 주기 (초)
+    HEARTBEAT_TIMEOUT = int(os.getenv('HEARTBEAT_TIMEOUT', 60))  # 장중 이벤트 미수신 허용 시간 (초)
+    RECONNECT_MAX_BACKOFF = int(os.getenv('RECONNECT_MAX_BACKOFF', 60))  # 재연결 최대 대기 (초)
+    
+    # 지표(지연시간 계측) 설정
+    METRICS_PORT = int(os.getenv('METRICS_PORT', 0))  # 0이면 HTTP 엔드포인트 사용 안 함
+    METRICS_SNAPSHOT_FILE = os.getenv('METRICS_SNAPSHOT_FILE', '')  # 비어있으면 스냅샷 저장 안 함
+    METRICS_SNAPSHOT_INTERVAL = int(os.getenv('METRICS_SNAPSHOT_INTERVAL', 10))  # 스냅샷 저장 주기 (초)
+    
+    # 실시간 등록 관리 설정
+    REAL_SUBSCRIPTION_CAPACITY = int(os.getenv('REAL_SUBSCRIPTION_CAPACITY', 1000))  # 실시간 등록 최대 종목 수
+    REAL_SUBSCRIPTION_FIDS = os.getenv('REAL_SUBSCRIPTION_FIDS', '10;11;13;15;20')  # 등록 FID (주식체결)
+    REAL_SUBSCRIPTION_SCREEN = int(os.getenv('REAL_SUBSCRIPTION_SCREEN', 6000))  # 시작 화면번호 (100종목마다 1개 사용)
+    REAL_HOGA_SUBSCRIPTION_CAPACITY = int(os.getenv('REAL_HOGA_SUBSCRIPTION_CAPACITY', 200))  # 호가 실시간 등록 최대 종목 수
+    REAL_HOGA_SUBSCRIPTION_SCREEN = int(os.getenv('REAL_HOGA_SUBSCRIPTION_SCREEN', 6100))  # 호가 시작 화면번호
+    
+    # 대체거래소(NXT) 설정
+    NXT_ENABLED = os.getenv('NXT_ENABLED', 'false').lower() in ('1', 'true', 'yes')  # KRX/NXT 통합 호가 사용
+    
+    # 프로파일링 설정
+    PROFILE_ENABLED = os.getenv('PROFILE_ENABLED', 'false').lower() in ('1', 'true', 'yes')  # 이벤트 루프 샘플링 프로파일링
+    PROFILE_INTERVAL_MS = float(os.getenv('PROFILE_INTERVAL_MS', 5))  # 샘플링 간격 (ms)
+    PROFILE_OUTPUT = os.getenv('PROFILE_OUTPUT', 'profile.collapsed')  # 접힌 스택 저장 파일
+    
+    # 다중 프로세스 설정
+    SHM_BOARD_NAME = os.getenv('SHM_BOARD_NAME', '')  # 공유 메모리 시세판 이름 (비어있으면 사용 안 함)
+    SHM_BOARD_CAPACITY = int(os.getenv('SHM_BOARD_CAPACITY', 4000))  # 시세판 종목 슬롯 수
+    ORDER_CHANNEL_PORT = int(os.getenv('ORDER_CHANNEL_PORT', 0))  # 전략 프로세스 주문 채널 포트 (0이면 사용 안 함)
+    ORDER_CHANNEL_AUTHKEY = os.getenv('ORDER_CHANNEL_AUTHKEY', '')  # 주문 채널 인증키 (비어있으면 주문 채널 시작 안 함)
+    
+    # 틱 저장 설정
+    TICK_ARCHIVE_DIR = os.getenv('TICK_ARCHIVE_DIR', '')  # 실시간 체결 틱 저장 디렉터리 (비어있으면 사용 안 함)
+    TICK_ARCHIVE_BLOCK_SIZE = int(os.getenv('TICK_ARCHIVE_BLOCK_SIZE', 4096))  # 종목별 블록당 틱 수
+    TICK_ARCHIVE_FLUSH_INTERVAL = float(os.getenv('TICK_ARCHIVE_FLUSH_INTERVAL', 60))  # 버퍼의 틱을 파일에 내보내는 주기(초)
+    
+    # 조회/제어 API 설정
+    CONTROL_API_PORT = int(os.getenv('CONTROL_API_PORT', 0))  # 0이면 사용 안 함
+    CONTROL_API_HOST = os.getenv('CONTROL_API_HOST', '127.0.0.1')
+    CONTROL_API_TOKEN = os.getenv('CONTROL_API_TOKEN', '')  # 주문 등록 인증 토큰 (비어있으면 주문 등록 불가)
+    
+    # 운영 화면 설정
+    DASHBOARD_PORT = int(os.getenv('DASHBOARD_PORT', 0))  # 0이면 사용 안 함
+    DASHBOARD_HOST = os.getenv('DASHBOARD_HOST', '127.0.0.1')
+    DASHBOARD_FPS = float(os.getenv('DASHBOARD_FPS', 5))  # 초당 최대 갱신 횟수
+    DASHBOARD_CLIENT_BUFFER = int(os.getenv('DASHBOARD_CLIENT_BUFFER', 64))  # 접속별 대기 변경분 수 (초과 시 전체 재전송)
     
     # 거래 시간 설정
     MARKET_OPEN_TIME = "09:00"
     MARKET_CLOSE_TIME = "15:30"
     
+    @classmethod
+    def get_account_password(cls, accno):
+        """계좌별 비밀번호 조회 (ACCNO_PASSWORD_<계좌번호>, 없으면 ACCNO_PASSWORD)"""
+        return os.getenv(f'ACCNO_PASSWORD_{accno}', cls.ACCNO_PASSWORD)
+    
     @classmethod
     def is_simulation_mode(cls):
         """시뮬레이션 모드인지 확인"""
@@ -0,0 +1,115 @@
+import time
+from datetime import datetime
+from PyQt5.QtCore import QTimer
+from logger import logger
+from config import Config
+from metrics import metrics
+
+
+class ConnectionWatchdog:
+    """연결 감시 클래스 (연결 상태/이벤트 수신 감시, 백오프 재연결 및 상태 재동기화)"""
+
+    def __init__(self, kiwoom_api, interval=None, heartbeat_timeout=None, max_backoff=None):
+        self.api = kiwoom_api
+        self.interval = interval or Config.WATCHDOG_INTERVAL
+        self.heartbeat_timeout = heartbeat_timeout or Config.HEARTBEAT_TIMEOUT
+        self.max_backoff = max_backoff or Config.RECONNECT_MAX_BACKOFF
+        self.reconnecting = False
+        self.attempts = 0
+        self.disconnected_at = None
+
+        self.timer = QTimer()
+        self.timer.timeout.connect(self._check)
+        self.reconnect_timer = QTimer()
+        self.reconnect_timer.setSingleShot(True)
+        self.reconnect_timer.timeout.connect(self._reconnect)
+
+    def start(self):
+        """감시 시작"""
+        self.timer.start(self.interval * 1000)
+        logger.info(f"연결 감시 시작 (주기: {self.interval}초)")
+
+    def stop(self):
+        """감시 중지"""
+        self.timer.stop()
+        self.reconnect_timer.stop()
+
+    def _is_market_hours(self):
+        now = datetime.now().strftime("%H:%M")
+        return Config.MARKET_OPEN_TIME <= now <= Config.MARKET_CLOSE_TIME
+
+    def _check(self):
+        """연결 상태 확인 (타이머 호출)"""
+        if self.reconnecting:
+            return
+        try:
+            if self.api.get_connect_state() != 1 or not self.api.connected:
+                self._on_disconnected("연결 끊김 감지")
+                return
+
+            # 장중 실시간 데이터가 일정 시간 수신되지 않으면 TR로 서버 응답 확인
+            idle = time.time() - self.api.last_event_time
+            if self.api.real_registrations and self._is_market_hours() and idle > self.heartbeat_timeout:
+                logger.warning(f"{idle:.0f}초간 이벤트 미수신, 서버 응답 확인 중...")
+                if not self._heartbeat():
+                    self._on_disconnected("서버 응답 없음")
+
+        except Exception as e:
+            logger.log_error("WATCHDOG", str(e))
+
+    def _heartbeat(self):
+        """TR 왕복으로 서버 응답 확인"""
+        if not self.api.tradings:
+            return True
+        trading = self.api.tradings[0]
+        trading.tr_data.pop("opw00001", None)
+        trading.get_available_funds()
+        return "opw00001" in trading.tr_data
+
+    def _on_disconnected(self, reason):
+        """연결 끊김 처리 (재연결 예약)"""
+        self.api.connected = False
+        self.reconnecting = True
+        self.disconnected_at = time.time()
+        metrics.inc("disconnects_total")
+        logger.log_connection("LOST", reason)
+        self._schedule_reconnect()
+
+    def _schedule_reconnect(self):
+        delay = min(2 ** self.attempts, self.max_backoff)
+        logger.info(f"{delay}초 후 재연결 시도 ({self.attempts + 1}회차)")
+        self.reconnect_timer.start(delay * 1000)
+
+    def _reconnect(self):
+        """재연결 및 상태 재동기화"""
+        self.attempts += 1
+        try:
+            # 재동기화만 실패한 경우 연결이 유지되어 있으면 로그인은 다시 하지 않음
+            if not (self.api.connected and self.api.get_connect_state() == 1):
+                if not self.api.reconnect():
+                    self._schedule_reconnect()
+                    return
+
+            # 계좌별로 한 번씩 보유 종목/미체결 주문 재동기화
+            synced = set()
+            failed = []
+            for trading in self.api.tradings:
+                if trading.accno not in synced:
+                    if not trading.resync():
+                        failed.append(trading.accno)
+                    synced.add(trading.accno)
+            if failed:
+                logger.log_error("RECONNECT", f"재동기화 실패 계좌: {', '.join(failed)}")
+                self._schedule_reconnect()
+                return
+
+            downtime = time.time() - self.disconnected_at
+            metrics.observe("reconnect_seconds", downtime)
+            logger.log_connection("RESTORED", f"재연결 완료 ({downtime:.1f}초, {self.attempts}회 시도)")
+            self.attempts = 0
+            self.reconnecting = False
+            self.api.last_event_time = time.time()
+
+        except Exception as e:
+            logger.log_error("RECONNECT", str(e))
+            self._schedule_reconnect()
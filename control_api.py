@@ -0,0 +1,223 @@
+import hmac
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from logger import logger
+from config import Config
+from venue import VENUE_SUFFIX
+
+ORDER_FIELDS = ("side", "code", "quantity")
+
+
+class ControlServer:
+    """조회/제어용 로컬 HTTP 서버 (Qt 이벤트 루프와 별도 스레드, 메모리 캐시에서 응답하여 TR 사용 없음)
+
+    GET  /accounts                     계좌별 주문 가능 금액/총 투자금액/손익
+    GET  /holdings?accno=              보유 종목
+    GET  /funds?accno=                 주문 가능 금액, 총 투자금액
+    GET  /orders?accno=                미체결 주문
+    GET  /quotes?codes=005930,000660   마지막 복수종목 시세 + 실시간 최우선호가
+    GET  /scanner                      거래량 순위, 거래량 급증, 조건검색 결과
+    GET  /risk?accno=                  리스크 집계
+    GET  /pnl                          실시간 손익 스냅샷 (종목별/계좌별/전체)
+    POST /orders                       주문 등록 ({"accno", "side", "code", "quantity", "price", "order_type", "venue"} 또는 목록)
+
+    주문 등록은 CONTROL_API_TOKEN이 설정된 경우에만 허용하며, "Authorization: Bearer <토큰>"과
+    "Content-Type: application/json"이 필요합니다. 다른 출처(Origin)의 브라우저 요청은 모두 거부합니다.
+    """
+
+    def __init__(self, kiwoom_api, pnl_engine=None, port=None, host=None, token=None):
+        self.api = kiwoom_api
+        self.pnl_engine = pnl_engine
+        self.port = port or Config.CONTROL_API_PORT
+        self.host = host or Config.CONTROL_API_HOST
+        self.token = token if token is not None else Config.CONTROL_API_TOKEN
+        self._server = None
+
+    def start(self):
+        """서버 시작"""
+        try:
+            self._server = ThreadingHTTPServer((self.host, self.port), _ControlHandler)
+            self._server.daemon_threads = True
+            self._server.control = self
+            threading.Thread(target=self._server.serve_forever, name="control-http", daemon=True).start()
+            logger.info(f"조회/제어 API 시작: http://{self.host}:{self.port}/")
+            if not self.token:
+                logger.warning("CONTROL_API_TOKEN이 설정되지 않아 주문 등록(POST /orders)을 허용하지 않습니다.")
+            return True
+        except Exception as e:
+            logger.log_error("CONTROL_SERVER", str(e))
+            return False
+
+    def authorize(self, headers):
+        """주문 요청 인증 (허용 시 None, 거부 시 (상태코드, 사유))"""
+        if not self.token:
+            return 403, "주문 등록이 비활성화되어 있습니다. (CONTROL_API_TOKEN 미설정)"
+        scheme, _, token = headers.get("Authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not hmac.compare_digest(token.strip().encode(), self.token.encode()):
+            return 401, "인증 실패"
+        if headers.get("Content-Type", "").split(";")[0].strip().lower() != "application/json":
+            return 415, "Content-Type은 application/json이어야 합니다."
+        return None
+
+    def allowed_origin(self, headers):
+        """브라우저 출처 확인 (Origin이 없거나 이 서버 주소면 허용)"""
+        origin = headers.get("Origin")
+        if not origin:
+            return True
+        return origin in (f"http://{self.host}:{self.port}", f"http://localhost:{self.port}", f"http://127.0.0.1:{self.port}")
+
+    def stop(self):
+        """서버 종료"""
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def _trading(self, accno=None):
+        """계좌번호의 거래 인스턴스 (없으면 첫 인스턴스)"""
+        for trading in self.api.tradings:
+            if not accno or trading.accno == accno:
+                return trading
+        raise KeyError(f"등록되지 않은 계좌: {accno}")
+
+    # 조회
+    def accounts(self, query):
+        return [
+            {
+                "accno": accno,
+                "available_funds": book.available_funds,
+                "total_investment": book.total_investment,
+                **book.get_pnl(),
+            }
+            for accno, book in self.api.account_books.items()
+        ]
+
+    def holdings(self, query):
+        return self._trading(query.get("accno")).book.get_holdings()
+
+    def funds(self, query):
+        book = self._trading(query.get("accno")).book
+        return {"accno": book.accno, "available_funds": book.available_funds, "total_investment": book.total_investment}
+
+    def orders(self, query):
+        return self._trading(query.get("accno")).book.get_open_orders()
+
+    def quotes(self, query):
+        codes = [c for c in query.get("codes", "").split(",") if c]
+        snapshot = self._trading(query.get("accno")).last_quotes
+        quotes = {}
+        for code in codes or (snapshot.codes if snapshot else []):
+            quote = (snapshot.get(code) if snapshot else None) or {"code": code}
+            book = self.api.order_books.snapshot(code)
+            if book is not None:
+                quote.update(ask=book.best_ask, bid=book.best_bid, hoga_time=book.hoga_time)
+            quotes[code] = quote
+        if snapshot:
+            return {"timestamp": snapshot.timestamp, "quotes": quotes}
+        return {"timestamp": None, "quotes": quotes}
+
+    def scanner(self, query):
+        tr_data = self._trading(query.get("accno")).tr_data
+        return {
+            "volume_rank": tr_data.get("OPT10030", {}).get("stocks", []),
+            "upsurge_volume": tr_data.get("OPT10023", {}).get("upsurge_stocks", []),
+            "conditions": self.api.condition_snapshot,
+        }
+
+    def risk(self, query):
+        return self._trading(query.get("accno")).risk.summary()
+
+    def pnl(self, query):
+        if self.pnl_engine is None:
+            raise ValueError("실시간 손익 계산이 실행 중이 아닙니다.")
+        return self.pnl_engine.last_snapshot or {"total": self.pnl_engine.totals()}
+
+    # 주문
+    def submit_orders(self, body):
+        """주문 등록 (계좌별 OrderQueue에 한 배치로 등록, 전송은 Qt 이벤트 루프에서 진행)"""
+        requests = body if isinstance(body, list) else [body]
+        batches = {}
+        for request in requests:
+            if not isinstance(request, dict):
+                raise ValueError(f"잘못된 주문 요청: {request}")
+            missing = [field for field in ORDER_FIELDS if field not in request]
+            if missing or request["side"] not in ("buy", "sell"):
+                raise ValueError(f"잘못된 주문 요청: {request}")
+            venue = request.get("venue") or ""
+            if venue and venue not in VENUE_SUFFIX:
+                raise ValueError(f"지원하지 않는 시장: {venue}")
+            trading = self._trading(request.get("accno"))
+            batches.setdefault(trading.accno, (trading, []))[1].append({
+                "side": request["side"],
+                "code": request["code"],
+                "quantity": int(request["quantity"]),
+                "price": int(request.get("price", 0)),
+                "order_type": request.get("order_type", "시장가"),
+                "venue": venue,
+            })
+        queued = {}
+        for accno, (trading, orders) in batches.items():
+            trading.order_queue.submit(orders)
+            queued[accno] = len(orders)
+        return {"queued": queued}
+
+
+class _ControlHandler(BaseHTTPRequestHandler):
+    """조회/제어 HTTP 요청 처리"""
+
+    ROUTES = ("accounts", "holdings", "funds", "orders", "quotes", "scanner", "risk", "pnl")
+
+    def do_GET(self):
+        if not self.server.control.allowed_origin(self.headers):
+            self._send(403, {"error": "허용되지 않은 출처"})
+            return
+        url = urlparse(self.path)
+        route = url.path.strip("/")
+        if route not in self.ROUTES:
+            self._send(404, {"error": f"알 수 없는 경로: {url.path}"})
+            return
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        self._handle(lambda: getattr(self.server.control, route)(query))
+
+    def do_POST(self):
+        if urlparse(self.path).path.strip("/") != "orders":
+            self._send(404, {"error": f"알 수 없는 경로: {self.path}"})
+            return
+        control = self.server.control
+        if not control.allowed_origin(self.headers):
+            self._send(403, {"error": "허용되지 않은 출처"})
+            return
+        denied = control.authorize(self.headers)
+        if denied:
+            self._send(denied[0], {"error": denied[1]})
+            return
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError as e:
+            self._send(400, {"error": str(e)})
+            return
+        self._handle(lambda: self.server.control.submit_orders(body), status=202)
+
+    def _handle(self, func, status=200):
+        try:
+            self._send(status, func())
+        except (KeyError, ValueError) as e:
+            self._send(400, {"error": str(e).strip("'")})
+        except Exception as e:
+            logger.log_error("CONTROL_API", str(e))
+            self._send(500, {"error": str(e)})
+
+    def _send(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """요청 로그 출력 안 함"""
+        pass
@@ -0,0 +1,372 @@
+import json
+import queue
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from PyQt5.QtCore import QTimer
+from logger import logger
+from config import Config
+from metrics import metrics
+
+POSITION_COLUMNS = ("accno", "code", "name", "quantity", "avg_price", "price", "unrealized", "return_rate")
+ORDER_COLUMNS = ("accno", "order_no", "code", "order_type", "quantity", "unfilled", "price", "state")
+VOLUME_RANK_COLUMNS = ("code", "name", "price", "vol", "amount")
+UPSURGE_COLUMNS = ("code", "name", "price", "pre_vol", "cur_vol", "fluctuation_rate")
+PNL_COLUMNS = ("value", "unrealized", "return_rate", "realized", "fees", "taxes", "total_pnl")
+_MISSING = object()
+
+
+class Dashboard:
+    """실시간 운영 화면 (로컬 웹 페이지, Server-Sent Events로 변경된 셀만 전송)
+
+    - 셀은 "구역|행|열" 키와 원시 값으로 관리하며, 표시 형식은 브라우저에서 처리합니다.
+    - 변경 통지를 받은 구역만 다시 모아 이전 셀과 비교하고, 최대 fps회/초로 변경분만 전송합니다.
+    - 새 접속에는 전체 셀을 한 번 보내고, 이후에는 변경분만 보냅니다. (느린 접속은 다시 전체 전송)
+    """
+
+    SECTIONS = ("pnl", "positions", "orders", "volume_rank", "upsurge", "conditions")
+
+    def __init__(self, kiwoom_api, pnl_engine=None, port=None, host=None, fps=None):
+        self.api = kiwoom_api
+        self.pnl_engine = pnl_engine
+        self.port = port or Config.DASHBOARD_PORT
+        self.host = host or Config.DASHBOARD_HOST
+        self.fps = fps or Config.DASHBOARD_FPS
+
+        self.sections = {name: {} for name in self.SECTIONS}  # 구역 -> {셀 키: 값}
+        self.dirty = set(self.SECTIONS)
+        self._resync = False  # 새 접속 시 전체 구역 재구성
+        self.seq = 0
+        self.clients = []  # 접속별 전송 대기열
+        self._lock = threading.Lock()
+        self._scanner_sources = {}  # 구역 -> 마지막으로 반영한 순위 조회 결과 목록
+        self._server = None
+        self.timer = QTimer()
+        self.timer.timeout.connect(self._on_frame)
+
+    # 시작/중지
+    def start(self):
+        """변경 통지 등록 및 HTTP 서버 시작"""
+        try:
+            for book in self.api.account_books.values():
+                book.add_listener(self._on_book_update)
+            if self.pnl_engine is not None:
+                self.pnl_engine.subscribe(self._on_pnl_snapshot)
+            self._server = ThreadingHTTPServer((self.host, self.port), _DashboardHandler)
+            self._server.daemon_threads = True
+            self._server.dashboard = self
+            threading.Thread(target=self._server.serve_forever, name="dashboard-http", daemon=True).start()
+            metrics.set_gauge("dashboard_clients", lambda: len(self.clients))
+            self.timer.start(max(int(1000 / self.fps), 1))
+            logger.info(f"운영 화면 시작: http://{self.host}:{self.port}/")
+            return True
+        except Exception as e:
+            logger.log_error("DASHBOARD", str(e))
+            return False
+
+    def stop(self):
+        self.timer.stop()
+        for book in self.api.account_books.values():
+            book.remove_listener(self._on_book_update)
+        if self.pnl_engine is not None and self._on_pnl_snapshot in self.pnl_engine.subscribers:
+            self.pnl_engine.subscribers.remove(self._on_pnl_snapshot)
+        if self._server:
+            with self._lock:
+                for client in self.clients:
+                    client.put(None)
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    # 변경 통지
+    def _on_book_update(self, kind, key, old, new):
+        self.dirty.add("positions" if kind == "position" else "orders")
+
+    def _on_pnl_snapshot(self, snapshot):
+        self.dirty.update(("pnl", "positions"))
+
+    # 셀 구성 (변경된 구역만)
+    def _build_pnl(self):
+        if self.pnl_engine is None:
+            totals = {}
+            for book in self.api.account_books.values():
+                pnl = book.get_pnl()
+                totals["value"] = totals.get("value", 0) + pnl["evaluation_amount"]
+                totals["unrealized"] = totals.get("unrealized", 0) + pnl["unrealized_pnl"]
+                totals["realized"] = totals.get("realized", 0) + pnl["realized_pnl"]
+        else:
+            totals = self.pnl_engine.totals()
+        return {f"pnl|total|{column}": totals[column] for column in PNL_COLUMNS if column in totals}
+
+    def _build_positions(self):
+        cells = {}
+        prices = {}
+        snapshot = self.pnl_engine.last_snapshot if self.pnl_engine is not None else None
+        if snapshot:
+            prices = {(p["accno"], p["code"]): p for p in snapshot["positions"]}
+        for accno, book in self.api.account_books.items():
+            for position in book.get_holdings():
+                code = position["code"]
+                live = prices.get((accno, code), {})
+                price = live.get("price") or position.get("current_price", 0)
+                cost = position["quantity"] * position["purchase_price"]
+                unrealized = position["quantity"] * price - cost
+                row = {
+                    "accno": accno,
+                    "code": code,
+                    "name": position.get("name", ""),
+                    "quantity": position["quantity"],
+                    "avg_price": position["purchase_price"],
+                    "price": price,
+                    "unrealized": unrealized,
+                    "return_rate": round(unrealized / cost * 100, 2) if cost else 0.0,
+                }
+                for column in POSITION_COLUMNS:
+                    cells[f"positions|{accno}:{code}|{column}"] = row[column]
+        return cells
+
+    def _build_orders(self):
+        cells = {}
+        for accno, book in self.api.account_books.items():
+            for order in book.get_open_orders():
+                order = dict(order, accno=accno)
+                order["order_type"] = "매수" if order.get("order_type") == 1 else "매도"
+                for column in ORDER_COLUMNS:
+                    cells[f"orders|{accno}:{order['order_no']}|{column}"] = order.get(column, "")
+        return cells
+
+    def _build_scanner(self, section, rows, columns):
+        return {f"{section}|{rank:02d}|{column}": row.get(column, "") for rank, row in enumerate(rows) for column in columns}
+
+    def _build_conditions(self):
+        return {f"conditions|{name}|codes": ",".join(sorted(codes)) for name, codes in self.api.condition_results.items()}
+
+    def _check_scanner(self):
+        """순위 조회 결과가 새로 수신되었으면 해당 구역 갱신 표시 (결과 목록 객체 비교)"""
+        if not self.api.tradings:
+            return
+        tr_data = self.api.tradings[0].tr_data
+        sources = {
+            "volume_rank": tr_data.get("OPT10030", {}).get("stocks"),
+            "upsurge": tr_data.get("OPT10023", {}).get("upsurge_stocks"),
+        }
+        for section, rows in sources.items():
+            if rows is not self._scanner_sources.get(section):
+                self._scanner_sources[section] = rows
+                self.dirty.add(section)
+
+    def _on_frame(self):
+        """프레임 타이머 (변경된 구역의 셀만 비교하여 변경분 전송)"""
+        try:
+            self._check_scanner()
+            self.dirty.add("conditions")
+            if not self.clients:
+                return
+            if self._resync:
+                self._resync = False
+                self.dirty.update(self.SECTIONS)
+            changed, removed = {}, []
+            for section in list(self.dirty):
+                if section == "pnl":
+                    cells = self._build_pnl()
+                elif section == "positions":
+                    cells = self._build_positions()
+                elif section == "orders":
+                    cells = self._build_orders()
+                elif section == "volume_rank":
+                    cells = self._build_scanner(section, self._scanner_sources.get(section) or [], VOLUME_RANK_COLUMNS)
+                elif section == "upsurge":
+                    cells = self._build_scanner(section, self._scanner_sources.get(section) or [], UPSURGE_COLUMNS)
+                else:
+                    cells = self._build_conditions()
+                previous = self.sections[section]
+                changed.update((key, value) for key, value in cells.items() if previous.get(key, _MISSING) != value)
+                removed.extend(key for key in previous if key not in cells)
+                self.sections[section] = cells
+            self.dirty.clear()
+            if changed or removed:
+                self._broadcast({"set": changed, "del": removed})
+        except Exception as e:
+            logger.log_error("DASHBOARD_FRAME", str(e))
+
+    # 전송
+    def _broadcast(self, delta):
+        with self._lock:
+            self.seq += 1
+            delta["seq"] = self.seq
+            message = json.dumps(delta, ensure_ascii=False, default=str)
+            for client in self.clients:
+                try:
+                    client.put_nowait(message)
+                except queue.Full:  # 느린 접속은 대기열을 비우고 전체 셀 재전송
+                    self._reset_client(client)
+        metrics.inc("dashboard_cells_total", len(delta["set"]) + len(delta["del"]))
+
+    def _full_state(self):
+        cells = {}
+        for section in self.sections.values():
+            cells.update(section)
+        return json.dumps({"seq": self.seq, "reset": True, "set": cells, "del": []}, ensure_ascii=False, default=str)
+
+    def _reset_client(self, client):
+        while True:
+            try:
+                client.get_nowait()
+            except queue.Empty:
+                break
+        client.put_nowait(self._full_state())
+
+    def connect_client(self):
+        """새 접속 대기열 (전체 셀로 시작)"""
+        client = queue.Queue(maxsize=Config.DASHBOARD_CLIENT_BUFFER)
+        with self._lock:
+            client.put_nowait(self._full_state())
+            self.clients.append(client)
+        self._resync = True  # 접속 전 변경분은 다음 프레임에서 전체 구역 비교로 반영
+        return client
+
+    def disconnect_client(self, client):
+        with self._lock:
+            if client in self.clients:
+                self.clients.remove(client)
+
+
+class _DashboardHandler(BaseHTTPRequestHandler):
+    """운영 화면 HTTP 요청 처리 (/: 페이지, /events: 변경분 스트림)"""
+
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        if path == "/":
+            body = DASHBOARD_PAGE.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        elif path == "/events":
+            self._stream()
+        else:
+            self.send_error(404)
+
+    def _stream(self):
+        dashboard = self.server.dashboard
+        client = dashboard.connect_client()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        try:
+            while True:
+                try:
+                    message = client.get(timeout=15)
+                except queue.Empty:
+                    self.wfile.write(b": keepalive\n\n")  # 연결 유지
+                    self.wfile.flush()
+                    continue
+                if message is None:
+                    break
+                self.wfile.write(f"data: {message}\n\n".encode("utf-8"))
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError, ConnectionAbortedError):
+            pass
+        finally:
+            dashboard.disconnect_client(client)
+
+    def log_message(self, format, *args):
+        """요청 로그 출력 안 함"""
+        pass
+
+
+DASHBOARD_PAGE = """<!DOCTYPE html>
+<html lang="ko">
+<head>
+<meta charset="utf-8">
+<title>Kiwoom 운영 화면</title>
+<style>
+body { font-family: monospace; background: #111; color: #ddd; margin: 12px; }
+h2 { font-size: 14px; margin: 16px 0 4px; color: #9cf; }
+table { border-collapse: collapse; font-size: 13px; }
+th, td { padding: 2px 10px; text-align: right; border-bottom: 1px solid #333; }
+th { color: #999; font-weight: normal; }
+td.up { color: #f66; } td.down { color: #69f; }
+td.flash { background: #334; }
+#status { color: #777; font-size: 12px; }
+</style>
+</head>
+<body>
+<div id="status">연결 중...</div>
+<div id="root"></div>
+<script>
+const SECTIONS = [
+  ["pnl", "실시간 손익", ["value", "unrealized", "return_rate", "realized", "fees", "taxes", "total_pnl"]],
+  ["positions", "보유 종목", ["accno", "code", "name", "quantity", "avg_price", "price", "unrealized", "return_rate"]],
+  ["orders", "미체결 주문", ["accno", "order_no", "code", "order_type", "quantity", "unfilled", "price", "state"]],
+  ["volume_rank", "거래량 상위", ["code", "name", "price", "vol", "amount"]],
+  ["upsurge", "거래량 급증", ["code", "name", "price", "pre_vol", "cur_vol", "fluctuation_rate"]],
+  ["conditions", "조건검색", ["codes"]],
+];
+const SIGNED = new Set(["unrealized", "return_rate", "realized", "total_pnl", "fluctuation_rate"]);
+const bodies = {}, columns = {};
+const rows = new Map();  // "구역|행" -> {tr, cells: {열: td}} (종목명/조건식 이름은 id/HTML로 쓰지 않음)
+const root = document.getElementById("root");
+for (const [name, title, cols] of SECTIONS) {
+  columns[name] = cols;
+  const h = document.createElement("h2"); h.textContent = title; root.appendChild(h);
+  const table = document.createElement("table");
+  const head = table.createTHead().insertRow();
+  for (const c of ["", ...cols]) { const th = document.createElement("th"); th.textContent = c; head.appendChild(th); }
+  root.appendChild(table);
+  bodies[name] = table.createTBody();
+}
+function format(col, value) {
+  if (typeof value === "number") return col === "return_rate" ? value.toFixed(2) + "%" : value.toLocaleString();
+  return value;
+}
+function split(key) {
+  // 구역|행|열 (행 키에 "|"가 들어가도 처음/마지막 구분자로 분리)
+  const first = key.indexOf("|"), last = key.lastIndexOf("|");
+  return [key.slice(0, first), key.slice(first + 1, last), key.slice(last + 1)];
+}
+function cell(key, create) {
+  const [section, row, col] = split(key);
+  const rowKey = section + "|" + row;
+  let entry = rows.get(rowKey);
+  if (!entry) {
+    if (!create || !bodies[section]) return null;
+    const tr = document.createElement("tr");
+    tr.insertCell().textContent = row;
+    const cells = {};
+    for (const c of columns[section]) cells[c] = tr.insertCell();
+    entry = {tr, cells, row};
+    const next = Array.from(rows.values()).filter(e => e.tr.parentNode === bodies[section] && e.row > row)
+      .sort((x, y) => (x.row < y.row ? -1 : 1))[0];
+    bodies[section].insertBefore(tr, next ? next.tr : null);
+    rows.set(rowKey, entry);
+  }
+  return entry.cells[col] || null;
+}
+function apply(delta) {
+  if (delta.reset) { for (const body of Object.values(bodies)) body.replaceChildren(); rows.clear(); }
+  for (const [key, value] of Object.entries(delta.set)) {
+    const td = cell(key, true);
+    if (!td) continue;
+    const col = split(key)[2];
+    td.textContent = format(col, value);
+    if (SIGNED.has(col) && typeof value === "number") td.className = value > 0 ? "up" : value < 0 ? "down" : "";
+    if (!delta.reset) { td.classList.add("flash"); setTimeout(() => td.classList.remove("flash"), 300); }
+  }
+  for (const key of delta.del) {
+    const td = cell(key, false);
+    if (td) td.textContent = "";
+    const [section, row] = split(key);
+    const entry = rows.get(section + "|" + row);
+    if (entry && Object.values(entry.cells).every(c => c.textContent === "")) { entry.tr.remove(); rows.delete(section + "|" + row); }
+  }
+  document.getElementById("status").textContent = "갱신 #" + delta.seq + " " + new Date().toLocaleTimeString();
+}
+const events = new EventSource("/events");
+events.onmessage = e => apply(JSON.parse(e.data));
+events.onerror = () => { document.getElementById("status").textContent = "연결 끊김 (재연결 중...)"; };
+</script>
+</body>
+</html>
+"""
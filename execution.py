@@ -0,0 +1,269 @@
+import time
+from PyQt5.QtCore import QTimer
+from logger import logger
+from metrics import metrics
+
+REAL_TYPE_TRADE = "주식체결"
+FID_PRICE = 10  # 현재가
+FID_VOLUME = 15  # 거래량 (체결 단위, 부호는 매수/매도 체결 구분)
+
+
+class ExecutionAlgo:
+    """부모 주문 분할 실행 기본 클래스
+
+    - 한 번에 한 건의 지정가 자식 주문만 유지하고, 최우선호가가 바뀌면 정정 주문(5/6)으로 가격만 옮깁니다.
+    - 계획 대비 체결이 늦으면 상대호가로 정정하여 따라잡고, 그 외에는 같은 방향 최우선호가에 대기하여 가격을 밀지 않습니다.
+    - 체결 진행은 체결잔고(AccountBook 변경 통지)로 갱신합니다.
+    """
+
+    name = "algo"
+
+    def __init__(self, trading, side, code, quantity, limit_price=0, interval=1.0, max_child_quantity=0):
+        self.trading = trading
+        self.api = trading.api
+        self.side = side  # "buy" 또는 "sell"
+        self.code = code
+        self.quantity = quantity
+        self.limit_price = limit_price  # 0이면 가격 제한 없음
+        self.interval = interval
+        self.max_child_quantity = max_child_quantity  # 0이면 제한 없음
+
+        self.state = "대기"  # 대기, 실행, 완료, 중지
+        self.children = {}  # 주문번호 -> 자식 주문 (AccountBook 주문 정보 사본)
+        self.working = None  # 대기 중인 자식 주문번호
+        self.filled = 0
+        self.fill_value = 0
+        self.messages = 0  # 전송한 주문/정정/취소 건수
+        self.started_at = None
+        self.on_done = None
+        self._busy = False
+
+        self.timer = QTimer()
+        self.timer.timeout.connect(self._on_timer)
+
+    # 진행 상태
+    @property
+    def owner(self):
+        """실시간 등록 구독자 이름"""
+        return f"{self.name}:{id(self):x}"
+
+    @property
+    def remaining(self):
+        return max(self.quantity - self.filled, 0)
+
+    @property
+    def average_price(self):
+        return self.fill_value / self.filled if self.filled else 0.0
+
+    def target_quantity(self, now):
+        """현재 시점까지 체결되어야 할 누적 수량 (하위 클래스에서 구현)"""
+        return self.quantity
+
+    def status(self):
+        """실행 상태 요약"""
+        return {
+            "algo": self.name,
+            "side": self.side,
+            "code": self.code,
+            "quantity": self.quantity,
+            "filled": self.filled,
+            "average_price": round(self.average_price, 2),
+            "state": self.state,
+            "messages": self.messages,
+            "working": self.working,
+        }
+
+    # 시작/중지
+    def start(self, on_done=None):
+        """실행 시작 (호가 실시간 등록 후 interval초마다 주문 갱신)"""
+        self.on_done = on_done
+        self.state = "실행"
+        self.started_at = time.time()
+        self.trading.book.add_listener(self._on_book_update)
+        self.api.order_books.subscribe([self.code], self.owner)
+        self.timer.start(int(self.interval * 1000))
+        logger.info(f"{self.name} 시작: {self.code} {self.side} {self.quantity}주")
+        QTimer.singleShot(0, self._on_timer)
+
+    def stop(self, cancel=True):
+        """실행 중지 (cancel=True면 대기 중인 자식 주문 취소)"""
+        if self.state != "실행":
+            return
+        self.timer.stop()
+        if cancel and self.working:
+            order = self.children[self.working]
+            if order.get("unfilled", 0) > 0 and self.trading.cancel_order(self.working, self.code, order["unfilled"]):
+                self.messages += 1
+        self.state = "중지"
+        self._finish()
+
+    def _finish(self):
+        """종료 처리 (완료/중지 공통, 장부 통지와 호가 실시간 참조 해제)"""
+        self.timer.stop()
+        self.trading.book.remove_listener(self._on_book_update)
+        self.api.order_books.unsubscribe([self.code], self.owner)
+        metrics.inc("algo_messages_total", self.messages, algo=self.name)
+        logger.info(f"{self.name} 종료: {self.status()}")
+        if self.on_done:
+            self.on_done(self)
+
+    # 체결 추적
+    def _on_book_update(self, kind, key, old, new):
+        if kind != "order" or key not in self.children or new is None:
+            return
+        previous = self.children[key]
+        self.children[key] = new
+        filled = new.get("filled", 0) - previous.get("filled", 0)
+        if filled > 0:
+            self.filled += filled
+            self.fill_value += filled * (new.get("filled_price") or new.get("price", 0))
+        if key == self.working and new.get("unfilled", 0) <= 0:
+            self.working = None
+        if self.filled >= self.quantity and self.state == "실행":
+            self.state = "완료"
+            QTimer.singleShot(0, self._finish)
+
+    # 주문 갱신
+    def _prices(self):
+        """(대기 가격, 상대호가) (호가 미수신 시 None)"""
+        book = self.api.order_books.snapshot(self.code)
+        if book is None or not book.best_ask or not book.best_bid:
+            return None
+        if self.side == "buy":
+            return book.best_bid, book.best_ask
+        return book.best_ask, book.best_bid
+
+    def _cap(self, price):
+        """지정 한도 가격 적용"""
+        if not self.limit_price:
+            return price
+        return min(price, self.limit_price) if self.side == "buy" else max(price, self.limit_price)
+
+    def _on_timer(self):
+        if self.state != "실행" or self._busy:
+            return
+        self._busy = True
+        try:
+            prices = self._prices()
+            if prices is None:
+                return
+            passive, aggressive = prices
+            due = min(self.target_quantity(time.time()), self.quantity) - self.filled
+            working = self.children.get(self.working) if self.working else None
+            unfilled = working.get("unfilled", 0) if working else 0
+
+            # 대기 주문이 계획보다 늦으면 상대호가, 아니면 같은 방향 최우선호가
+            price = self._cap(aggressive if working and self._behind(due, unfilled) else passive)
+
+            if working:
+                if working.get("price") != price:
+                    self._amend(working, price)
+                return
+
+            quantity = min(due, self.remaining)
+            if self.max_child_quantity:
+                quantity = min(quantity, self.max_child_quantity)
+            if quantity > 0:
+                self._place(quantity, price)
+        except Exception as e:
+            logger.log_error("EXECUTION_ALGO", str(e))
+        finally:
+            self._busy = False
+
+    def _behind(self, due, unfilled):
+        """대기 주문 수량보다 체결해야 할 수량이 많으면 계획 대비 지연"""
+        return due > unfilled
+
+    def _place(self, quantity, price):
+        send = self.trading.buy_stock if self.side == "buy" else self.trading.sell_stock
+        self.messages += 1
+        if send(self.code, quantity, price, "지정가"):
+            self._track(self.trading.order_result["order_no"])
+
+    def _amend(self, working, price):
+        self.messages += 1
+        if self.trading.amend_order(working["order_no"], self.code, working["unfilled"], price):
+            self._track(self.trading.order_result["order_no"])
+
+    def _track(self, order_no):
+        self.working = order_no
+        self.children[order_no] = {"order_no": order_no, "filled": 0, "unfilled": 0}
+        current = self.trading.book.orders.get(order_no)
+        if current:  # 접수 결과보다 먼저 도착한 체결 반영
+            self._on_book_update("order", order_no, None, dict(current))
+
+
+class TWAP(ExecutionAlgo):
+    """시간 가중 분할 실행 (duration초 동안 slices회에 걸쳐 균등 배분)"""
+
+    name = "twap"
+
+    def __init__(self, trading, side, code, quantity, duration, slices=10, **kwargs):
+        super().__init__(trading, side, code, quantity, **kwargs)
+        self.duration = duration
+        self.slices = max(slices, 1)
+
+    def target_quantity(self, now):
+        step = self.duration / self.slices
+        n = min(int((now - self.started_at) / step) + 1, self.slices)
+        return self.quantity * n // self.slices
+
+
+class VWAP(ExecutionAlgo):
+    """거래량 참여율 분할 실행 (시작 이후 실시간 체결량의 participation 비율만큼 누적 체결)"""
+
+    name = "vwap"
+
+    def __init__(self, trading, side, code, quantity, participation=0.1, **kwargs):
+        super().__init__(trading, side, code, quantity, **kwargs)
+        self.participation = participation
+        self.market_volume = 0
+        self.market_value = 0
+
+    @property
+    def market_vwap(self):
+        """시작 이후 시장 거래량 가중 평균가"""
+        return self.market_value / self.market_volume if self.market_volume else 0.0
+
+    def start(self, on_done=None):
+        self.api.add_real_data_handler(REAL_TYPE_TRADE, self._on_trade)
+        self.api.subscriptions.acquire(self.owner, [self.code])
+        super().start(on_done)
+
+    def _finish(self):
+        self.api.remove_real_data_handler(REAL_TYPE_TRADE, self._on_trade)
+        self.api.subscriptions.release(self.owner, [self.code])
+        super()._finish()
+
+    def _on_trade(self, code, real_type):
+        """주식체결 수신 시 시장 거래량 누적"""
+        if code != self.code:
+            return
+        try:
+            volume = abs(int(self.api.ocx.GetCommRealData(code, FID_VOLUME).strip()))
+            price = abs(int(self.api.ocx.GetCommRealData(code, FID_PRICE).strip()))
+        except ValueError:
+            return
+        self.market_volume += volume
+        self.market_value += volume * price
+
+    def target_quantity(self, now):
+        return int(self.market_volume * self.participation)
+
+    def status(self):
+        status = super().status()
+        status.update(market_volume=self.market_volume, market_vwap=round(self.market_vwap, 2))
+        return status
+
+
+class Iceberg(ExecutionAlgo):
+    """빙산 주문 (display_quantity만 노출하고 체결되면 다음 물량 제출)"""
+
+    name = "iceberg"
+
+    def __init__(self, trading, side, code, quantity, display_quantity, **kwargs):
+        kwargs["max_child_quantity"] = display_quantity
+        super().__init__(trading, side, code, quantity, **kwargs)
+
+    def _behind(self, due, unfilled):
+        return False  # 노출 물량은 항상 같은 방향 최우선호가(또는 지정 한도 가격)에 대기
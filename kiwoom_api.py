@@ -2,21 +2,71 @@ import sys
 import time
 import threading
 from PyQt5.QAxContainer import QAxWidget
-from PyQt5.QtCore import QEventLoop
+from PyQt5.QtCore import QEventLoop, QTimer
 from PyQt5.QtWidgets import QApplication
 from logger import logger
 from config import Config
+from rate_limiter import RateLimiter
+from account import AccountBook
+from metrics import metrics, timed
+from master_cache import MasterCache
+from universe import Universe
+from venue import VenueBook
+from subscriptions import SubscriptionManager
+from orderbook import OrderBookStore, HOGA_FIDS
+from risk import PriceLimits, RiskEngine, load_reference_price, load_instrument_kind
 
 class KiwoomAPI:
     """키움증권 API 클래스"""
     
-    def __init__(self):
-        self.app = QApplication(sys.argv)
-        self.ocx = QAxWidget("KHOPENAPI.KHOpenAPICtrl.1")
+    def __init__(self, ocx=None):
+        self.app = QApplication.instance() or QApplication(sys.argv)
+        self.ocx = ocx if ocx is not None else QAxWidget("KHOPENAPI.KHOpenAPICtrl.1")  # ocx: 시뮬레이터 주입용
         self.connected = False
         self.login_event_loop = QEventLoop()
         self.order_event_loop = QEventLoop()
         
+        # 계좌/전략 간 공유 요청 제한 (TR, 주문)
+        self.tr_limiter = RateLimiter("TR", Config.TR_RATE_LIMIT)
+        self.order_limiter = RateLimiter("ORDER", Config.ORDER_RATE_LIMIT)
+        
+        # 계좌별 장부, 리스크 검사 및 등록된 거래 인스턴스
+        self.account_books = {}
+        self.risk_engines = {}
+        self.price_limits = PriceLimits(load_reference_price(self), kind_loader=load_instrument_kind(self))
+        self.tradings = []
+        
+        # 재연결 시 복원할 실시간 등록/조건검색 및 마지막 이벤트 수신 시각
+        self.real_registrations = {}  # 화면번호 -> {"codes": [...], "fids": "..."}
+        self.conditions = {}  # (화면번호, 조건명, 조건인덱스) -> 검색구분
+        self.condition_results = {}  # 조건명 -> 편입 종목코드 집합
+        self.condition_snapshot = {}  # 조건명 -> 정렬된 종목코드 목록 (다른 스레드 조회용, Qt 스레드에서 통째로 교체)
+        self.last_event_time = time.time()
+        
+        # 실시간 타입별 처리기 및 호가 보관소
+        self.real_data_handlers = {}  # 실시간 타입 -> 처리 함수 목록
+        self.order_books = OrderBookStore()
+        self.order_books.attach(self)
+        self.venue_book = VenueBook(self)  # KRX/NXT 통합 호가 및 주문 시장 선택
+        if Config.NXT_ENABLED:
+            self.venue_book.attach()
+        self.subscriptions = SubscriptionManager(self)  # 수요 기반 실시간 등록 관리 (주식체결)
+        self.hoga_subscriptions = SubscriptionManager(
+            self, Config.REAL_HOGA_SUBSCRIPTION_CAPACITY, HOGA_FIDS, Config.REAL_HOGA_SUBSCRIPTION_SCREEN,
+            name="hoga", pin_positions=False,
+        )  # 호가(주식호가잔량) 실시간 등록 관리
+        
+        # 종목 마스터 캐시 (디스크에서 로드, 오늘자가 아니면 로그인 후 갱신)
+        self.master_cache = MasterCache(Config.MASTER_CACHE_FILE)
+        self.master_cache.load()
+        self.universe = Universe(Config.UNIVERSE_CACHE_FILE)
+        self.universe.load()
+        
+        # 대기열 지표
+        metrics.set_gauge("rate_limit_pending", self.tr_limiter.pending, limiter="TR")
+        metrics.set_gauge("rate_limit_pending", self.order_limiter.pending, limiter="ORDER")
+        metrics.set_gauge("inflight_requests", metrics.pending_marks)
+        
         # 이벤트 핸들러 연결
         self._connect_event_handlers()
         
@@ -31,6 +81,7 @@ class KiwoomAPI:
         self.ocx.OnReceiveMsg.connect(self._on_receive_msg)
         self.ocx.OnReceiveTrCondition.connect(self._on_receive_tr_condition)
         self.ocx.OnReceiveRealCondition.connect(self._on_receive_real_condition)
+        self.ocx.OnReceiveConditionVer.connect(self._on_receive_condition_ver)
         
         # logger.debug("이벤트 핸들러 연결 완료")
     
@@ -41,7 +92,8 @@ class KiwoomAPI:
             result = self.ocx.CommConnect()
             
             if result == 0:
-                self.login_event_loop.exec_()
+                if not self.wait_event_loop(self.login_event_loop, Config.CONNECT_TIMEOUT):
+                    logger.log_connection("FAILED", f"로그인 응답 시간 초과 ({Config.CONNECT_TIMEOUT}초)")
                 if self.connected:
                     # logger.log_connection("SUCCESS", "키움증권 서버 연결 성공")
                     return True
@@ -56,6 +108,98 @@ class KiwoomAPI:
             logger.log_error("CONNECTION", str(e))
             return False
     
+    def reconnect(self):
+        """재연결 후 실시간 등록/조건검색 복원"""
+        self.connected = False
+        if not self.connect():
+            return False
+        self.restore_subscriptions()
+        return True
+    
+    def wait_event_loop(self, event_loop, timeout):
+        """이벤트 루프 대기 (시간 초과 시 False)"""
+        timed_out = []
+        
+        def on_timeout():
+            timed_out.append(True)
+            event_loop.exit()
+        
+        timer = QTimer()
+        timer.setSingleShot(True)
+        timer.timeout.connect(on_timeout)
+        timer.start(int(timeout * 1000))
+        event_loop.exec_()
+        timer.stop()
+        return not timed_out
+    
+    def add_real_data_handler(self, real_type, handler):
+        """실시간 타입별 처리기 등록 (handler(code, real_type))"""
+        self.real_data_handlers.setdefault(real_type, []).append(handler)
+    
+    def remove_real_data_handler(self, real_type, handler):
+        """실시간 타입별 처리기 해제"""
+        handlers = self.real_data_handlers.get(real_type, [])
+        if handler in handlers:
+            handlers.remove(handler)
+    
+    def set_real_reg(self, screen_no, codes, fids, opt_type="1"):
+        """실시간 시세 등록 (opt_type 0:기존 등록 교체, 1:추가)"""
+        try:
+            code_list = [c for c in codes.split(';') if c] if isinstance(codes, str) else list(codes)
+            result = self.ocx.SetRealReg(screen_no, ";".join(code_list), fids, opt_type)
+            registration = self.real_registrations.get(screen_no)
+            if opt_type == "0" or registration is None:
+                self.real_registrations[screen_no] = {"codes": code_list, "fids": fids}
+            else:
+                registration["codes"].extend(c for c in code_list if c not in registration["codes"])
+            return result
+        except Exception as e:
+            logger.log_error("SET_REAL_REG", str(e))
+            return -1
+    
+    def set_real_remove(self, screen_no, code):
+        """실시간 시세 해지 (screen_no/code에 "ALL" 사용 가능)"""
+        try:
+            self.ocx.SetRealRemove(screen_no, code)
+            for screen in list(self.real_registrations):
+                if screen_no not in ("ALL", screen):
+                    continue
+                if code == "ALL":
+                    del self.real_registrations[screen]
+                else:
+                    codes = self.real_registrations[screen]["codes"]
+                    if code in codes:
+                        codes.remove(code)
+        except Exception as e:
+            logger.log_error("SET_REAL_REMOVE", str(e))
+    
+    def send_condition(self, screen_no, condition_name, condition_index, search_type=1):
+        """조건검색 요청 (search_type 0:일반, 1:실시간)"""
+        try:
+            self.conditions[(screen_no, condition_name, condition_index)] = search_type
+            return self.ocx.SendCondition(screen_no, condition_name, condition_index, search_type)
+        except Exception as e:
+            logger.log_error("SEND_CONDITION", str(e))
+            return 0
+    
+    def send_condition_stop(self, screen_no, condition_name, condition_index):
+        """실시간 조건검색 중지"""
+        try:
+            self.conditions.pop((screen_no, condition_name, condition_index), None)
+            self.ocx.SendConditionStop(screen_no, condition_name, condition_index)
+        except Exception as e:
+            logger.log_error("SEND_CONDITION_STOP", str(e))
+    
+    def restore_subscriptions(self):
+        """실시간 등록 및 조건검색 재등록 (재연결 후)"""
+        for screen_no, registration in self.real_registrations.items():
+            if registration["codes"]:
+                self.ocx.SetRealReg(screen_no, ";".join(registration["codes"]), registration["fids"], "0")
+        if self.conditions:
+            # 조건식 목록 수신(OnReceiveConditionVer) 후 재요청
+            self.ocx.GetConditionLoad()
+        logger.info(f"실시간 등록 복원: 화면 {len(self.real_registrations)}개, 조건검색 {len(self.conditions)}개")
+    
     def login(self):
         """로그인"""
         try:
@@ -102,6 +246,27 @@ class KiwoomAPI:
             logger.log_error("GET_LOGIN_INFO", str(e))
             return ""
     
+    def get_account_list(self):
+        """로그인 계정의 보유 계좌 목록 조회"""
+        return [a for a in self.get_login_info("ACCLIST").split(';') if a]
+    
+    def get_account_book(self, accno):
+        """계좌별 장부 조회 (없으면 생성)"""
+        if accno not in self.account_books:
+            self.account_books[accno] = AccountBook(accno)
+        return self.account_books[accno]
+    
+    def get_risk_engine(self, accno):
+        """계좌별 리스크 검사기 조회 (없으면 생성)"""
+        if accno not in self.risk_engines:
+            self.risk_engines[accno] = RiskEngine(self.get_account_book(accno), self.price_limits)
+        return self.risk_engines[accno]
+    
+    def register_trading(self, trading):
+        """거래 인스턴스 등록 (인스턴스 순번 반환)"""
+        self.tradings.append(trading)
+        return len(self.tradings) - 1
+    
     def get_master_code_name(self, code):
         """종목코드에 해당하는 종목명 조회"""
         try:
@@ -126,6 +291,30 @@ class KiwoomAPI:
             logger.log_error("GET_MASTER_STOCK_INFO", str(e))
             return ""
     
+    def get_master_construction(self, code):
+        """종목코드에 해당하는 감리구분 조회 (정상, 투자주의, 투자경고, 투자위험, 투자주의환기종목)"""
+        try:
+            return self.ocx.GetMasterConstruction(code)
+        except Exception as e:
+            logger.log_error("GET_MASTER_CONSTRUCTION", str(e))
+            return ""
+    
+    def get_master_stock_state(self, code):
+        """종목코드에 해당하는 종목 상태 조회 (증거금 비율, 관리종목, 거래정지 등 '|' 구분)"""
+        try:
+            return self.ocx.GetMasterStockState(code)
+        except Exception as e:
+            logger.log_error("GET_MASTER_STOCK_STATE", str(e))
+            return ""
+    
+    def get_master_listed_stock_cnt(self, code):
+        """종목코드에 해당하는 상장주식수 조회"""
+        try:
+            return self.ocx.GetMasterListedStockCnt(code)
+        except Exception as e:
+            logger.log_error("GET_MASTER_LISTED_STOCK_CNT", str(e))
+            return 0
+    
     def get_code_list_by_market(self, market):
         """시장별 종목코드 리스트 조회"""
         try:
@@ -135,6 +324,7 @@ class KiwoomAPI:
             return ""
     
     # 이벤트 핸들러 메서드들
+    @timed("OnEventConnect")
     def _on_event_connect(self, err_code):
         """로그인 이벤트"""
         if err_code == 0:
@@ -146,29 +336,63 @@ class KiwoomAPI:
         
         self.login_event_loop.exit()
     
+    @timed("OnReceiveTrData", label="trcode")
     def _on_receive_tr_data(self, screen_no, rqname, trcode, recordname, prev_next, data_len, error_code, message, splm_msg):
         """TR 수신 이벤트"""
+        self.last_event_time = time.time()
         logger.debug(f"TR 수신: {rqname} - {trcode}")
     
+    @timed("OnReceiveRealData", label="real_type")
     def _on_receive_real_data(self, code, real_type, real_data):
         """실시간 데이터 수신 이벤트"""
-        logger.debug(f"실시간 데이터 수신: {code} - {real_type}")
+        self.last_event_time = time.time()
+        for handler in self.real_data_handlers.get(real_type, ()):
+            try:
+                handler(code, real_type)
+            except Exception as e:
+                logger.log_error("REAL_DATA", f"{real_type} {code}: {e}")
     
+    @timed("OnReceiveChejanData", label="gubun")
     def _on_receive_chejan_data(self, gubun, item_cnt, fid_list):
         """체결잔고 데이터 수신 이벤트"""
+        self.last_event_time = time.time()
         logger.debug(f"체결잔고 데이터 수신: {gubun}")
     
+    @timed("OnReceiveMsg", label="trcode")
     def _on_receive_msg(self, screen_no, rqname, trcode, msg):
         """메시지 수신 이벤트"""
         logger.debug(f"메시지 수신: {msg}")
     
+    @timed("OnReceiveTrCondition", label="condition_name")
     def _on_receive_tr_condition(self, screen_no, codes, condition_name, condition_index, next):
         """조건검색 결과 수신 이벤트"""
         logger.debug(f"조건검색 결과: {condition_name}")
+        self.condition_results[condition_name] = {c for c in codes.split(';') if c}
+        self._publish_conditions()
     
+    @timed("OnReceiveRealCondition", label="condition_name")
     def _on_receive_real_condition(self, code, type, condition_name, condition_index):
         """실시간 조건검색 결과 수신 이벤트"""
         logger.debug(f"실시간 조건검색: {code} - {condition_name}")
+        results = self.condition_results.setdefault(condition_name, set())
+        if type == "I":  # 편입
+            results.add(code)
+        else:  # 이탈
+            results.discard(code)
+        self._publish_conditions()
+    
+    def _publish_conditions(self):
+        """조건검색 결과 스냅샷 교체 (HTTP 스레드 등은 변경 중인 집합 대신 스냅샷을 읽음)"""
+        self.condition_snapshot = {name: sorted(codes) for name, codes in self.condition_results.items()}
+    
+    @timed("OnReceiveConditionVer")
+    def _on_receive_condition_ver(self, ret, msg):
+        """조건식 목록 수신 이벤트 (등록된 조건검색 재요청)"""
+        if ret != 1:
+            logger.log_error("CONDITION_LOAD", msg)
+            return
+        for (screen_no, condition_name, condition_index), search_type in self.conditions.items():
+            self.ocx.SendCondition(screen_no, condition_name, condition_index, search_type)
     
     def run(self):
         """이벤트 루프 실행"""
@@ -5,10 +5,9 @@ import sys
 import time
 import signal
 from datetime import datetime
-from kiwoom_api import KiwoomAPI
-from trading import Trading
 from logger import logger
 from config import Config
+from metrics import MetricsServer
 
 class KiwoomTradingApp:
     """키움증권 자동매매 애플리케이션"""
@@ -16,6 +15,15 @@ class KiwoomTradingApp:
     def __init__(self):
         self.api = None
         self.trading = None
+        self.tradings = {}  # 계좌번호 -> 거래 인스턴스
+        self.metrics_server = None
+        self.watchdog = None
+        self.quote_board = None
+        self.order_channel = None
+        self.control_server = None
+        self.dashboard = None
+        self.pnl = None
+        self.tick_recorder = None
         self.running = False
         
         # 시그널 핸들러 설정
@@ -29,11 +37,17 @@ class KiwoomTradingApp:
         try:
             # logger.info("시스템 초기화 중...")
             
+            # PyQt5/OCX 관련 모듈은 설정 출력 이후에 로드
+            from kiwoom_api import KiwoomAPI
+            from trading import Trading
+            
             # 키움증권 API 초기화
             self.api = KiwoomAPI()
             
-            # 거래 기능 초기화
-            self.trading = Trading(self.api)
+            # 거래 기능 초기화 (계좌별 인스턴스, 첫 계좌가 기본)
+            for accno in Config.ACCOUNTS:
+                self.tradings[accno] = Trading(self.api, accno)
+            self.trading = self.tradings[Config.ACCOUNTS[0]]
             
             # logger.info("시스템 초기화 완료")
             return True
@@ -50,46 +64,22 @@ class KiwoomTradingApp:
             if self.api.connect():
                 # logger.info("키움증권 서버 연결 성공")
                 
-                # 계좌 정보 출력
-                account_info = self.trading.get_account_info()
-                if account_info:
-                    logger.info("==================== 계좌 정보 ====================")
-                    for key, value in account_info.items():
-                        logger.info(f"{key}: {value}")
-
-                    
+                # 보유 계좌 확인
+                account_list = self.api.get_account_list()
+                for accno in self.tradings:
+                    if account_list and accno not in account_list:
+                        logger.warning(f"로그인 계정에 없는 계좌번호입니다: {accno}")
                 
-                total = self.trading.get_total_investment()
-                available = self.trading.get_available_funds()
-                holdings = self.trading.get_holdings()
-
-                logger.info("")
-                logger.info(f"총 투자금액: {total:,}원")
-                logger.info(f"주문 가능 금액: {available:,}원")
-                logger.info("===================================================")
-                logger.info("")
-                logger.info("")
-                logger.info("")
-
-                if holdings:
-                    logger.info("************************************** 보유 종목 **************************************")
-                    for h in holdings:
-                        logger.info(f"{h['name']} (종목코드 : {h['code']}) [ 현재가 : {h['current_price']:,}원 ]")
-                        logger.info(f"[ 내평균 : {h['purchase_price']:,}원 ] [ 보유수량 : {h['quantity']}주 ]")
-                        logger.info(f"평가금 : {((h['purchase_price'] * h['quantity']) + ((h['current_price'] - h['purchase_price']) * h['quantity'])):,}원")
-                        logger.info(f"손익상태 : {((h['current_price'] - h['purchase_price']) * h['quantity']):,}원 ({round((((h['current_price'] - h['purchase_price']) * h['quantity']) / (h['purchase_price'] * h['quantity']))*100, 2)}%)")
-                        logger.info("")
-                    logger.info("***************************************************************************************")
-                    logger.info("")
-                    logger.info("")
-                    logger.info("")
-                else:
-                    logger.info("************************************** 보유 종목 **************************************")
-                    logger.info("보유 종목이 없습니다.")  
-                    logger.info("***************************************************************************************")
-                    logger.info("")
-                    logger.info("")
-                    logger.info("")
+                # 모든 계좌의 계좌 조회 TR을 동시에 요청 후 응답 대기
+                start = time.perf_counter()
+                for trading in self.tradings.values():
+                    trading.request_account_snapshot()
+                snapshots = {accno: trading.wait_account_snapshot() for accno, trading in self.tradings.items()}
+                logger.info(f"거래 준비 완료: 보유 종목/주문 가능 금액 조회 ({time.perf_counter() - start:.2f}초)")
+                
+                # 계좌별 정보 출력
+                for accno, trading in self.tradings.items():
+                    self.print_account_summary(trading, snapshots[accno])
                 return True
             else:
                 logger.error("키움증권 서버 연결 실패")
@@ -99,6 +89,53 @@ class KiwoomTradingApp:
             logger.log_error("CONNECT", str(e))
             return False
     
+    def print_account_summary(self, trading, snapshot=None):
+        """계좌 정보 및 보유 종목 출력"""
+        if snapshot is None:
+            snapshot = trading.get_account_snapshot()
+
+        # 계좌 정보 출력
+        account_info = trading.get_account_info()
+        if account_info:
+            logger.info("==================== 계좌 정보 ====================")
+            for key, value in account_info.items():
+                logger.info(f"{key}: {value}")
+
+        total = snapshot["total_investment"]
+        available = snapshot["available_funds"]
+        holdings = snapshot["holdings"]
+
+        logger.info("")
+        logger.info(f"총 투자금액: {total:,}원")
+        logger.info(f"주문 가능 금액: {available:,}원")
+        logger.info("===================================================")
+        logger.info("")
+        logger.info("")
+        logger.info("")
+
+        if holdings and Config.DASHBOARD_PORT:
+            # 운영 화면 사용 시 표 출력 생략 (로그 파일 기록 최소화)
+            logger.info(f"보유 종목 {len(holdings)}개 (운영 화면: http://{Config.DASHBOARD_HOST}:{Config.DASHBOARD_PORT}/)")
+        elif holdings:
+            logger.info("************************************** 보유 종목 **************************************")
+            for h in holdings:
+                logger.info(f"{h['name']} (종목코드 : {h['code']}) [ 현재가 : {h['current_price']:,}원 ]")
+                logger.info(f"[ 내평균 : {h['purchase_price']:,}원 ] [ 보유수량 : {h['quantity']}주 ]")
+                logger.info(f"평가금 : {((h['purchase_price'] * h['quantity']) + ((h['current_price'] - h['purchase_price']) * h['quantity'])):,}원")
+                logger.info(f"손익상태 : {((h['current_price'] - h['purchase_price']) * h['quantity']):,}원 ({round((((h['current_price'] - h['purchase_price']) * h['quantity']) / (h['purchase_price'] * h['quantity']))*100, 2)}%)")
+                logger.info("")
+            logger.info("***************************************************************************************")
+            logger.info("")
+            logger.info("")
+            logger.info("")
+        else:
+            logger.info("************************************** 보유 종목 **************************************")
+            logger.info("보유 종목이 없습니다.")  
+            logger.info("***************************************************************************************")
+            logger.info("")
+            logger.info("")
+            logger.info("")
+    
     def test_basic_functions(self):
         """기본 기능 테스트"""
         try:
@@ -145,7 +182,10 @@ class KiwoomTradingApp:
         """거래량 상위 종목 조회 기능 테스트"""
         try:
             stocks = self.trading.get_stocks()
-            if stocks:
+            self.api.subscriptions.replace("volume_rank", [s["code"] for s in stocks])
+            if stocks and Config.DASHBOARD_PORT:
+                logger.info(f"거래량 상위 종목 {len(stocks)}개 (운영 화면에서 확인)")
+            elif stocks:
                 logger.info("************************************** 거래량 상위 종목 **************************************")
                 for s in stocks:
                     logger.info(f"({s['code']}) {s['name']} | 거래량: {s['vol']:,}주 | 거래금액: {int((round(s['amount'], -2))/100):,}억원 | 현재가: {abs(s['price']):,}원")
@@ -165,7 +205,10 @@ class KiwoomTradingApp:
         """거래량 급증 상위 종목 조회 기능 테스트"""
         try:
             upsurge_stocks = self.trading.get_upsurge_stocks()
-            if upsurge_stocks:
+            self.api.subscriptions.replace("upsurge_volume", [u["code"] for u in upsurge_stocks])
+            if upsurge_stocks and Config.DASHBOARD_PORT:
+                logger.info(f"거래량 급증 상위 종목 {len(upsurge_stocks)}개 (운영 화면에서 확인)")
+            elif upsurge_stocks:
                 logger.info("************************************** 거래량 급증 상위 종목 **************************************")
                 for u in upsurge_stocks:
                     logger.info(f"({u['code']}) {u['name']} | 이전거래량: {u['pre_vol']:,}주 | 현재거래량: {u['cur_vol']:,}주 | 등락률: {u['fluctuation_rate']} | 현재가: {abs(u['price']):,}원")
@@ -194,26 +237,75 @@ class KiwoomTradingApp:
                 logger.error("초기화 실패")
                 return False
             
+            # 지연시간 지표 엔드포인트/스냅샷 시작
+            if Config.METRICS_PORT or Config.METRICS_SNAPSHOT_FILE:
+                self.metrics_server = MetricsServer(
+                    Config.METRICS_PORT,
+                    snapshot_file=Config.METRICS_SNAPSHOT_FILE,
+                    snapshot_interval=Config.METRICS_SNAPSHOT_INTERVAL,
+                )
+                self.metrics_server.start()
+            
             # 연결
             if not self.connect():
                 logger.error("연결 실패")
                 return False
             
-            # 기본 기능 테스트
-            if not self.test_basic_functions():
-                logger.error("기본 기능 테스트 실패")
-                return False
-
-            # 거래량 상위 종목 조회 기능 테스트
-            if not self.test_get_top_stocks_functions():
-                logger.error("거래량 상위 종목 조회 기능 테스트 실패")
-                return False
-
-            # 거래량 급증 상위 종목 조회 기능 테스트
-            if not self.test_get_upsurge_stocks_functions():
-                logger.error("거래량 급증 상위 종목 조회 기능 테스트 실패")
+            if Config.FAST_START:
+                # 빠른 시작: 조회/마스터 갱신은 이벤트 루프 시작 직후 실행 (실패 시 종료)
+                from PyQt5.QtCore import QTimer
+                QTimer.singleShot(0, self._run_deferred_startup_or_quit)
+            elif not self.run_deferred_startup():
                 return False
             
+            # 연결 감시 시작 (끊김 시 자동 재연결 및 재동기화)
+            from connection_watchdog import ConnectionWatchdog
+            self.watchdog = ConnectionWatchdog(self.api)
+            self.watchdog.start()
+            
+            # 실시간 손익 계산 (보유 종목 현재가 실시간 등록)
+            from pnl import PnLEngine
+            self.pnl = PnLEngine(self.api)
+            self.pnl.start()
+            
+            # 수요 기반 실시간 등록 (보유/미체결 종목 고정, 순위 조회 종목 등록)
+            self.api.subscriptions.start()
+            self.api.hoga_subscriptions.start()
+            
+            # 실시간 체결 틱 저장
+            if Config.TICK_ARCHIVE_DIR:
+                from tick_archive import TickRecorder
+                self.tick_recorder = TickRecorder(self.api)
+                self.tick_recorder.start()
+            
+            # 전략 프로세스용 공유 메모리 시세판 및 주문 채널
+            if Config.SHM_BOARD_NAME or Config.ORDER_CHANNEL_PORT:
+                from shm_board import QuoteBoardPublisher, OrderChannelServer
+                if Config.SHM_BOARD_NAME:
+                    self.quote_board = QuoteBoardPublisher(self.api)
+                    self.quote_board.start()
+                if Config.ORDER_CHANNEL_PORT:
+                    self.order_channel = OrderChannelServer(self.api)
+                    if not self.order_channel.start():
+                        self.order_channel = None
+            
+            # 조회/제어 API (캐시에서 응답, 주문은 OrderQueue로 전송)
+            if Config.CONTROL_API_PORT:
+                from control_api import ControlServer
+                self.control_server = ControlServer(self.api, self.pnl)
+                self.control_server.start()
+            
+            # 운영 화면 (변경된 셀만 전송)
+            if Config.DASHBOARD_PORT:
+                from dashboard import Dashboard
+                self.dashboard = Dashboard(self.api, self.pnl)
+                self.dashboard.start()
+            
+            # 이벤트 핸들러 샘플링 프로파일링 (종료 시 접힌 스택 저장)
+            if Config.PROFILE_ENABLED:
+                from profiler import profiler
+                profiler.start(Config.PROFILE_INTERVAL_MS / 1000)
+            
             # 이벤트 루프 실행
             self.api.run()
             
@@ -224,14 +316,79 @@ class KiwoomTradingApp:
         finally:
             self.cleanup()
     
+    def run_deferred_startup(self):
+        """거래 준비 이후 단계 (기본 기능 테스트, 순위 조회, 종목 마스터 갱신)"""
+        # 기본 기능 테스트
+        if not self.test_basic_functions():
+            logger.error("기본 기능 테스트 실패")
+            return False
+
+        # 거래량 상위 종목 조회 기능 테스트
+        if not self.test_get_top_stocks_functions():
+            logger.error("거래량 상위 종목 조회 기능 테스트 실패")
+            return False
+
+        # 거래량 급증 상위 종목 조회 기능 테스트
+        if not self.test_get_upsurge_stocks_functions():
+            logger.error("거래량 급증 상위 종목 조회 기능 테스트 실패")
+            return False
+
+        # 종목 마스터 캐시/종목 속성 인덱스 (오늘자 캐시가 있으면 OCX 호출 생략, 없으면 이벤트 루프에서 나누어 갱신)
+        self.api.master_cache.ensure_async(self.api, on_done=lambda: self.api.universe.ensure_async(self.api))
+        return True
+    
+    def _run_deferred_startup_or_quit(self):
+        """빠른 시작 지연 단계 실행 (실패하면 이벤트 루프 종료)"""
+        if not self.run_deferred_startup():
+            logger.error("지연 시작 단계 실패, 프로그램을 종료합니다.")
+            self.api.app.quit()
+    
     def cleanup(self):
         """정리 작업"""
         try:
             logger.info("프로그램 정리 중...")
             
+            if Config.PROFILE_ENABLED:
+                from profiler import profiler
+                if profiler.running:
+                    profiler.stop()
+                    profiler.dump(Config.PROFILE_OUTPUT)
+            
+            if self.watchdog:
+                self.watchdog.stop()
+            
+            if self.pnl:
+                self.pnl.stop()
+            
+            if self.tick_recorder:
+                self.tick_recorder.stop()
+                self.tick_recorder = None
+            
+            if self.dashboard:
+                self.dashboard.stop()
+                self.dashboard = None
+            
+            if self.control_server:
+                self.control_server.stop()
+                self.control_server = None
+            
+            if self.order_channel:
+                self.order_channel.stop()
+                self.order_channel = None
+            
+            if self.quote_board:
+                self.quote_board.stop()
+                self.quote_board = None
+            
             if self.api:
+                self.api.subscriptions.stop()
+                self.api.hoga_subscriptions.stop()
                 self.api.disconnect()
             
+            if self.metrics_server:
+                self.metrics_server.stop()
+                self.metrics_server = None
+            
             self.running = False
             logger.info("프로그램이 정상적으로 종료되었습니다.")
             
@@ -0,0 +1,107 @@
+import os
+import json
+from datetime import date
+from PyQt5.QtCore import QTimer
+from logger import logger
+from config import Config
+
+
+def run_in_chunks(steps, chunk_size=None, on_done=None):
+    """단계 생성기를 이벤트 루프 한 번에 chunk_size단계씩 실행 (긴 OCX 조회로 Qt 스레드를 막지 않음)"""
+    chunk_size = chunk_size or Config.MASTER_REFRESH_CHUNK
+
+    def step():
+        try:
+            for _ in range(chunk_size):
+                next(steps)
+        except StopIteration:
+            if on_done:
+                on_done()
+            return
+        except Exception as e:
+            logger.log_error("RUN_IN_CHUNKS", str(e))
+            return
+        QTimer.singleShot(0, step)
+
+    QTimer.singleShot(0, step)
+
+
+class MasterCache:
+    """종목 마스터(시장별 종목코드, 종목명) 일별 디스크 캐시 클래스"""
+
+    MARKETS = {"0": "KOSPI", "10": "KOSDAQ"}
+
+    def __init__(self, path):
+        self.path = path
+        self.date = ""
+        self.markets = {}  # 시장구분 -> 종목코드 목록
+        self.names = {}  # 종목코드 -> 종목명
+
+    def is_fresh(self):
+        """오늘 생성된 캐시인지 확인"""
+        return self.date == date.today().isoformat() and bool(self.names)
+
+    def load(self):
+        """디스크에서 캐시 로드 (OCX 호출 없음)"""
+        try:
+            if not self.path or not os.path.exists(self.path):
+                return False
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            self.date = data.get("date", "")
+            self.markets = data.get("markets", {})
+            self.names = data.get("names", {})
+            return self.is_fresh()
+        except Exception as e:
+            logger.log_error("MASTER_CACHE_LOAD", str(e))
+            return False
+
+    def save(self):
+        """캐시를 디스크에 저장"""
+        try:
+            if not self.path:
+                return
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"date": self.date, "markets": self.markets, "names": self.names}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.log_error("MASTER_CACHE_SAVE", str(e))
+
+    def _refresh_steps(self, kiwoom_api):
+        """종목 마스터 갱신 단계 (종목마다 한 단계, 완료 시 캐시 교체)"""
+        markets = {}
+        names = {}
+        for market in self.MARKETS:
+            codes = [c for c in kiwoom_api.get_code_list_by_market(market).split(';') if c]
+            markets[market] = codes
+            for code in codes:
+                names[code] = kiwoom_api.get_master_code_name(code)
+                yield
+        self.markets = markets
+        self.names = names
+        self.date = date.today().isoformat()
+        self.save()
+        logger.info(f"종목 마스터 캐시 갱신: {len(names)}종목")
+
+    def refresh(self, kiwoom_api):
+        """OCX에서 종목 마스터를 다시 읽어 캐시 갱신"""
+        for _ in self._refresh_steps(kiwoom_api):
+            pass
+
+    def ensure(self, kiwoom_api):
+        """캐시가 오늘자가 아니면 갱신"""
+        if not self.is_fresh() and not self.load():
+            self.refresh(kiwoom_api)
+
+    def ensure_async(self, kiwoom_api, on_done=None):
+        """캐시가 오늘자가 아니면 이벤트 루프에서 나누어 갱신 (완료 시 on_done 호출)"""
+        if self.is_fresh() or self.load():
+            if on_done:
+                on_done()
+            return
+        run_in_chunks(self._refresh_steps(kiwoom_api), on_done=on_done)
+
+    def get_name(self, code):
+        """종목명 조회 (캐시에 없으면 빈 문자열)"""
+        return self.names.get(code, "")
@@ -0,0 +1,273 @@
+import json
+import time
+import inspect
+import functools
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from logger import logger
+from profiler import profiler
+
+
+class LatencyHistogram:
+    """HDR 방식 지연시간 히스토그램 (마이크로초 단위, 2의 거듭제곱 구간마다 16개 버킷)"""
+
+    SUB_BUCKET_BITS = 4
+    QUANTILES = (0.5, 0.9, 0.99, 0.999)
+
+    def __init__(self):
+        self.buckets = {}  # 버킷 하한(us) -> 건수
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = 0.0
+
+    def _bucket(self, micros):
+        """값이 속한 버킷의 하한과 폭 계산 (상대오차 약 6% 이내)"""
+        shift = max(micros.bit_length() - self.SUB_BUCKET_BITS - 1, 0)
+        return (micros >> shift) << shift, 1 << shift
+
+    def record(self, seconds):
+        """지연시간 기록"""
+        lower, _ = self._bucket(max(int(seconds * 1_000_000), 0))
+        self.buckets[lower] = self.buckets.get(lower, 0) + 1
+        self.count += 1
+        self.total += seconds
+        if self.min is None or seconds < self.min:
+            self.min = seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, q):
+        """분위수 조회 (초, 버킷 상한 기준)"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for lower in sorted(self.buckets):
+            seen += self.buckets[lower]
+            if seen >= target:
+                _, width = self._bucket(lower)
+                return min((lower + width - 1) / 1_000_000, self.max)
+        return self.max
+
+    def summary(self):
+        """요약 통계"""
+        summary = {
+            "count": self.count,
+            "sum": self.total,
+            "min": self.min or 0.0,
+            "max": self.max,
+        }
+        for q in self.QUANTILES:
+            summary[f"p{q * 100:g}"] = self.percentile(q)
+        return summary
+
+
+class Metrics:
+    """지연시간/카운터/게이지 수집 클래스"""
+
+    PREFIX = "kiwoom_"
+
+    def __init__(self):
+        self.histograms = {}  # (이름, 라벨) -> LatencyHistogram
+        self.counters = {}  # (이름, 라벨) -> 값
+        self.gauges = {}  # (이름, 라벨) -> 값 또는 조회 함수
+        self._marks = {}  # 비동기 구간 시작 시각
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def observe(self, name, seconds, **labels):
+        """지연시간 기록"""
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = LatencyHistogram()
+            histogram.record(seconds)
+
+    def inc(self, name, value=1, **labels):
+        """카운터 증가"""
+        key = self._key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set_gauge(self, name, value, **labels):
+        """게이지 설정 (값 또는 호출 시점에 값을 반환하는 함수)"""
+        with self._lock:
+            self.gauges[self._key(name, labels)] = value
+
+    def mark(self, token):
+        """비동기 구간 시작 (요청 전송 시점)"""
+        self._marks[token] = time.perf_counter()
+
+    def elapsed(self, token, name, **labels):
+        """비동기 구간 종료 후 기록 (시작 기록이 없으면 None)"""
+        start = self._marks.pop(token, None)
+        if start is None:
+            return None
+        seconds = time.perf_counter() - start
+        self.observe(name, seconds, **labels)
+        return seconds
+
+    def cancel(self, token):
+        """비동기 구간 취소 (요청 실패 시)"""
+        self._marks.pop(token, None)
+
+    def pending_marks(self):
+        """응답 대기 중인 비동기 구간 수"""
+        return len(self._marks)
+
+    def snapshot(self):
+        """전체 지표 스냅샷 (dict)"""
+        with self._lock:
+            histograms = list(self.histograms.items())
+            counters = list(self.counters.items())
+            gauges = list(self.gauges.items())
+
+        snapshot = {"timestamp": time.time(), "histograms": [], "counters": [], "gauges": []}
+        for (name, labels), histogram in histograms:
+            snapshot["histograms"].append(dict(name=name, labels=dict(labels), **histogram.summary()))
+        for (name, labels), value in counters:
+            snapshot["counters"].append({"name": name, "labels": dict(labels), "value": value})
+        for (name, labels), value in gauges:
+            try:
+                value = value() if callable(value) else value
+            except Exception as e:
+                logger.log_error("METRICS_GAUGE", f"{name}: {e}")
+                continue
+            snapshot["gauges"].append({"name": name, "labels": dict(labels), "value": value})
+        return snapshot
+
+    def render_prometheus(self):
+        """Prometheus 텍스트 형식 출력"""
+        def fmt_labels(labels, **extra):
+            items = list(labels.items()) + list(extra.items())
+            if not items:
+                return ""
+            return "{" + ",".join(f'{k}="{v}"' for k, v in items) + "}"
+
+        snapshot = self.snapshot()
+        lines = []
+        typed = set()
+        for h in sorted(snapshot["histograms"], key=lambda h: h["name"]):
+            name = self.PREFIX + h["name"]
+            if name not in typed:
+                lines.append(f"# TYPE {name} summary")
+                typed.add(name)
+            for q in LatencyHistogram.QUANTILES:
+                lines.append(f"{name}{fmt_labels(h['labels'], quantile=q)} {h[f'p{q * 100:g}']:.6f}")
+            lines.append(f"{name}_sum{fmt_labels(h['labels'])} {h['sum']:.6f}")
+            lines.append(f"{name}_count{fmt_labels(h['labels'])} {h['count']}")
+            lines.append(f"{name}_max{fmt_labels(h['labels'])} {h['max']:.6f}")
+        for kind, entries in (("counter", snapshot["counters"]), ("gauge", snapshot["gauges"])):
+            for entry in sorted(entries, key=lambda e: e["name"]):
+                name = self.PREFIX + entry["name"]
+                if name not in typed:
+                    lines.append(f"# TYPE {name} {kind}")
+                    typed.add(name)
+                lines.append(f"{name}{fmt_labels(entry['labels'])} {entry['value']}")
+        return "\n".join(lines) + "\n"
+
+    def write_snapshot(self, path):
+        """스냅샷 파일 저장 (JSON)"""
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(self.snapshot(), f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            logger.log_error("METRICS_SNAPSHOT", str(e))
+
+
+# 전역 지표 인스턴스
+metrics = Metrics()
+
+
+def timed(event, label=None):
+    """이벤트 핸들러 실행시간(이벤트 루프 점유시간) 측정 데코레이터
+
+    label: TR 코드, 실시간 타입 등 라벨로 사용할 핸들러 인자 이름
+    실행 중에는 프로파일러 샘플이 이 이벤트로 집계되도록 profiler.tag를 설정합니다.
+    """
+    def decorator(func):
+        index = list(inspect.signature(func).parameters).index(label) if label else None
+
+        @functools.wraps(func)
+        def wrapper(*args):
+            code = args[index] if index is not None and index < len(args) else ""
+            previous = profiler.tag
+            profiler.tag = (event, code)
+            start = time.perf_counter()
+            try:
+                return func(*args)
+            finally:
+                profiler.tag = previous
+                metrics.observe("handler_seconds", time.perf_counter() - start, event=event, code=code)
+        return wrapper
+    return decorator
+
+
+class MetricsServer:
+    """지표 조회용 로컬 HTTP 서버 (/metrics: Prometheus, /snapshot: JSON)"""
+
+    def __init__(self, port, host="127.0.0.1", snapshot_file="", snapshot_interval=10):
+        self.port = port
+        self.host = host
+        self.snapshot_file = snapshot_file
+        self.snapshot_interval = snapshot_interval
+        self._server = None
+        self._stop = threading.Event()
+
+    def start(self):
+        """서버 및 스냅샷 저장 스레드 시작 (Qt 이벤트 루프와 별도 스레드)"""
+        try:
+            if self.port:
+                self._server = ThreadingHTTPServer((self.host, self.port), _MetricsHandler)
+                self._server.daemon_threads = True
+                threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True).start()
+                logger.info(f"지표 서버 시작: http://{self.host}:{self.port}/metrics")
+            if self.snapshot_file:
+                threading.Thread(target=self._snapshot_loop, name="metrics-snapshot", daemon=True).start()
+            return True
+        except Exception as e:
+            logger.log_error("METRICS_SERVER", str(e))
+            return False
+
+    def stop(self):
+        """서버 종료 및 마지막 스냅샷 저장"""
+        self._stop.set()
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if self.snapshot_file:
+            metrics.write_snapshot(self.snapshot_file)
+
+    def _snapshot_loop(self):
+        while not self._stop.wait(self.snapshot_interval):
+            metrics.write_snapshot(self.snapshot_file)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """지표 HTTP 요청 처리"""
+
+    def do_GET(self):
+        if self.path.startswith("/metrics"):
+            body = metrics.render_prometheus().encode("utf-8")
+            content_type = "text/plain; version=0.0.4; charset=utf-8"
+        elif self.path.startswith("/snapshot"):
+            body = json.dumps(metrics.snapshot(), ensure_ascii=False).encode("utf-8")
+            content_type = "application/json; charset=utf-8"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """요청 로그 출력 안 함"""
+        pass
@@ -0,0 +1,127 @@
+import threading
+from collections import deque
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+from logger import logger
+from metrics import metrics
+
+
+class OrderBatch:
+    """일괄 주문 진행 상태 (전송 결과는 주문 순서대로 results에 기록)"""
+
+    def __init__(self, orders, on_done=None):
+        self.orders = list(orders)
+        self.results = []  # (주문, 성공 여부, 주문번호)
+        self.on_done = on_done
+        self.cancelled = False
+        self._remaining = len(self.orders)
+        self._done = threading.Event()
+        if not self.orders:
+            self._done.set()
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    @property
+    def sent(self):
+        return sum(1 for _, success, _ in self.results if success)
+
+    @property
+    def failed(self):
+        return sum(1 for _, success, _ in self.results if not success)
+
+    def wait(self, timeout=None):
+        """전송 완료 대기 (Qt 이벤트 루프가 아닌 스레드에서 사용)"""
+        return self._done.wait(timeout)
+
+    def cancel(self):
+        """아직 전송하지 않은 주문 취소"""
+        self.cancelled = True
+
+    def _finish(self):
+        self._done.set()
+        if self.on_done:
+            try:
+                self.on_done(self)
+            except Exception as e:
+                logger.log_error("ORDER_BATCH", str(e))
+
+
+class OrderQueue(QObject):
+    """주문 일괄 전송 대기열 (Qt 이벤트 루프에서 주문 요청 제한 속도에 맞춰 순차 전송)
+
+    주문: {"side": "buy" 또는 "sell", "code", "quantity", "price", "order_type": "시장가" 또는 "지정가", "venue": "KRX" 또는 "NXT"}
+    다른 스레드에서 submit해도 전송은 Qt 이벤트 루프 스레드에서 실행됩니다.
+    """
+
+    _wakeup = pyqtSignal()
+
+    def __init__(self, trading):
+        super().__init__()
+        self.trading = trading
+        self.limiter = trading.api.order_limiter
+        self._queue = deque()  # (배치, 주문)
+        self._lock = threading.Lock()
+        self._scheduled = False
+        self._sending = False
+        self._wakeup.connect(self._schedule)
+        metrics.set_gauge("order_queue_pending", self.pending, owner=trading.owner)
+
+    def submit(self, orders, on_done=None):
+        """주문 목록을 한 배치로 등록 (OrderBatch 반환)"""
+        batch = OrderBatch(orders, on_done)
+        if batch.done:
+            return batch
+        with self._lock:
+            for order in batch.orders:
+                self._queue.append((batch, order))
+        logger.info(f"일괄 주문 등록: {len(batch.orders)}건 ({self.trading.owner})")
+        self._wakeup.emit()
+        return batch
+
+    def pending(self):
+        """전송 대기 중인 주문 건수"""
+        with self._lock:
+            return len(self._queue)
+
+    def _schedule(self, delay=0.0):
+        if self._scheduled:
+            return
+        self._scheduled = True
+        QTimer.singleShot(int(delay * 1000), self._drain)
+
+    def _drain(self):
+        """요청 슬롯이 있으면 한 건 전송, 없으면 슬롯이 날 때까지 타이머로 대기 (이벤트 루프를 막지 않음)"""
+        self._scheduled = False
+        if self._sending:  # 접수 결과 대기 중 재진입
+            return
+        with self._lock:
+            if not self._queue:
+                return
+        delay = self.limiter.available_in()
+        if delay > 0:
+            self._schedule(delay)
+            return
+
+        with self._lock:
+            batch, order = self._queue.popleft()
+            batch._remaining -= 1
+            last = batch._remaining == 0
+        try:
+            if not batch.cancelled:
+                self._sending = True
+                success, order_no = self._send(order)
+                batch.results.append((order, success, order_no))
+        finally:
+            self._sending = False
+            if last:
+                batch._finish()
+            if self.pending():
+                self._schedule()
+
+    def _send(self, order):
+        """주문 한 건 전송 (성공 여부, 주문번호)"""
+        trading = self.trading
+        send = trading.buy_stock if order["side"] == "buy" else trading.sell_stock
+        success = send(order["code"], order["quantity"], order.get("price", 0), order.get("order_type", "시장가"), venue=order.get("venue", ""))
+        return success, trading.order_result.get("order_no", "") if success else ""
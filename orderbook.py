@@ -0,0 +1,169 @@
+import time
+import numpy as np
+from logger import logger
+
+DEPTH = 10
+ASK_PRICE_FIDS = tuple(range(41, 41 + DEPTH))  # 매도호가1~10
+BID_PRICE_FIDS = tuple(range(51, 51 + DEPTH))  # 매수호가1~10
+ASK_SIZE_FIDS = tuple(range(61, 61 + DEPTH))  # 매도호가수량1~10
+BID_SIZE_FIDS = tuple(range(71, 71 + DEPTH))  # 매수호가수량1~10
+LEVEL_FIDS = ASK_PRICE_FIDS + BID_PRICE_FIDS + ASK_SIZE_FIDS + BID_SIZE_FIDS
+FID_HOGA_TIME = 21  # 호가시간
+FID_TOTAL_ASK = 121  # 매도호가총잔량
+FID_TOTAL_BID = 125  # 매수호가총잔량
+HOGA_FIDS = ";".join(str(fid) for fid in (FID_HOGA_TIME, ASK_PRICE_FIDS[0], BID_PRICE_FIDS[0], FID_TOTAL_ASK, FID_TOTAL_BID))  # 실시간 등록 FID
+
+# 행 인덱스
+ASK_PRICE, BID_PRICE, ASK_SIZE, BID_SIZE = range(4)
+
+
+class OrderBookSnapshot:
+    """호가 스냅샷 (읽기 전용 복사본)"""
+
+    __slots__ = ("code", "levels", "total_ask", "total_bid", "spread", "mid", "imbalance", "microprice", "hoga_time", "timestamp")
+
+    def __init__(self, code, levels, total_ask, total_bid, derived, hoga_time, timestamp):
+        self.code = code
+        self.levels = levels
+        self.total_ask = total_ask
+        self.total_bid = total_bid
+        self.spread, self.mid, self.imbalance, self.microprice = derived
+        self.hoga_time = hoga_time
+        self.timestamp = timestamp
+
+    @property
+    def ask_prices(self):
+        return self.levels[ASK_PRICE]
+
+    @property
+    def bid_prices(self):
+        return self.levels[BID_PRICE]
+
+    @property
+    def ask_sizes(self):
+        return self.levels[ASK_SIZE]
+
+    @property
+    def bid_sizes(self):
+        return self.levels[BID_SIZE]
+
+    @property
+    def best_ask(self):
+        return int(self.levels[ASK_PRICE, 0])
+
+    @property
+    def best_bid(self):
+        return int(self.levels[BID_PRICE, 0])
+
+
+class OrderBook:
+    """종목별 10단계 호가 (고정 크기 배열 제자리 갱신, 시퀀스 번호로 잠금 없는 읽기)"""
+
+    def __init__(self, code):
+        self.code = code
+        self.levels = np.zeros((4, DEPTH), dtype=np.int64)  # 매도가, 매수가, 매도잔량, 매수잔량
+        self.derived = np.zeros(4, dtype=np.float64)  # 스프레드, 중간가, 잔량 불균형, 마이크로가격
+        self.total_ask = 0
+        self.total_bid = 0
+        self.hoga_time = ""
+        self.timestamp = 0.0
+        self.updates = 0
+        self.version = 0  # 홀수면 갱신 중
+
+    def update(self, values, total_ask, total_bid, hoga_time=""):
+        """호가 갱신 (values: LEVEL_FIDS 순서의 40개 정수)"""
+        self.version += 1
+        self.levels.reshape(-1)[:] = values
+        self.total_ask = total_ask
+        self.total_bid = total_bid
+        self.hoga_time = hoga_time
+        self.timestamp = time.time()
+        self.updates += 1
+        self._update_derived()
+        self.version += 1
+
+    def _update_derived(self):
+        """최우선호가 기준 파생값 갱신 (O(1))"""
+        ask = self.levels[ASK_PRICE, 0]
+        bid = self.levels[BID_PRICE, 0]
+        ask_size = self.levels[ASK_SIZE, 0]
+        bid_size = self.levels[BID_SIZE, 0]
+        derived = self.derived
+        if ask and bid:
+            derived[0] = ask - bid
+            derived[1] = (ask + bid) / 2
+        else:
+            derived[0] = 0.0
+            derived[1] = ask or bid
+        depth = self.total_ask + self.total_bid
+        derived[2] = (self.total_bid - self.total_ask) / depth if depth else 0.0
+        top = ask_size + bid_size
+        derived[3] = (ask * bid_size + bid * ask_size) / top if top and ask and bid else derived[1]
+
+    def snapshot(self):
+        """일관된 스냅샷 조회 (갱신 중이면 재시도, 잠금 없음)"""
+        while True:
+            version = self.version
+            if version & 1:
+                time.sleep(0)  # 갱신 중인 스레드에 양보
+                continue
+            levels = self.levels.copy()
+            derived = tuple(float(v) for v in self.derived)
+            total_ask, total_bid = self.total_ask, self.total_bid
+            hoga_time, timestamp = self.hoga_time, self.timestamp
+            if self.version == version:
+                return OrderBookSnapshot(self.code, levels, total_ask, total_bid, derived, hoga_time, timestamp)
+
+
+class OrderBookStore:
+    """실시간 호가잔량(주식호가잔량) 수신 및 종목별 호가 보관 클래스"""
+
+    REAL_TYPE = "주식호가잔량"
+
+    def __init__(self):
+        self.api = None
+        self.books = {}  # 종목코드 -> OrderBook
+
+    def attach(self, kiwoom_api):
+        """실시간 데이터 처리기로 등록"""
+        self.api = kiwoom_api
+        kiwoom_api.add_real_data_handler(self.REAL_TYPE, self.on_real_data)
+
+    def subscribe(self, codes, owner="order_book"):
+        """호가 실시간 등록 (api.hoga_subscriptions에 owner 참조 추가)"""
+        self.api.hoga_subscriptions.acquire(owner, codes)
+
+    def unsubscribe(self, codes=None, owner="order_book"):
+        """호가 실시간 참조 해제 (codes가 없으면 owner 전체)"""
+        self.api.hoga_subscriptions.release(owner, codes)
+
+    def _get_int(self, code, fid):
+        value = self.api.ocx.GetCommRealData(code, fid).strip()
+        try:
+            return abs(int(value))
+        except ValueError:
+            return 0
+
+    def on_real_data(self, code, real_type):
+        """주식호가잔량 수신 처리"""
+        try:
+            book = self.books.get(code)
+            if book is None:
+                book = self.books[code] = OrderBook(code)
+            book.update(
+                [self._get_int(code, fid) for fid in LEVEL_FIDS],
+                self._get_int(code, FID_TOTAL_ASK),
+                self._get_int(code, FID_TOTAL_BID),
+                self.api.ocx.GetCommRealData(code, FID_HOGA_TIME).strip(),
+            )
+        except Exception as e:
+            logger.log_error("ORDERBOOK", f"{code}: {e}")
+
+    def get(self, code):
+        """종목 호가 조회 (없으면 None)"""
+        return self.books.get(code)
+
+    def snapshot(self, code):
+        """종목 호가 스냅샷 (없으면 None)"""
+        book = self.books.get(code)
+        return book.snapshot() if book else None
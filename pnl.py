@@ -0,0 +1,214 @@
+import time
+import numpy as np
+from PyQt5.QtCore import QTimer
+from logger import logger
+from config import Config
+from metrics import metrics
+
+REAL_TYPE_TRADE = "주식체결"
+SUBSCRIPTION_OWNER = "pnl"  # 실시간 등록 구독자 이름 (api.subscriptions)
+FID_PRICE = 10  # 현재가
+
+
+class PnLEngine:
+    """실시간 평가손익 계산 클래스 (전 계좌 보유 종목을 배열로 관리, 체결마다 변경분만 갱신)
+
+    - 평가손익/평가금액: 주식체결 현재가 수신 시 해당 종목 슬롯만 갱신 (포트폴리오 합계도 변경분으로 갱신)
+    - 실현손익/수수료/세금: 주문 체결(체결잔고)의 체결가와 매입단가로 계산
+    - 스냅샷: snapshot_interval초마다 변경이 있을 때만 생성하여 구독자에게 전달
+    """
+
+    def __init__(self, kiwoom_api, snapshot_interval=None, fee_rate=None, tax_rate=None):
+        self.api = kiwoom_api
+        self.snapshot_interval = snapshot_interval or Config.PNL_SNAPSHOT_INTERVAL
+        self.fee_rate = fee_rate if fee_rate is not None else Config.FEE_RATE
+        self.tax_rate = tax_rate if tax_rate is not None else Config.SELL_TAX_RATE
+
+        # 슬롯 배열 ((계좌번호, 종목코드)마다 한 슬롯)
+        self.keys = []  # 슬롯 번호 -> (계좌번호, 종목코드)
+        self.index = {}  # (계좌번호, 종목코드) -> 슬롯 번호
+        self.code_slots = {}  # 종목코드 -> 슬롯 번호 목록
+        self.quantity = np.zeros(0, dtype=np.int64)
+        self.avg_price = np.zeros(0, dtype=np.int64)
+        self.price = np.zeros(0, dtype=np.int64)
+
+        # 포트폴리오 합계 (변경분으로 갱신)
+        self.total_cost = 0
+        self.total_value = 0
+        self.realized = 0
+        self.fees = 0
+        self.taxes = 0
+
+        self.subscribers = []  # 스냅샷 수신 함수 목록
+        self.book_listeners = {}  # 계좌번호 -> 등록한 장부 변경 통지 함수 (stop에서 해제)
+        self.last_snapshot = None
+        self.ticks = 0
+        self._dirty = True
+        self.timer = QTimer()
+        self.timer.timeout.connect(self._publish)
+
+    # 시작/중지
+    def start(self):
+        """계좌 장부 변경 통지/실시간 체결 처리기 등록 및 보유 종목 현재가 실시간 등록 (중지 후 다시 시작 가능)"""
+        if self.timer.isActive():
+            return
+        for accno, book in self.api.account_books.items():
+            listener = self.book_listeners[accno] = self._listener(accno)
+            positions, _ = book.snapshot(listener)
+            for code, position in positions.items():
+                self._set_position(accno, code, position)
+            # 중지 중에 없어진 보유 종목 정리 (다시 시작한 경우)
+            for key_accno, code in list(self.keys):
+                if key_accno == accno and code not in positions:
+                    self._set_position(accno, code, None)
+        self.api.add_real_data_handler(REAL_TYPE_TRADE, self.on_trade)
+        self.api.subscriptions.acquire(SUBSCRIPTION_OWNER, list(self.code_slots))
+        for name in ("value", "unrealized", "realized", "fees", "taxes"):
+            metrics.set_gauge(f"pnl_{name}", lambda name=name: self.totals()[name])
+        self.timer.start(int(self.snapshot_interval * 1000))
+        logger.info(f"실시간 손익 계산 시작: {len(self.keys)}개 보유 종목")
+
+    def stop(self):
+        """장부 변경 통지/실시간 체결 처리기 해제 및 현재가 실시간 참조 해제"""
+        self.timer.stop()
+        for accno, listener in self.book_listeners.items():
+            self.api.account_books[accno].remove_listener(listener)
+        self.book_listeners.clear()
+        self.api.remove_real_data_handler(REAL_TYPE_TRADE, self.on_trade)
+        self.api.subscriptions.release(SUBSCRIPTION_OWNER)
+
+    def subscribe(self, callback):
+        """스냅샷 구독 (callback(snapshot))"""
+        self.subscribers.append(callback)
+
+    # 슬롯 관리
+    def _slot(self, accno, code):
+        key = (accno, code)
+        i = self.index.get(key)
+        if i is None:
+            i = len(self.keys)
+            if i >= len(self.quantity):  # 용량 2배 확장
+                size = max(2 * i, 64)
+                self.quantity = np.resize(self.quantity, size)
+                self.avg_price = np.resize(self.avg_price, size)
+                self.price = np.resize(self.price, size)
+                self.quantity[i:] = self.avg_price[i:] = self.price[i:] = 0
+            self.keys.append(key)
+            self.index[key] = i
+            new_code = code not in self.code_slots
+            self.code_slots.setdefault(code, []).append(i)
+            if new_code and self.timer.isActive():
+                self.api.subscriptions.acquire(SUBSCRIPTION_OWNER, [code])
+        return i
+
+    def _set_position(self, accno, code, position):
+        """보유수량/매입단가 변경 반영 (합계는 변경분만 갱신)"""
+        i = self._slot(accno, code)
+        quantity = position["quantity"] if position else 0
+        avg_price = position.get("purchase_price", 0) if position else 0
+        price = int(self.price[i]) or (position.get("current_price", 0) if position else 0) or avg_price
+        self.total_cost += quantity * avg_price - int(self.quantity[i] * self.avg_price[i])
+        self.total_value += quantity * price - int(self.quantity[i] * self.price[i])
+        self.quantity[i], self.avg_price[i], self.price[i] = quantity, avg_price, price
+        self._dirty = True
+
+    # 이벤트 처리
+    def on_trade(self, code, real_type):
+        """주식체결 현재가 수신 (해당 종목 슬롯만 갱신)"""
+        slots = self.code_slots.get(code)
+        if not slots:
+            return
+        try:
+            price = abs(int(self.api.ocx.GetCommRealData(code, FID_PRICE).strip()))
+        except ValueError:
+            return
+        if not price:
+            return
+        for i in slots:
+            self.total_value += int(self.quantity[i]) * (price - int(self.price[i]))
+            self.price[i] = price
+        self.ticks += 1
+        self._dirty = True
+
+    def _listener(self, accno):
+        def on_book_update(kind, key, old, new):
+            if kind == "position":
+                self._set_position(accno, key, new)
+            elif kind == "order":
+                self._on_order(accno, old, new)
+        return on_book_update
+
+    def _on_order(self, accno, old, new):
+        """주문 체결분의 실현손익/수수료/세금 반영 (체결가가 있는 체결 통보만)"""
+        filled = new.get("filled", 0) - (old or {}).get("filled", 0)
+        fill_price = new.get("filled_price", 0)
+        if filled <= 0 or not fill_price:
+            return
+        amount = filled * fill_price
+        fee = int(amount * self.fee_rate)
+        self.fees += fee
+        if new.get("order_type") == 2:  # 매도: 체결 전 매입단가 기준 실현손익
+            tax = int(amount * self.tax_rate)
+            i = self.index.get((accno, new.get("code")))
+            avg_price = int(self.avg_price[i]) if i is not None else fill_price
+            self.taxes += tax
+            self.realized += (fill_price - avg_price) * filled
+        self._dirty = True
+
+    # 조회
+    def totals(self):
+        """포트폴리오 합계"""
+        unrealized = self.total_value - self.total_cost
+        net = self.realized - self.fees - self.taxes
+        return {
+            "cost": self.total_cost,
+            "value": self.total_value,
+            "unrealized": unrealized,
+            "return_rate": round(unrealized / self.total_cost * 100, 2) if self.total_cost else 0.0,
+            "realized": self.realized,
+            "fees": self.fees,
+            "taxes": self.taxes,
+            "net_realized": net,
+            "total_pnl": unrealized + net,
+        }
+
+    def snapshot(self):
+        """종목별/계좌별/전체 손익 스냅샷"""
+        n = len(self.keys)
+        quantity, avg_price, price = self.quantity[:n], self.avg_price[:n], self.price[:n]
+        cost = quantity * avg_price
+        value = quantity * price
+        unrealized = value - cost
+        rate = np.divide(unrealized * 100.0, cost, out=np.zeros(n), where=cost > 0)
+
+        positions = []
+        accounts = {}
+        for i in np.nonzero(quantity)[0]:
+            accno, code = self.keys[i]
+            positions.append({
+                "accno": accno,
+                "code": code,
+                "quantity": int(quantity[i]),
+                "avg_price": int(avg_price[i]),
+                "price": int(price[i]),
+                "value": int(value[i]),
+                "unrealized": int(unrealized[i]),
+                "return_rate": round(float(rate[i]), 2),
+            })
+            account = accounts.setdefault(accno, {"cost": 0, "value": 0, "unrealized": 0})
+            account["cost"] += int(cost[i])
+            account["value"] += int(value[i])
+            account["unrealized"] += int(unrealized[i])
+        return {"timestamp": time.time(), "positions": positions, "accounts": accounts, "total": self.totals()}
+
+    def _publish(self):
+        """변경이 있으면 스냅샷 생성 후 구독자에게 전달 (타이머 호출)"""
+        if not self._dirty:
+            return
+        self._dirty = False
+        try:
+            self.last_snapshot = self.snapshot()
+            for callback in self.subscribers:
+                callback(self.last_snapshot)
+        except Exception as e:
+            logger.log_error("PNL_SNAPSHOT", str(e))
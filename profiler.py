@@ -0,0 +1,91 @@
+import os
+import sys
+import time
+import threading
+from logger import logger
+
+
+class SamplingProfiler:
+    """이벤트 루프 스레드 샘플링 프로파일러
+
+    - 별도 스레드가 interval초마다 대상 스레드의 Python 호출 스택을 읽어 스택별 샘플 수를 누적합니다.
+    - timed 데코레이터가 실행 중인 이벤트(OCX 이벤트, TR 코드/실시간 타입)를 tag에 기록하므로, 샘플마다 스택 맨 앞에 이벤트가 붙습니다.
+    - dump()는 flamegraph.pl, speedscope 등에서 읽을 수 있는 접힌 스택(collapsed stack) 형식으로 저장합니다.
+    """
+
+    MAX_DEPTH = 64
+
+    def __init__(self):
+        self.tag = None  # 실행 중인 이벤트 (이벤트명, 라벨), timed 데코레이터가 설정
+        self.running = False
+        self.samples = {}  # 접힌 스택 -> 샘플 수
+        self.tag_samples = {}  # 이벤트 -> 샘플 수
+        self.total = 0
+        self.started_at = None
+        self._frame_names = {}  # 코드 객체 -> 프레임 이름
+        self._thread = None
+        self._stop = threading.Event()
+
+    def start(self, interval=0.005, thread_id=None):
+        """샘플링 시작 (thread_id가 없으면 메인 스레드, Qt 이벤트 루프 스레드)"""
+        if self.running:
+            return
+        self.interval = interval
+        self.target = thread_id or threading.main_thread().ident
+        self.running = True
+        self.started_at = time.time()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="profiler", daemon=True)
+        self._thread.start()
+        logger.info(f"프로파일링 시작: {interval * 1000:g}ms 간격")
+
+    def stop(self):
+        if not self.running:
+            return
+        self._stop.set()
+        self._thread.join()
+        self.running = False
+
+    def _frame_name(self, code):
+        name = self._frame_names.get(code)
+        if name is None:
+            name = self._frame_names[code] = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+        return name
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.target)
+            if frame is None:
+                continue
+            tag = self.tag
+            stack = []
+            while frame is not None and len(stack) < self.MAX_DEPTH:
+                stack.append(self._frame_name(frame.f_code))
+                frame = frame.f_back
+            event = f"{tag[0]}[{tag[1]}]" if tag and tag[1] else (tag[0] if tag else "(핸들러 외)")
+            stack.append(event)
+            key = ";".join(reversed(stack))
+            self.samples[key] = self.samples.get(key, 0) + 1
+            self.tag_samples[event] = self.tag_samples.get(event, 0) + 1
+            self.total += 1
+
+    def top(self, n=10):
+        """샘플 비율 상위 이벤트 [(이벤트, 샘플 수, 비율%)]"""
+        ranked = sorted(self.tag_samples.items(), key=lambda item: item[1], reverse=True)[:n]
+        return [(event, count, round(count / self.total * 100, 1)) for event, count in ranked]
+
+    def dump(self, path):
+        """접힌 스택 형식으로 저장 ("이벤트;프레임;...;프레임 샘플수" 한 줄씩)"""
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                for key, count in sorted(self.samples.items()):
+                    f.write(f"{key} {count}\n")
+            logger.info(f"프로파일 저장: {path} ({self.total}샘플, {time.time() - self.started_at:.0f}초)")
+            for event, count, share in self.top():
+                logger.info(f"  {event}: {count}샘플 ({share}%)")
+        except Exception as e:
+            logger.log_error("PROFILER_DUMP", str(e))
+
+
+# 전역 프로파일러 인스턴스
+profiler = SamplingProfiler()
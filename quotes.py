@@ -0,0 +1,48 @@
+import time
+import numpy as np
+
+
+class QuoteSnapshot:
+    """복수 종목 시세 스냅샷 (컬럼별 NumPy 배열)"""
+
+    FIELDS = ("price", "change", "volume", "ask", "bid")
+
+    def __init__(self, codes, columns=None, timestamp=None):
+        self.codes = list(codes)
+        self.index = {code: i for i, code in enumerate(self.codes)}
+        self.timestamp = timestamp or time.time()
+        columns = columns or {}
+        for field in self.FIELDS:
+            values = columns.get(field)
+            if values is None:
+                values = np.zeros(len(self.codes), dtype=np.int64)
+            setattr(self, field, np.asarray(values, dtype=np.int64))
+
+    @classmethod
+    def from_rows(cls, codes, rows):
+        """종목코드 순서에 맞춰 행(dict) 목록을 컬럼으로 변환 (누락 종목은 0)"""
+        snapshot = cls(codes)
+        for row in rows:
+            i = snapshot.index.get(row["code"])
+            if i is None:
+                continue
+            for field in cls.FIELDS:
+                getattr(snapshot, field)[i] = row[field]
+        return snapshot
+
+    def __len__(self):
+        return len(self.codes)
+
+    def get(self, code):
+        """단일 종목 시세 (없으면 None)"""
+        i = self.index.get(code)
+        if i is None:
+            return None
+        quote = {"code": code}
+        for field in self.FIELDS:
+            quote[field] = int(getattr(self, field)[i])
+        return quote
+
+    def to_records(self):
+        """종목별 dict 목록"""
+        return [self.get(code) for code in self.codes]
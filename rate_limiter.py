@@ -0,0 +1,122 @@
+import time
+import threading
+from collections import deque, OrderedDict, defaultdict
+from PyQt5.QtCore import QObject, QTimer, QEventLoop, pyqtSignal
+from logger import logger
+from metrics import metrics
+
+
+class RateLimiter(QObject):
+    """요청 횟수 제한 클래스 (슬라이딩 윈도우 + 요청자별 대기열 라운드로빈)
+
+    슬롯을 기다리는 요청은 요청자별 대기열에 넣고 Qt 타이머로 처리하므로 Qt 이벤트 루프를 재우지 않습니다.
+    """
+
+    _wakeup = pyqtSignal()
+
+    def __init__(self, name, max_calls, period=1.0):
+        super().__init__()
+        self.name = name
+        self.max_calls = max_calls
+        self.period = period
+        self.usage = defaultdict(int)  # 요청자별 누적 사용 횟수
+
+        self._calls = deque()  # 윈도우 내 요청 시각
+        self._queues = OrderedDict()  # 요청자 -> 대기 요청 (등록 시각, 콜백) (앞에서부터 순번)
+        self._lock = threading.Lock()
+        self._scheduled = False
+        self._wakeup.connect(self._schedule)
+
+    def _delay(self, now):
+        """다음 슬롯까지 남은 시간 (잠금 안에서 호출)"""
+        while self._calls and now - self._calls[0] >= self.period:
+            self._calls.popleft()
+        if len(self._calls) >= self.max_calls:
+            return self.period - (now - self._calls[0])
+        return 0.0
+
+    def _take(self, owner, now):
+        self._calls.append(now)
+        self.usage[owner] += 1
+
+    def try_acquire(self, owner="default"):
+        """슬롯이 바로 있으면 확보 (대기 중인 요청이 있으면 양보, 대기하지 않음)"""
+        with self._lock:
+            now = time.monotonic()
+            if self._queues or self._delay(now) > 0:
+                return False
+            self._take(owner, now)
+        metrics.observe("rate_limit_wait_seconds", 0.0, limiter=self.name)
+        return True
+
+    def submit(self, owner, callback):
+        """슬롯이 나면 Qt 이벤트 루프에서 callback 실행 (요청자별 대기열, 다른 스레드에서도 호출 가능)"""
+        with self._lock:
+            self._queues.setdefault(owner, deque()).append((time.monotonic(), callback))
+        self._wakeup.emit()
+
+    def acquire(self, owner="default"):
+        """요청 슬롯 확보 (차례가 올 때까지 Qt 이벤트를 계속 처리하며 대기, 대기한 시간(초) 반환)
+
+        Qt 이벤트 루프 스레드에서만 호출합니다. (다른 스레드는 submit 사용)
+        """
+        if self.try_acquire(owner):
+            return 0.0
+        start = time.monotonic()
+        loop = QEventLoop()
+        granted = []
+
+        def on_slot():
+            granted.append(True)
+            loop.exit()
+
+        self.submit(owner, on_slot)
+        while not granted:
+            loop.exec_()
+        return time.monotonic() - start
+
+    def _schedule(self, delay=0.0):
+        if self._scheduled:
+            return
+        self._scheduled = True
+        QTimer.singleShot(int(delay * 1000), self._drain)
+
+    def _drain(self):
+        """슬롯이 있는 만큼 대기 요청 처리 (요청자 순번 라운드로빈), 남으면 다음 슬롯 시각에 다시 실행"""
+        self._scheduled = False
+        while True:
+            with self._lock:
+                if not self._queues:
+                    return
+                now = time.monotonic()
+                delay = self._delay(now)
+                if delay > 0:
+                    break
+                owner, queue = next(iter(self._queues.items()))
+                enqueued, callback = queue.popleft()
+                # 처리된 요청자는 순번의 맨 뒤로 이동 (라운드로빈)
+                del self._queues[owner]
+                if queue:
+                    self._queues[owner] = queue
+                self._take(owner, now)
+            metrics.observe("rate_limit_wait_seconds", now - enqueued, limiter=self.name)
+            try:
+                callback()
+            except Exception as e:
+                logger.log_error("RATE_LIMITER", f"{self.name}: {e}")
+        self._schedule(delay)
+
+    def available_in(self):
+        """다음 요청 슬롯까지 남은 시간(초) (바로 가능하면 0, 대기하지 않음)"""
+        with self._lock:
+            delay = self._delay(time.monotonic())
+            if delay > 0:
+                return delay
+            if self._queues:
+                return self.period / self.max_calls  # 대기 중인 요청자에게 양보
+            return 0.0
+
+    def pending(self):
+        """대기 중인 요청 건수"""
+        with self._lock:
+            return sum(len(queue) for queue in self._queues.values())
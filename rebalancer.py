@@ -0,0 +1,265 @@
+import threading
+import numpy as np
+from PyQt5.QtCore import QTimer
+from logger import logger
+
+
+class RebalancePlan:
+    """리밸런싱 계획 (종목 순서의 현재/목표 수량 벡터와 주문 목록)"""
+
+    def __init__(self, codes, prices, current, target, orders, available_funds, lot_size=1):
+        self.codes = codes
+        self.prices = prices
+        self.current = current
+        self.target = target
+        self.orders = orders  # 매도 후 매수 순서
+        self.available_funds = available_funds
+        self.lot_size = lot_size
+
+    @property
+    def sell_value(self):
+        return sum(o["quantity"] * o["price_estimate"] for o in self.orders if o["side"] == "sell")
+
+    @property
+    def buy_value(self):
+        return sum(o["quantity"] * o["price_estimate"] for o in self.orders if o["side"] == "buy")
+
+    def summary(self):
+        """계획 요약"""
+        return {
+            "codes": len(self.codes),
+            "sell_orders": sum(1 for o in self.orders if o["side"] == "sell"),
+            "buy_orders": sum(1 for o in self.orders if o["side"] == "buy"),
+            "sell_value": self.sell_value,
+            "buy_value": self.buy_value,
+            "available_funds": self.available_funds,
+            "current_value": int(self.current @ self.prices),
+            "target_value": int(self.target @ self.prices),
+        }
+
+
+class RebalanceExecution:
+    """리밸런싱 실행 상태 (매도 배치 전송 -> 매도 체결 확인 -> 매수 배치 전송, OrderBatch와 같은 방식으로 조회)"""
+
+    def __init__(self, trading, plan, on_done=None, sell_timeout=60.0):
+        self.trading = trading
+        self.plan = plan
+        self.on_done = on_done
+        self.sell_timeout = sell_timeout
+        self.sells = [o for o in plan.orders if o["side"] == "sell"]
+        self.buys = [o for o in plan.orders if o["side"] == "buy"]
+        self.sell_batch = None
+        self.buy_batch = None
+        self.sell_order_nos = set()  # 체결 대기 매도 주문번호
+        self.sell_fills = {}  # 주문번호 -> 매도 체결 대금
+        self.proceeds = 0  # 매수 전송 시점의 매도 체결 대금
+        self.cancelled = False
+        self._sells_sent = False
+        self._buys_started = False
+        self._done = threading.Event()
+        self.timer = QTimer()
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self._on_sell_timeout)
+
+    @property
+    def results(self):
+        """(주문, 성공 여부, 주문번호) 전송 순서대로"""
+        return [r for batch in (self.sell_batch, self.buy_batch) if batch for r in batch.results]
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    @property
+    def sent(self):
+        return sum(1 for _, success, _ in self.results if success)
+
+    @property
+    def failed(self):
+        return sum(1 for _, success, _ in self.results if not success)
+
+    def wait(self, timeout=None):
+        """완료 대기 (Qt 이벤트 루프가 아닌 스레드에서 사용)"""
+        return self._done.wait(timeout)
+
+    def cancel(self):
+        """아직 전송하지 않은 주문 취소 (매수 전이면 매수는 전송하지 않음)"""
+        self.cancelled = True
+        for batch in (self.sell_batch, self.buy_batch):
+            if batch:
+                batch.cancel()
+        if not self._buys_started:
+            self._finish()
+
+    def start(self):
+        if not self.sells:
+            self._send_buys()
+            return
+        self.trading.book.add_listener(self._on_book_update)
+        self.sell_batch = self.trading.order_queue.submit(self.sells, self._on_sells_sent)
+
+    def _on_sells_sent(self, batch):
+        """매도 배치 전송 완료 (이미 체결된 주문 제외 후 체결 대기)"""
+        self._sells_sent = True
+        orders = self.trading.book.orders
+        self.sell_order_nos = {no for _, success, no in batch.results if success and orders.get(no, {}).get("unfilled", 1) > 0}
+        if self.cancelled:
+            self._finish()
+        elif not self.sell_order_nos:
+            self._send_buys()
+        else:
+            logger.info(f"리밸런싱 매도 체결 대기: {len(self.sell_order_nos)}건")
+            self.timer.start(int(self.sell_timeout * 1000))
+
+    def _on_book_update(self, kind, key, old, new):
+        if kind != "order" or new is None or new.get("order_type") != 2:
+            return
+        filled = new.get("filled", 0) - (old or {}).get("filled", 0)
+        if filled > 0:
+            self.sell_fills[key] = self.sell_fills.get(key, 0) + filled * (new.get("filled_price") or new.get("price", 0))
+        if self._sells_sent and key in self.sell_order_nos and new.get("unfilled", 0) <= 0:
+            self.sell_order_nos.discard(key)
+            if not self.sell_order_nos and not self.cancelled:
+                self._send_buys()
+
+    def _on_sell_timeout(self):
+        logger.warning(f"리밸런싱 매도 체결 대기 시간 초과: 미체결 {len(self.sell_order_nos)}건, 체결 대금 기준으로 매수 전송")
+        self._send_buys()
+
+    def _send_buys(self):
+        """주문 가능 금액 + 실제 매도 체결 대금 안에서 매수 배치 전송"""
+        if self._buys_started:
+            return
+        self._buys_started = True
+        self.timer.stop()
+        self.trading.book.remove_listener(self._on_book_update)
+        if self.sell_batch:
+            sent = {no for _, success, no in self.sell_batch.results if success}
+            self.proceeds = sum(value for no, value in self.sell_fills.items() if no in sent)
+
+        budget = self.plan.available_funds + self.proceeds
+        buy_value = sum(o["quantity"] * o["price_estimate"] for o in self.buys)
+        buys = self.buys
+        if buy_value > budget:
+            scale = budget / buy_value
+            lot = self.plan.lot_size
+            buys = [dict(o, quantity=int(o["quantity"] * scale // lot * lot)) for o in self.buys]
+            buys = [o for o in buys if o["quantity"] > 0]
+            logger.info(f"리밸런싱 매수 축소: {buy_value:,}원 -> 예산 {budget:,}원")
+        if self.cancelled or not buys:
+            self._finish()
+            return
+        self.buy_batch = self.trading.order_queue.submit(buys, lambda batch: self._finish())
+
+    def _finish(self):
+        if self.done:
+            return
+        self.timer.stop()
+        self.trading.book.remove_listener(self._on_book_update)
+        self._done.set()
+        logger.info(f"리밸런싱 완료: 전송 {self.sent}건, 실패 {self.failed}건, 매도 체결 대금 {self.proceeds:,}원")
+        if self.on_done:
+            try:
+                self.on_done(self)
+            except Exception as e:
+                logger.log_error("REBALANCE_EXECUTE", str(e))
+
+
+class Rebalancer:
+    """목표 포트폴리오 리밸런싱 클래스 (보유 종목과의 차이를 최소 주문 집합으로 계산하여 일괄 전송)"""
+
+    def __init__(self, trading):
+        self.trading = trading
+
+    def plan(self, target, by="weight", cash_buffer=0.0, lot_size=1, min_trade_value=0, order_type="지정가"):
+        """리밸런싱 계획 생성
+
+        target: 종목코드 -> 비중(by="weight", 합계 1 이하) 또는 수량(by="quantity")
+        목표에 없는 보유 종목은 전량 매도하며, 매수는 주문 가능 금액과 매도 대금 안에서 비례 축소합니다.
+        지정가 주문은 매도 시 매수호가, 매수 시 매도호가로 가격을 정합니다.
+        """
+        try:
+            holdings = self.trading.get_holdings()
+            held = {h["code"]: h for h in holdings if h["quantity"] > 0}
+            codes = list(dict.fromkeys(list(held) + list(target)))
+            if not codes:
+                return RebalancePlan([], *(np.zeros(0, dtype=np.int64) for _ in range(3)), [], 0)
+
+            quotes = self.trading.get_quotes(codes)
+            fallback = np.array([held.get(code, {}).get("current_price", 0) for code in codes], dtype=np.int64)
+            prices = np.where(quotes.price > 0, quotes.price, fallback)
+            asks = np.where(quotes.ask > 0, quotes.ask, prices)
+            bids = np.where(quotes.bid > 0, quotes.bid, prices)
+            current = np.array([held.get(code, {}).get("quantity", 0) for code in codes], dtype=np.int64)
+            funds = self.trading.get_available_funds()
+
+            # 목표 수량 벡터 (호가가 없는 종목은 현재 수량 유지)
+            goal = np.array([target.get(code, 0) for code in codes], dtype=np.float64)
+            valid = prices > 0
+            if by == "weight":
+                investable = (int(current @ prices) + funds) * (1 - cash_buffer)
+                quantity = np.zeros(len(codes))
+                np.divide(goal * investable, prices, out=quantity, where=valid)
+            else:
+                quantity = goal
+            target_qty = np.where(valid, np.floor(quantity / lot_size) * lot_size, current).astype(np.int64)
+            for code in np.asarray(codes)[~valid]:
+                logger.warning(f"{code} 시세 없음, 리밸런싱 제외")
+
+            delta = target_qty - current
+            sell_qty = np.where(delta < 0, -delta, 0)
+            buy_qty = np.where(delta > 0, delta, 0)
+            sell_prices = bids if order_type == "지정가" else prices
+            buy_prices = asks if order_type == "지정가" else prices
+
+            # 매수 금액이 (주문 가능 금액 + 매도 대금)을 넘으면 비례 축소
+            budget = funds + int(sell_qty @ sell_prices)
+            buy_value = int(buy_qty @ buy_prices)
+            if buy_value > budget:
+                scale = budget / buy_value
+                buy_qty = (np.floor(buy_qty * scale / lot_size) * lot_size).astype(np.int64)
+
+            # 최소 거래 금액 미만 주문 제외
+            if min_trade_value:
+                sell_qty[sell_qty * sell_prices < min_trade_value] = 0
+                buy_qty[buy_qty * buy_prices < min_trade_value] = 0
+            target_qty = current - sell_qty + buy_qty
+
+            orders = []
+            for side, qty, order_prices in (("sell", sell_qty, sell_prices), ("buy", buy_qty, buy_prices)):
+                for i in np.argsort(-(qty * order_prices), kind="stable"):
+                    if qty[i] <= 0:
+                        break
+                    orders.append({
+                        "side": side,
+                        "code": codes[i],
+                        "quantity": int(qty[i]),
+                        "price": int(order_prices[i]) if order_type == "지정가" else 0,
+                        "order_type": order_type,
+                        "price_estimate": int(order_prices[i]),
+                    })
+
+            plan = RebalancePlan(codes, prices, current, target_qty, orders, funds, lot_size)
+            logger.info(f"리밸런싱 계획: {plan.summary()}")
+            return plan
+
+        except Exception as e:
+            logger.log_error("REBALANCE_PLAN", str(e))
+            return None
+
+    def execute(self, plan, on_done=None, sell_timeout=60.0):
+        """계획의 주문 전송 (매도 체결 확인 후 매수 전송, RebalanceExecution 반환)
+
+        매수는 매도 주문이 모두 체결(미체결 0)되거나 sell_timeout초가 지나면 전송하며,
+        주문 가능 금액 + 실제 매도 체결 대금을 넘으면 비례 축소합니다.
+        """
+        execution = RebalanceExecution(self.trading, plan, on_done, sell_timeout)
+        execution.start()
+        return execution
+
+    def rebalance(self, target, on_done=None, sell_timeout=60.0, **kwargs):
+        """계획 생성 후 전송 (계획, RebalanceExecution 반환, 나머지 인자는 plan으로 전달)"""
+        plan = self.plan(target, **kwargs)
+        if plan is None:
+            return None, None
+        return plan, self.execute(plan, on_done, sell_timeout)
@@ -0,0 +1,228 @@
+import math
+from bisect import bisect_right
+from logger import logger
+from config import Config
+
+# 호가가격단위 (KOSPI/KOSDAQ 공통, 2023.01.25~)
+TICK_BOUNDS = (2000, 5000, 20000, 50000, 200000, 500000)
+TICK_SIZES = (1, 5, 10, 50, 100, 500, 1000)
+
+# 종목 유형별 호가가격단위 표 (ETF/ETN/ELW는 가격대와 관계없이 5원)
+KIND_STOCK, KIND_ETP = "stock", "etp"
+TICK_TABLES = {
+    KIND_STOCK: (TICK_BOUNDS, TICK_SIZES),
+    KIND_ETP: ((), (5,)),
+}
+ETP_MARKETS = ("8", "60", "3")  # GetCodeListByMarket 시장구분 (ETF, ETN, ELW)
+
+BUY_ORDER_TYPES = (1, 5)  # 신규매수, 매수정정
+SELL_ORDER_TYPES = (2, 6)  # 신규매도, 매도정정
+
+
+def tick_size(price, kind=KIND_STOCK):
+    """종목 유형/가격대별 호가단위"""
+    bounds, sizes = TICK_TABLES[kind]
+    return sizes[bisect_right(bounds, price)]
+
+
+def round_to_tick(price, up=False, kind=KIND_STOCK):
+    """호가단위로 내림(up=True면 올림)"""
+    tick = tick_size(price, kind)
+    if up:
+        return int(math.ceil(price / tick) * tick)
+    return int(price // tick * tick)
+
+
+class PriceLimits:
+    """종목별 가격제한폭(상/하한가) 테이블 (기준가로 한 번 계산 후 재사용)"""
+
+    def __init__(self, reference_price_loader=None, limit_rate=None, kind_loader=None):
+        self.reference_price_loader = reference_price_loader  # 종목코드 -> 기준가(전일종가)
+        self.kind_loader = kind_loader  # 종목코드 -> 종목 유형 (KIND_STOCK 또는 KIND_ETP)
+        self.limit_rate = limit_rate if limit_rate is not None else Config.PRICE_LIMIT_RATE
+        self.limits = {}  # 종목코드 -> (하한가, 상한가)
+
+    def kind(self, code):
+        """종목 유형 (로더가 없으면 주식)"""
+        return self.kind_loader(code) if self.kind_loader else KIND_STOCK
+
+    def tick_size(self, code, price):
+        """종목 유형에 맞는 호가단위"""
+        return tick_size(price, self.kind(code))
+
+    def set_reference_price(self, code, base_price):
+        """기준가로 상/하한가 계산"""
+        if base_price <= 0:
+            return None
+        kind = self.kind(code)
+        upper = round_to_tick(base_price * (1 + self.limit_rate), kind=kind)
+        lower = round_to_tick(base_price * (1 - self.limit_rate), up=True, kind=kind)
+        self.limits[code] = (lower, upper)
+        return self.limits[code]
+
+    def get(self, code):
+        """상/하한가 조회 (없으면 기준가 로드 후 계산, 실패 시 None)"""
+        limits = self.limits.get(code)
+        if limits is None and self.reference_price_loader:
+            limits = self.set_reference_price(code, self.reference_price_loader(code))
+        return limits
+
+
+class RiskEngine:
+    """계좌별 주문 전 리스크 검사 클래스 (보유/미체결 집계를 변경분으로 갱신하여 O(1) 검사)"""
+
+    def __init__(self, book, price_limits, max_position_size=None, max_total_exposure=None, max_daily_loss=None):
+        self.book = book
+        self.price_limits = price_limits
+        self.max_position_size = max_position_size if max_position_size is not None else Config.MAX_POSITION_SIZE
+        self.max_total_exposure = max_total_exposure if max_total_exposure is not None else Config.MAX_TOTAL_EXPOSURE
+        self.max_daily_loss = max_daily_loss if max_daily_loss is not None else Config.MAX_DAILY_LOSS
+        self.enabled = Config.RISK_CHECK_ENABLED
+
+        # 누적 집계
+        self.exposure = {}  # 종목코드 -> 보유 평가금액
+        self.total_exposure = 0
+        self.position_qty = {}  # 종목코드 -> 보유수량
+        self.open_buy_notional = {}  # 종목코드 -> 미체결 매수 금액
+        self.total_open_buy_notional = 0
+        self.open_sell_qty = {}  # 종목코드 -> 미체결 매도 수량
+        self._order_contributions = {}  # 주문번호 -> 집계에 반영된 (종목, 매수 금액, 매도 수량)
+        self.realized_pnl = 0
+
+        # 사본 조회와 변경 통지 등록을 장부 잠금 안에서 함께 수행 (사이에 들어온 변경 누락 방지)
+        positions, orders = book.snapshot(self.on_book_update)
+        for code, position in positions.items():
+            self._on_position(code, None, position)
+        for order in orders.values():
+            self._on_order(order)
+
+    # 집계 갱신
+    def on_book_update(self, kind, key, old, new):
+        """장부 변경 통지 처리"""
+        if kind == "position":
+            self._on_position(key, old, new)
+        elif kind == "order":
+            self._on_order(new)
+
+    @staticmethod
+    def _position_value(position):
+        if not position:
+            return 0, 0, 0
+        price = position.get("current_price") or position.get("purchase_price", 0)
+        quantity = position.get("quantity", 0)
+        return quantity * price, quantity, position.get("realized_pnl", 0)
+
+    def _on_position(self, code, old, new):
+        old_value, _, old_realized = self._position_value(old)
+        new_value, new_qty, new_realized = self._position_value(new)
+        self.exposure[code] = new_value
+        self.total_exposure += new_value - old_value
+        self.position_qty[code] = new_qty
+        self.realized_pnl += new_realized - old_realized
+
+    def _order_contribution(self, order):
+        """미체결 주문의 (종목, 매수 금액, 매도 수량)"""
+        unfilled = max(order.get("unfilled", 0), 0)
+        code = order.get("code", "")
+        if order.get("order_type") in SELL_ORDER_TYPES:
+            return code, 0, unfilled
+        price = order.get("price") or self._market_order_price(code)
+        return code, unfilled * price, 0
+
+    def _on_order(self, order):
+        old = self._order_contributions.pop(order["order_no"], None)
+        new = self._order_contribution(order)
+        for sign, (code, notional, sell_qty) in ((-1, old or (None, 0, 0)), (1, new)):
+            if code is None:
+                continue
+            self.open_buy_notional[code] = self.open_buy_notional.get(code, 0) + sign * notional
+            self.total_open_buy_notional += sign * notional
+            self.open_sell_qty[code] = self.open_sell_qty.get(code, 0) + sign * sell_qty
+        if new[1] or new[2]:
+            self._order_contributions[order["order_no"]] = new
+
+    def _market_order_price(self, code):
+        """시장가 주문 평가 가격 (상한가, 없으면 보유 현재가)"""
+        limits = self.price_limits.get(code)
+        if limits:
+            return limits[1]
+        value = self.exposure.get(code, 0)
+        quantity = self.position_qty.get(code, 0)
+        return value // quantity if quantity else 0
+
+    # 검사
+    def check(self, order_type, code, quantity, price, org_order_no=""):
+        """주문 검사 (통과 시 빈 문자열, 거부 시 사유, 정정은 원주문 미체결 금액을 제외하고 계산)"""
+        if not self.enabled or order_type not in BUY_ORDER_TYPES + SELL_ORDER_TYPES:
+            return ""
+        if quantity <= 0:
+            return f"주문수량 오류: {quantity}"
+
+        if price:
+            tick = self.price_limits.tick_size(code, price)
+            if price % tick:
+                return f"호가단위 오류: {price:,}원 (호가단위 {tick:,}원)"
+            limits = self.price_limits.get(code)
+            if limits and not limits[0] <= price <= limits[1]:
+                return f"가격제한폭 초과: {price:,}원 (하한가 {limits[0]:,}원, 상한가 {limits[1]:,}원)"
+
+        if order_type in SELL_ORDER_TYPES:
+            if order_type == 2:
+                sellable = self.position_qty.get(code, 0) - self.open_sell_qty.get(code, 0)
+                if quantity > sellable:
+                    return f"매도 가능 수량 초과: {quantity}주 (가능 {max(sellable, 0)}주)"
+            return ""
+
+        # 매수: 손실 한도, 종목별/전체 노출 한도
+        if self.max_daily_loss and -self.realized_pnl >= self.max_daily_loss:
+            return f"일일 손실 한도 도달: {self.realized_pnl:,}원 (한도 {self.max_daily_loss:,}원)"
+
+        notional = quantity * (price or self._market_order_price(code))
+        if org_order_no:
+            original = self.book.orders.get(org_order_no, {})
+            notional -= min(quantity, original.get("unfilled", 0)) * (original.get("price") or self._market_order_price(code))
+        code_exposure = self.exposure.get(code, 0) + self.open_buy_notional.get(code, 0) + notional
+        if self.max_position_size and code_exposure > self.max_position_size:
+            return f"종목별 최대 포지션 초과: {code_exposure:,}원 (한도 {self.max_position_size:,}원)"
+
+        total = self.total_exposure + self.total_open_buy_notional + notional
+        if self.max_total_exposure and total > self.max_total_exposure:
+            return f"계좌 총 노출 한도 초과: {total:,}원 (한도 {self.max_total_exposure:,}원)"
+        return ""
+
+    def summary(self):
+        """리스크 집계 요약"""
+        return {
+            "accno": self.book.accno,
+            "total_exposure": self.total_exposure,
+            "open_buy_notional": self.total_open_buy_notional,
+            "realized_pnl": self.realized_pnl,
+            "max_position_size": self.max_position_size,
+            "max_total_exposure": self.max_total_exposure,
+            "max_daily_loss": self.max_daily_loss,
+        }
+
+
+def load_reference_price(kiwoom_api):
+    """GetMasterLastPrice(전일종가) 기반 기준가 로더"""
+    def loader(code):
+        try:
+            return abs(int(str(kiwoom_api.get_master_last_price(code)).strip().replace(',', '') or 0))
+        except ValueError:
+            logger.warning(f"{code} 기준가 조회 실패")
+            return 0
+    return loader
+
+
+def load_instrument_kind(kiwoom_api):
+    """시장구분 종목코드 목록(ETF/ETN/ELW) 기반 종목 유형 로더 (목록은 로그인 후 처음 조회 시 한 번만 읽음)"""
+    etp_codes = set()
+    loaded = []
+
+    def loader(code):
+        if not loaded and kiwoom_api.connected:
+            for market in ETP_MARKETS:
+                etp_codes.update(c for c in kiwoom_api.get_code_list_by_market(market).split(';') if c)
+            loaded.append(True)
+        return KIND_ETP if code in etp_codes else KIND_STOCK
+    return loader
@@ -0,0 +1,368 @@
+import os
+import time
+import threading
+from multiprocessing import shared_memory
+from multiprocessing.connection import Listener, Client
+import numpy as np
+from logger import logger
+from config import Config
+from venue import VENUE_SUFFIX
+
+MAGIC = 0x4B57424F41524432  # "KWBOARD2" (슬롯 형식이 바뀌면 변경)
+
+HEADER_DTYPE = np.dtype([
+    ("magic", "<u8"),
+    ("capacity", "<u8"),
+    ("count", "<u8"),  # 사용 중인 슬롯 수 (슬롯은 추가만 되고 재사용하지 않음)
+])
+
+BOARD_DTYPE = np.dtype([
+    ("version", "<u8"),  # 시퀀스 번호 (홀수면 갱신 중)
+    ("code", "S12"),  # 시장별 종목코드 (NXT는 '_NX' 접미사 포함)
+    ("price", "<i8"),
+    ("change", "<i8"),
+    ("volume", "<i8"),  # 누적거래량
+    ("ask", "<i8"),
+    ("bid", "<i8"),
+    ("ask_size", "<i8"),
+    ("bid_size", "<i8"),
+    ("bar_time", "<i8"),  # 1분봉 시각 (HHMM)
+    ("bar_open", "<i8"),
+    ("bar_high", "<i8"),
+    ("bar_low", "<i8"),
+    ("bar_close", "<i8"),
+    ("bar_volume", "<i8"),
+    ("position", "<i8"),  # 전체 계좌 보유수량 합계
+    ("purchase_price", "<i8"),
+    ("timestamp", "<f8"),
+])
+
+# 주식체결 FID
+FID_TIME, FID_PRICE, FID_CHANGE, FID_TICK_VOLUME, FID_VOLUME, FID_ASK, FID_BID = 20, 10, 11, 15, 13, 27, 28
+# 주식호가잔량 FID
+FID_ASK1, FID_BID1, FID_ASK1_SIZE, FID_BID1_SIZE = 41, 51, 61, 71
+
+
+def _board_size(capacity):
+    return HEADER_DTYPE.itemsize + BOARD_DTYPE.itemsize * capacity
+
+
+def _untrack(shm):
+    """읽기 전용 연결의 공유 메모리가 프로세스 종료 시 삭제되지 않도록 자원 추적 해제 (POSIX)"""
+    if os.name == "nt":
+        return
+    try:
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, "shared_memory")
+    except Exception:
+        pass
+
+
+def _to_int(value):
+    try:
+        return abs(int(value))
+    except ValueError:
+        return 0
+
+
+class QuoteBoard:
+    """공유 메모리 시세판 (헤더 + 종목별 고정 크기 슬롯 배열, 슬롯마다 시퀀스 번호로 잠금 없는 읽기)"""
+
+    def __init__(self, name, capacity=None, create=False):
+        self.name = name
+        if create:
+            capacity = capacity or Config.SHM_BOARD_CAPACITY
+            try:
+                # 이전 실행에서 남은 같은 이름의 공유 메모리 정리
+                stale = shared_memory.SharedMemory(name=name)
+                stale.close()
+                stale.unlink()
+            except FileNotFoundError:
+                pass
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=_board_size(capacity))
+            self.header = np.ndarray(1, dtype=HEADER_DTYPE, buffer=self.shm.buf)
+            self.header[0] = (MAGIC, capacity, 0)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            _untrack(self.shm)
+            self.header = np.ndarray(1, dtype=HEADER_DTYPE, buffer=self.shm.buf)
+            if self.header[0]["magic"] != MAGIC:
+                raise ValueError(f"시세판 형식이 아닙니다: {name}")
+            capacity = int(self.header[0]["capacity"])
+        self.capacity = capacity
+        self.slots = np.ndarray(capacity, dtype=BOARD_DTYPE, buffer=self.shm.buf, offset=HEADER_DTYPE.itemsize)
+        self.owner = create
+        self.index = {}  # 종목코드 -> 슬롯 번호
+
+    @property
+    def count(self):
+        return int(self.header[0]["count"])
+
+    def close(self):
+        """공유 메모리 연결 해제 (생성한 쪽이면 삭제)"""
+        self.header = self.slots = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+    # 읽기
+    def slot(self, code):
+        """종목 슬롯 번호 (없으면 None, 새 종목은 슬롯 목록을 다시 읽어 확인)"""
+        i = self.index.get(code)
+        if i is None:
+            count = self.count
+            codes = self.slots["code"][:count]
+            self.index = {c.decode(): n for n, c in enumerate(codes)}
+            i = self.index.get(code)
+        return i
+
+    def get(self, code):
+        """종목 시세 조회 (일관된 dict 복사본, 없으면 None)"""
+        i = self.slot(code)
+        if i is None:
+            return None
+        slots = self.slots
+        while True:
+            version = int(slots[i]["version"])
+            if version & 1:
+                time.sleep(0)
+                continue
+            row = slots[i].copy()
+            if int(slots[i]["version"]) == version:
+                record = {name: row[name].item() for name in BOARD_DTYPE.names if name != "version"}
+                record["code"] = record["code"].decode()
+                return record
+
+    def snapshot(self):
+        """전체 시세판 복사본 (NumPy 구조화 배열, 갱신 중이던 슬롯만 다시 복사)"""
+        count = self.count
+        live = self.slots[:count]
+        copy = live.copy()
+        while True:
+            retry = (copy["version"] & 1).astype(bool) | (live["version"] != copy["version"])
+            if not retry.any():
+                return copy
+            time.sleep(0)
+            idx = np.nonzero(retry)[0]
+            copy[idx] = live[idx]
+
+
+class QuoteBoardPublisher:
+    """실시간 시세/1분봉/보유수량을 공유 메모리 시세판에 기록 (Qt 스레드에서 실행)"""
+
+    def __init__(self, kiwoom_api, name=None, capacity=None):
+        self.api = kiwoom_api
+        self.board = QuoteBoard(name or Config.SHM_BOARD_NAME, capacity, create=True)
+
+    def start(self):
+        """실시간 처리기 및 계좌 장부 변경 통지 등록"""
+        self.api.add_real_data_handler("주식체결", self.on_trade)
+        self.api.add_real_data_handler("주식호가잔량", self.on_hoga)
+        for book in self.api.account_books.values():
+            book.add_listener(self.on_book_update)
+            for code in list(book.positions):
+                self._publish_position(code)
+        logger.info(f"공유 메모리 시세판 시작: {self.board.name} (슬롯 {self.board.capacity}개)")
+
+    def stop(self):
+        self.api.remove_real_data_handler("주식체결", self.on_trade)
+        self.api.remove_real_data_handler("주식호가잔량", self.on_hoga)
+        for book in self.api.account_books.values():
+            book.remove_listener(self.on_book_update)
+        self.board.close()
+
+    def _slot(self, code):
+        """종목 슬롯 (없으면 할당, 가득 차면 None)"""
+        board = self.board
+        i = board.index.get(code)
+        if i is None:
+            i = board.count
+            if i >= board.capacity:
+                return None
+            board.slots[i]["code"] = code.encode()
+            board.index[code] = i
+            board.header[0]["count"] = i + 1
+        return board.slots[i]
+
+    def on_trade(self, code, real_type):
+        """주식체결: 현재가/누적거래량/최우선호가 및 1분봉 갱신"""
+        slot = self._slot(code)
+        if slot is None:
+            return
+        get = self.api.ocx.GetCommRealData
+        price = _to_int(get(code, FID_PRICE).strip())
+        tick_volume = _to_int(get(code, FID_TICK_VOLUME).strip())
+        bar_time = _to_int(get(code, FID_TIME).strip()[:4])
+        volume = _to_int(get(code, FID_VOLUME).strip())
+        ask = _to_int(get(code, FID_ASK).strip())
+        bid = _to_int(get(code, FID_BID).strip())
+        try:
+            change = int(get(code, FID_CHANGE).strip())
+        except ValueError:
+            change = slot["change"]
+
+        # OCX 조회는 모두 끝낸 뒤 시퀀스 번호 사이에서 기록
+        slot["version"] += 1
+        slot["price"] = price
+        slot["change"] = change
+        slot["volume"] = volume
+        slot["ask"] = ask
+        slot["bid"] = bid
+        if slot["bar_time"] != bar_time:
+            slot["bar_time"] = bar_time
+            slot["bar_open"] = slot["bar_high"] = slot["bar_low"] = price
+            slot["bar_volume"] = 0
+        else:
+            slot["bar_high"] = max(slot["bar_high"], price)
+            slot["bar_low"] = min(slot["bar_low"], price)
+        slot["bar_close"] = price
+        slot["bar_volume"] += tick_volume
+        slot["timestamp"] = time.time()
+        slot["version"] += 1
+
+    def on_hoga(self, code, real_type):
+        """주식호가잔량: 최우선호가/잔량 갱신"""
+        slot = self._slot(code)
+        if slot is None:
+            return
+        get = self.api.ocx.GetCommRealData
+        ask, bid, ask_size, bid_size = (_to_int(get(code, fid).strip()) for fid in (FID_ASK1, FID_BID1, FID_ASK1_SIZE, FID_BID1_SIZE))
+        slot["version"] += 1
+        slot["ask"] = ask
+        slot["bid"] = bid
+        slot["ask_size"] = ask_size
+        slot["bid_size"] = bid_size
+        slot["timestamp"] = time.time()
+        slot["version"] += 1
+
+    def on_book_update(self, kind, key, old, new):
+        if kind == "position":
+            self._publish_position(key)
+
+    def _publish_position(self, code):
+        """전체 계좌 보유수량/평균 매입가 기록"""
+        slot = self._slot(code)
+        if slot is None:
+            return
+        quantity = cost = 0
+        for book in self.api.account_books.values():
+            position = book.positions.get(code)
+            if position:
+                quantity += position["quantity"]
+                cost += position["quantity"] * position["purchase_price"]
+        slot["version"] += 1
+        slot["position"] = quantity
+        slot["purchase_price"] = cost // quantity if quantity else 0
+        slot["version"] += 1
+
+
+class OrderChannelServer:
+    """전략 프로세스의 주문 요청 수신 서버 (수신 스레드에서 받아 계좌별 OrderQueue로 전달)
+
+    요청: {"accno", "side": "buy" 또는 "sell", "code", "quantity", "price", "order_type", "venue": "KRX" 또는 "NXT"}
+    응답: {"ok", "order_no", "error"}
+
+    인증키(ORDER_CHANNEL_AUTHKEY)가 설정되지 않으면 시작하지 않습니다.
+    """
+
+    def __init__(self, kiwoom_api, port=None, authkey=None, host="127.0.0.1", timeout=None):
+        self.api = kiwoom_api
+        self.address = (host, port or Config.ORDER_CHANNEL_PORT)
+        self.authkey = (authkey or Config.ORDER_CHANNEL_AUTHKEY).encode()
+        self.timeout = timeout or Config.TR_TIMEOUT * 2
+        self.listener = None
+        self.running = False
+
+    def start(self):
+        """수신 시작 (인증키가 없으면 시작하지 않고 False 반환)"""
+        if not self.authkey:
+            logger.error("ORDER_CHANNEL_AUTHKEY가 설정되지 않아 주문 채널을 시작하지 않습니다.")
+            return False
+        self.listener = Listener(self.address, authkey=self.authkey)
+        self.running = True
+        threading.Thread(target=self._accept_loop, name="order-channel", daemon=True).start()
+        logger.info(f"주문 채널 시작: {self.address[0]}:{self.listener.address[1]}")
+        return True
+
+    def stop(self):
+        self.running = False
+        if self.listener:
+            self.listener.close()
+            self.listener = None
+
+    def _accept_loop(self):
+        while self.running:
+            try:
+                conn = self.listener.accept()
+            except Exception as e:
+                if self.running:
+                    logger.log_error("ORDER_CHANNEL", str(e))
+                continue
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn):
+        with conn:
+            while self.running:
+                try:
+                    request = conn.recv()
+                except (EOFError, OSError):
+                    return
+                conn.send(self.handle(request))
+
+    def handle(self, request):
+        """주문 요청 한 건 처리 (전송 결과까지 대기)"""
+        try:
+            trading = self._trading(request.get("accno"))
+            if trading is None:
+                return {"ok": False, "order_no": "", "error": f"등록되지 않은 계좌: {request.get('accno')}"}
+            venue = request.get("venue") or ""
+            if venue and venue not in VENUE_SUFFIX:
+                return {"ok": False, "order_no": "", "error": f"지원하지 않는 시장: {venue}"}
+            order = {
+                "side": request["side"],
+                "code": request["code"],
+                "quantity": int(request["quantity"]),
+                "price": int(request.get("price", 0)),
+                "order_type": request.get("order_type", "시장가"),
+                "venue": venue,
+            }
+            batch = trading.order_queue.submit([order])
+            if not batch.wait(self.timeout):
+                return {"ok": False, "order_no": "", "error": "전송 대기 시간 초과"}
+            _, success, order_no = batch.results[0]
+            return {"ok": success, "order_no": order_no, "error": "" if success else "주문 실패"}
+        except Exception as e:
+            logger.log_error("ORDER_CHANNEL", str(e))
+            return {"ok": False, "order_no": "", "error": str(e)}
+
+    def _trading(self, accno):
+        for trading in self.api.tradings:
+            if accno in (None, "", trading.accno):
+                return trading
+        return None
+
+
+class OrderChannelClient:
+    """전략 프로세스용 주문 채널 클라이언트"""
+
+    def __init__(self, port=None, authkey=None, host="127.0.0.1"):
+        authkey = authkey or Config.ORDER_CHANNEL_AUTHKEY
+        if not authkey:
+            raise ValueError("ORDER_CHANNEL_AUTHKEY가 설정되지 않았습니다.")
+        self.conn = Client((host, port or Config.ORDER_CHANNEL_PORT), authkey=authkey.encode())
+
+    def send_order(self, side, code, quantity, price=0, order_type="시장가", accno=None, venue=""):
+        """주문 요청 (전송 결과 dict 반환, venue: KRX/NXT, 비어있으면 KRX)"""
+        self.conn.send({
+            "accno": accno,
+            "side": side,
+            "code": code,
+            "quantity": quantity,
+            "price": price,
+            "order_type": order_type,
+            "venue": venue,
+        })
+        return self.conn.recv()
+
+    def close(self):
+        self.conn.close()
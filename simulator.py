@@ -0,0 +1,186 @@
+from PyQt5.QtCore import QTimer
+
+
+class SimulatedSignal:
+    """OCX 이벤트 시그널 대체 클래스"""
+
+    def __init__(self):
+        self._slots = []
+
+    def connect(self, slot):
+        self._slots.append(slot)
+
+    def disconnect(self, slot):
+        self._slots.remove(slot)
+
+    def emit(self, *args):
+        for slot in list(self._slots):
+            slot(*args)
+
+
+class SimulatedOCX:
+    """키움 OCX 시뮬레이터 (브로커 연결 없이 TR/주문/실시간 이벤트 발생)
+
+    TR 응답과 주문 접수 결과는 실제 OCX와 같이 Qt 이벤트 루프에서 비동기로 전달됩니다.
+    """
+
+    EVENTS = (
+        "OnEventConnect",
+        "OnReceiveTrData",
+        "OnReceiveRealData",
+        "OnReceiveChejanData",
+        "OnReceiveMsg",
+        "OnReceiveTrCondition",
+        "OnReceiveRealCondition",
+        "OnReceiveConditionVer",
+    )
+
+    def __init__(self, latency_ms=0, login_info=None):
+        for name in self.EVENTS:
+            setattr(self, name, SimulatedSignal())
+        self.latency_ms = latency_ms
+        self.login_info = login_info or {}
+        self.connect_state = 0
+
+        self.tr_rows = {}  # TR 코드 -> 반복 데이터 행 목록 (OPTKWFID는 종목코드 -> 행)
+        self.tr_single = {}  # TR 코드 -> 단일 데이터
+        self.master = {}  # 종목코드 -> {"name", "last_price", "stock_info", ...}
+        self.chejan = {}  # FID -> 값
+        self.real = {}  # FID -> 값
+        self.real_registrations = {}  # 화면번호 -> 종목코드 목록
+
+        self.requests = []  # 요청 기록
+        self._inputs = {}
+        self._responses = {}  # 요청명 -> (반복 데이터, 단일 데이터)
+        self._order_no = 0
+
+    def _post(self, callback):
+        """이벤트 루프에서 비동기로 이벤트 발생"""
+        QTimer.singleShot(self.latency_ms, callback)
+
+    # 로그인
+    def CommConnect(self):
+        def login():
+            self.connect_state = 1
+            self.OnEventConnect.emit(0)
+        self._post(login)
+        return 0
+
+    def CommTerminate(self):
+        self.connect_state = 0
+
+    def drop_connection(self):
+        """서버 연결 끊김 재현"""
+        self.connect_state = 0
+
+    def GetConnectState(self):
+        return self.connect_state
+
+    def GetLoginInfo(self, tag):
+        return self.login_info.get(tag, "")
+
+    # TR
+    def SetInputValue(self, key, value):
+        self._inputs[key] = value
+
+    def CommRqData(self, rqname, trcode, prev_next, screen_no):
+        self.requests.append(("CommRqData", rqname, trcode, screen_no, self._inputs))
+        self._inputs = {}
+        self._responses[rqname] = (self.tr_rows.get(trcode, []), self.tr_single.get(trcode, {}))
+        self._post(lambda: self.OnReceiveTrData.emit(screen_no, rqname, trcode, "", "0", 0, "", "", ""))
+        return 0
+
+    def CommKwRqData(self, codes, prev_next, code_count, type_flag, rqname, screen_no):
+        codes = codes.split(';')[:code_count]
+        self.requests.append(("CommKwRqData", rqname, "OPTKWFID", screen_no, codes))
+        rows = [self.tr_rows.get("OPTKWFID", {}).get(code, {"종목코드": code}) for code in codes]
+        self._responses[rqname] = (rows, {})
+        self._post(lambda: self.OnReceiveTrData.emit(screen_no, rqname, "OPTKWFID", "", "0", 0, "", "", ""))
+        return 0
+
+    def GetRepeatCnt(self, trcode, rqname):
+        rows, _ = self._responses.get(rqname, (self.tr_rows.get(trcode, []), {}))
+        return len(rows)
+
+    def GetCommData(self, trcode, rqname, index, item):
+        rows, single = self._responses.get(rqname, (self.tr_rows.get(trcode, []), self.tr_single.get(trcode, {})))
+        if index < len(rows) and item in rows[index]:
+            return str(rows[index][item])
+        return str(single.get(item, ""))
+
+    # 주문
+    def SendOrder(self, rqname, screen_no, accno, order_type, code, quantity, price, hoga, org_order_no):
+        self.requests.append(("SendOrder", rqname, screen_no, accno, order_type, code, quantity, price, hoga, org_order_no))
+        self._order_no += 1
+        self._responses[rqname] = ([], {
+            "주문번호": f"{self._order_no:07d}",
+            "주문상태": "접수",
+            "주문수량": str(quantity),
+            "주문가격": str(price),
+        })
+        self._post(lambda: self.OnReceiveTrData.emit(screen_no, rqname, "KOA_NORMAL_ORD", "", "0", 0, "", "", ""))
+        return 0
+
+    def GetChejanData(self, fid):
+        return str(self.chejan.get(fid, ""))
+
+    def emit_chejan(self, gubun, fields):
+        """체결잔고 이벤트 발생"""
+        self.chejan = fields
+        self.OnReceiveChejanData.emit(gubun, len(fields), ";".join(str(f) for f in fields))
+
+    # 실시간
+    def SetRealReg(self, screen_no, codes, fids, opt_type):
+        code_list = [c for c in codes.split(';') if c]
+        if opt_type == "0":
+            self.real_registrations[screen_no] = code_list
+        else:
+            self.real_registrations.setdefault(screen_no, []).extend(code_list)
+        return 0
+
+    def SetRealRemove(self, screen_no, code):
+        for screen, codes in self.real_registrations.items():
+            if screen_no not in ("ALL", screen):
+                continue
+            self.real_registrations[screen] = [] if code == "ALL" else [c for c in codes if c != code]
+
+    def GetCommRealData(self, code, fid):
+        return str(self.real.get(fid, ""))
+
+    def emit_real(self, code, real_type, fields):
+        """실시간 데이터 이벤트 발생"""
+        self.real = fields
+        self.OnReceiveRealData.emit(code, real_type, "")
+
+    # 조건검색
+    def GetConditionLoad(self):
+        self._post(lambda: self.OnReceiveConditionVer.emit(1, ""))
+        return 1
+
+    def SendCondition(self, screen_no, condition_name, condition_index, search_type):
+        return 1
+
+    def SendConditionStop(self, screen_no, condition_name, condition_index):
+        pass
+
+    # 종목 마스터
+    def GetCodeListByMarket(self, market):
+        return ";".join(code for code, info in self.master.items() if info.get("market", "0") == market) + ";"
+
+    def GetMasterCodeName(self, code):
+        return self.master.get(code, {}).get("name", "")
+
+    def GetMasterLastPrice(self, code):
+        return str(self.master.get(code, {}).get("last_price", ""))
+
+    def GetMasterStockInfo(self, code):
+        return self.master.get(code, {}).get("stock_info", "")
+
+    def GetMasterConstruction(self, code):
+        return self.master.get(code, {}).get("construction", "정상")
+
+    def GetMasterStockState(self, code):
+        return self.master.get(code, {}).get("state", "")
+
+    def GetMasterListedStockCnt(self, code):
+        return self.master.get(code, {}).get("listed_count", 0)
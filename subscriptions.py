@@ -0,0 +1,201 @@
+from collections import OrderedDict
+from PyQt5.QtCore import QTimer
+from logger import logger
+from config import Config
+from metrics import metrics
+
+CODES_PER_SCREEN = 100  # SetRealReg 화면당 최대 종목 수
+
+
+class SubscriptionManager:
+    """실시간 등록 관리 클래스 (종목별 구독자 참조 횟수, 보유/미체결 종목 고정, 유휴 종목 LRU 해지)
+
+    - acquire/release로 구독자별 참조를 관리하고, 참조가 없어진 종목은 바로 해지하지 않고 유휴 목록에 둡니다.
+    - 등록 한도(capacity)를 넘으면 가장 오래전에 유휴가 된 종목부터 SetRealRemove로 해지합니다.
+    - 보유 종목과 미체결 주문 종목은 참조가 없어도 해지하지 않습니다.
+    - 새 종목은 모아 두었다가 화면번호당 100종목씩 한 번의 SetRealReg로 등록합니다.
+    - FID 묶음(실시간 타입)마다 별도 인스턴스를 사용합니다. (api.subscriptions: 주식체결, api.hoga_subscriptions: 주식호가잔량)
+    """
+
+    def __init__(self, kiwoom_api, capacity=None, fids=None, first_screen=None, name="trade", pin_positions=True):
+        self.api = kiwoom_api
+        self.name = name  # 지표 라벨
+        self.pin_positions = pin_positions  # 보유/미체결 종목 고정 여부
+        self.capacity = capacity or Config.REAL_SUBSCRIPTION_CAPACITY
+        self.fids = fids or Config.REAL_SUBSCRIPTION_FIDS
+        first_screen = int(first_screen or Config.REAL_SUBSCRIPTION_SCREEN)
+        screen_count = -(-self.capacity // CODES_PER_SCREEN)
+        self.screens = [f"{first_screen + i:04d}" for i in range(screen_count)]
+
+        self.owners = {}  # 종목코드 -> 구독자 집합
+        self.pins = {}  # 종목코드 -> 고정 사유 집합 ((계좌번호, "position") 또는 (계좌번호, 주문번호))
+        self.owned = {}  # 구독자 -> 종목코드 집합
+        self.registered = {}  # 종목코드 -> 화면번호
+        self.screen_codes = {screen: set() for screen in self.screens}
+        self.idle = OrderedDict()  # 등록되었지만 참조/고정이 없는 종목 (앞쪽이 가장 오래됨)
+        self.pending = OrderedDict()  # 등록 대기 종목
+        self.book_listeners = {}  # 계좌번호 -> 등록한 장부 변경 통지 함수 (stop에서 해제)
+        self._flush_scheduled = False
+
+    # 시작/중지
+    def start(self):
+        """계좌 장부 변경 통지 등록 및 현재 보유/미체결 종목 고정"""
+        for accno, book in (self.api.account_books.items() if self.pin_positions else ()):
+            if accno in self.book_listeners:
+                continue
+            listener = self.book_listeners[accno] = self._listener(accno)
+            book.add_listener(listener)
+            for code, position in list(book.positions.items()):
+                self._set_pin(code, (accno, "position"), position.get("quantity", 0) > 0)
+            for order_no, order in list(book.orders.items()):
+                self._set_pin(order.get("code", ""), (accno, order_no), order.get("unfilled", 0) > 0)
+        metrics.set_gauge("real_subscriptions", lambda: len(self.registered), kind=self.name)
+        metrics.set_gauge("real_subscriptions_idle", lambda: len(self.idle), kind=self.name)
+        self.flush()
+
+    def stop(self):
+        """장부 변경 통지 해제 및 관리 중인 실시간 등록 전체 해지"""
+        for accno, listener in self.book_listeners.items():
+            self.api.account_books[accno].remove_listener(listener)
+        self.book_listeners.clear()
+        self.pins.clear()
+        for screen in self.screens:
+            if self.screen_codes[screen]:
+                self.api.set_real_remove(screen, "ALL")
+                self.screen_codes[screen].clear()
+        self.registered.clear()
+        self.idle.clear()
+        self.pending.clear()
+
+    # 구독
+    def acquire(self, owner, codes):
+        """구독자의 종목 참조 추가"""
+        owned = self.owned.setdefault(owner, set())
+        for code in codes:
+            if code in owned:
+                continue
+            owned.add(code)
+            self.owners.setdefault(code, set()).add(owner)
+            self._need(code)
+
+    def release(self, owner, codes=None):
+        """구독자의 종목 참조 해제 (codes가 없으면 전체)"""
+        owned = self.owned.get(owner, set())
+        for code in list(owned if codes is None else codes):
+            if code not in owned:
+                continue
+            owned.discard(code)
+            holders = self.owners.get(code)
+            if holders:
+                holders.discard(owner)
+                if not holders:
+                    del self.owners[code]
+            self._maybe_idle(code)
+        if not owned:
+            self.owned.pop(owner, None)
+
+    def replace(self, owner, codes):
+        """구독자의 종목 목록 교체 (순위 조회 결과 갱신 등, 바뀐 종목만 등록/해제)"""
+        codes = list(dict.fromkeys(codes))
+        current = self.owned.get(owner, set())
+        self.release(owner, current - set(codes))
+        self.acquire(owner, codes)
+
+    def is_registered(self, code):
+        return code in self.registered
+
+    # 고정 (보유/미체결)
+    def _listener(self, accno):
+        def on_book_update(kind, key, old, new):
+            if kind == "position":
+                self._set_pin(key, (accno, "position"), bool(new) and new.get("quantity", 0) > 0)
+            elif kind == "order" and new:
+                self._set_pin(new.get("code", ""), (accno, key), new.get("unfilled", 0) > 0)
+        return on_book_update
+
+    def _set_pin(self, code, reason, pinned):
+        if not code:
+            return
+        reasons = self.pins.get(code)
+        if pinned:
+            if reasons is None:
+                reasons = self.pins[code] = set()
+            if reason not in reasons:
+                reasons.add(reason)
+                self._need(code)
+        elif reasons and reason in reasons:
+            reasons.discard(reason)
+            if not reasons:
+                del self.pins[code]
+                self._maybe_idle(code)
+
+    # 등록/해지
+    def _need(self, code):
+        if code in self.registered:
+            self.idle.pop(code, None)
+        elif code not in self.pending:
+            self.pending[code] = None
+            self._schedule_flush()
+
+    def _maybe_idle(self, code):
+        if code in self.owners or code in self.pins:
+            return
+        if code in self.registered:
+            self.idle[code] = None
+            self.idle.move_to_end(code)
+        else:
+            self.pending.pop(code, None)
+
+    def _schedule_flush(self):
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            QTimer.singleShot(0, self.flush)
+
+    def flush(self):
+        """대기 종목 일괄 등록 (필요하면 유휴 종목 해지 후 화면번호별 한 번의 SetRealReg)"""
+        self._flush_scheduled = False
+        if not self.pending:
+            return
+        try:
+            overflow = len(self.registered) + len(self.pending) - self.capacity
+            while overflow > 0 and self.idle:
+                code, _ = self.idle.popitem(last=False)
+                screen = self.registered.pop(code)
+                self.screen_codes[screen].discard(code)
+                self.api.set_real_remove(screen, code)
+                metrics.inc("real_subscription_evictions_total", kind=self.name)
+                overflow -= 1
+            if overflow > 0:
+                logger.warning(f"실시간 등록 한도 초과({self.name}): {overflow}종목 대기 ({self.capacity}종목)")
+
+            for screen in self.screens:
+                if not self.pending:
+                    break
+                free = CODES_PER_SCREEN - len(self.screen_codes[screen])
+                if free <= 0:
+                    continue
+                batch = []
+                while self.pending and len(batch) < free:
+                    code, _ = self.pending.popitem(last=False)
+                    batch.append(code)
+                if self.api.set_real_reg(screen, batch, self.fids, "1") < 0:
+                    for code in batch:  # 다음 등록에서 다시 시도
+                        self.pending[code] = None
+                    break
+                self.screen_codes[screen].update(batch)
+                for code in batch:
+                    self.registered[code] = screen
+                metrics.inc("real_subscription_batches_total", kind=self.name)
+        except Exception as e:
+            logger.log_error("REAL_SUBSCRIPTION", str(e))
+
+    def summary(self):
+        """등록 현황"""
+        return {
+            "capacity": self.capacity,
+            "registered": len(self.registered),
+            "idle": len(self.idle),
+            "pending": len(self.pending),
+            "pinned": len(self.pins),
+            "owners": {owner: len(codes) for owner, codes in self.owned.items()},
+        }
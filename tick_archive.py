@@ -0,0 +1,311 @@
+import os
+import mmap
+import time
+import zlib
+import struct
+from datetime import date
+import numpy as np
+from PyQt5.QtCore import QTimer
+from logger import logger
+from config import Config
+
+try:
+    import zstandard
+except ImportError:  # zstandard가 없으면 zlib 사용
+    zstandard = None
+
+MAGIC = b"KWTICK03"
+BLOCK_MAGIC = b"KWBL"
+CODEC_ZLIB, CODEC_ZSTD = 1, 2
+FILE_HEADER = struct.Struct("<8sB7x")  # 매직, 압축 방식
+FOOTER = struct.Struct("<QQ8s")  # 인덱스 위치, 블록 수, 매직
+# 블록 머리말 (블록마다 압축 데이터 앞에 기록, 인덱스 없이도 파일을 훑어 인덱스 복구 가능)
+BLOCK_HEADER = struct.Struct("<4s12sqqIII")  # 매직, 종목코드, 첫/마지막 틱 시각, 압축 크기, 틱 수, CRC32
+
+# 블록 인덱스 (블록마다 한 행, 파일 끝에 저장)
+INDEX_DTYPE = np.dtype([
+    ("code", "S12"),  # 시장별 종목코드 (NXT는 '_NX' 접미사 포함)
+    ("start", "<i8"),  # 첫 틱 시각 (epoch ms)
+    ("end", "<i8"),  # 마지막 틱 시각 (epoch ms)
+    ("offset", "<u8"),  # 파일 내 블록 위치
+    ("length", "<u4"),  # 압축된 블록 크기
+    ("count", "<u4"),  # 틱 수
+])
+
+TICK_DTYPE = np.dtype([
+    ("timestamp", "<i8"),  # 수신 시각 (epoch ms)
+    ("price", "<i8"),
+    ("volume", "<i8"),  # 체결량 (+ 매수체결, - 매도체결)
+])
+
+REAL_TYPE_TRADE = "주식체결"
+FID_PRICE = 10  # 현재가
+FID_VOLUME = 15  # 거래량 (체결 단위, 부호는 매수/매도 체결 구분)
+
+
+# 인코딩 (델타 -> 지그재그 -> 가변 길이 정수)
+def _zigzag(values):
+    return ((values << 1) ^ (values >> 63)).astype(np.uint64)
+
+
+def _unzigzag(values):
+    return (values >> np.uint64(1)).astype(np.int64) ^ -(values & np.uint64(1)).astype(np.int64)
+
+
+def encode_varints(values):
+    """uint64 배열을 LEB128 가변 길이 바이트로 변환 (벡터화)"""
+    values = np.asarray(values, dtype=np.uint64)
+    nbytes = np.ones(len(values), dtype=np.int64)
+    rest = values >> np.uint64(7)
+    while rest.any():
+        nbytes += rest > 0
+        rest >>= np.uint64(7)
+    starts = np.cumsum(nbytes) - nbytes
+    out = np.empty(int(nbytes.sum()), dtype=np.uint8)
+    rest = values.copy()
+    for k in range(int(nbytes.max()) if len(values) else 0):
+        live = nbytes > k
+        more = (nbytes[live] > k + 1).astype(np.uint8) << 7
+        out[starts[live] + k] = (rest[live] & np.uint64(0x7F)).astype(np.uint8) | more
+        rest >>= np.uint64(7)
+    return out
+
+
+def decode_varints(data):
+    """LEB128 가변 길이 바이트를 uint64 배열로 변환 (벡터화)"""
+    data = np.frombuffer(data, dtype=np.uint8) if not isinstance(data, np.ndarray) else data
+    if not len(data):
+        return np.zeros(0, dtype=np.uint64)
+    last = (data & 0x80) == 0
+    ends = np.flatnonzero(last)
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    value_of_byte = np.repeat(np.arange(len(ends)), ends - starts + 1)
+    shift = (np.arange(len(data)) - starts[value_of_byte]) * 7
+    parts = (data & 0x7F).astype(np.uint64) << shift.astype(np.uint64)
+    return np.add.reduceat(parts, starts)
+
+
+def encode_block(timestamps, prices, volumes):
+    """틱 블록 인코딩 (열마다 델타 + 지그재그 + 가변 길이 정수, 열 순서로 연결)"""
+    columns = [np.diff(np.asarray(column, dtype=np.int64), prepend=0) for column in (timestamps, prices, volumes)]
+    return encode_varints(_zigzag(np.concatenate(columns))).tobytes()
+
+
+def decode_block(payload, count):
+    """틱 블록 디코딩 (TICK_DTYPE 구조화 배열)"""
+    deltas = _unzigzag(decode_varints(payload)).reshape(3, count)
+    ticks = np.empty(count, dtype=TICK_DTYPE)
+    ticks["timestamp"], ticks["price"], ticks["volume"] = np.cumsum(deltas, axis=1)
+    return ticks
+
+
+class TickArchiveWriter:
+    """틱 저장 파일 작성 클래스 (종목별로 block_size틱씩 모아 블록 단위 압축 저장, 닫을 때 블록 인덱스 기록)
+
+    블록마다 머리말을 붙여 바로 파일에 내보내므로, 닫지 못하고 종료되어도 기록된 블록은 읽을 수 있습니다.
+    """
+
+    def __init__(self, path, block_size=None, codec=None):
+        self.path = path
+        self.block_size = block_size or Config.TICK_ARCHIVE_BLOCK_SIZE
+        self.codec = codec or (CODEC_ZSTD if zstandard else CODEC_ZLIB)
+        if self.codec == CODEC_ZSTD and zstandard is None:
+            raise ValueError("zstandard 패키지가 설치되어 있지 않습니다.")
+        self._compress = zstandard.ZstdCompressor(level=3).compress if self.codec == CODEC_ZSTD else zlib.compress
+        self.file = open(path, "wb")
+        self.file.write(FILE_HEADER.pack(MAGIC, self.codec))
+        self.buffers = {}  # 종목코드 -> (시각, 가격, 체결량) 목록
+        self.index = []  # 블록 인덱스 행 목록
+        self.ticks = 0
+        self.bytes_written = FILE_HEADER.size
+
+    def append(self, code, timestamp, price, volume):
+        """틱 추가 (종목별 버퍼가 block_size에 도달하면 블록 기록)"""
+        buffer = self.buffers.get(code)
+        if buffer is None:
+            buffer = self.buffers[code] = ([], [], [])
+        buffer[0].append(timestamp)
+        buffer[1].append(price)
+        buffer[2].append(volume)
+        self.ticks += 1
+        if len(buffer[0]) >= self.block_size:
+            self._write_block(code)
+
+    def _write_block(self, code):
+        timestamps, prices, volumes = self.buffers.pop(code)
+        payload = self._compress(encode_block(timestamps, prices, volumes))
+        header = BLOCK_HEADER.pack(
+            BLOCK_MAGIC, code.encode(), timestamps[0], timestamps[-1], len(payload), len(timestamps), zlib.crc32(payload)
+        )
+        offset = self.file.tell() + BLOCK_HEADER.size
+        self.file.write(header + payload)
+        self.file.flush()  # 비정상 종료 시에도 기록된 블록 보존
+        self.bytes_written += len(header) + len(payload)
+        self.index.append((code.encode(), timestamps[0], timestamps[-1], offset, len(payload), len(timestamps)))
+
+    def flush(self):
+        """버퍼에 남은 틱을 모두 블록으로 기록"""
+        for code in list(self.buffers):
+            self._write_block(code)
+        self.file.flush()
+
+    def close(self):
+        """남은 틱 기록 후 블록 인덱스/꼬리말 기록"""
+        if self.file is None:
+            return
+        self.flush()
+        index = np.array(self.index, dtype=INDEX_DTYPE)
+        offset = self.file.tell()
+        self.file.write(index.tobytes())
+        self.file.write(FOOTER.pack(offset, len(index), MAGIC))
+        self.file.close()
+        self.file = None
+
+
+class TickArchive:
+    """틱 저장 파일 읽기 클래스 (mmap 후 블록 인덱스로 요청한 종목/시간 구간의 블록만 해제)
+
+    꼬리말/인덱스가 없으면(기록 중 비정상 종료) 블록 머리말을 처음부터 훑어 인덱스를 다시 만듭니다. (recovered=True)
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self.mm) < FILE_HEADER.size:
+            raise ValueError(f"틱 저장 파일 형식이 아닙니다: {path}")
+        magic, self.codec = FILE_HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"틱 저장 파일 형식이 아닙니다: {path}")
+        if self.codec == CODEC_ZSTD:
+            if zstandard is None:
+                raise ValueError("zstandard 패키지가 설치되어 있지 않습니다.")
+            self._decompress = zstandard.ZstdDecompressor().decompress
+        else:
+            self._decompress = zlib.decompress
+        self.recovered = False
+        self.index = self._read_index()
+        if self.index is None:
+            self.index = self._scan_blocks()
+            self.recovered = True
+            logger.warning(f"틱 저장 파일 인덱스 없음, 블록 머리말로 복구: {path} ({len(self.index)}블록)")
+
+    def _read_index(self):
+        """꼬리말의 블록 인덱스 (없거나 손상되었으면 None)"""
+        size = len(self.mm)
+        if size < FILE_HEADER.size + FOOTER.size:
+            return None
+        offset, count, footer_magic = FOOTER.unpack_from(self.mm, size - FOOTER.size)
+        if footer_magic != MAGIC or offset + count * INDEX_DTYPE.itemsize != size - FOOTER.size:
+            return None
+        return np.frombuffer(self.mm, dtype=INDEX_DTYPE, count=count, offset=offset).copy()
+
+    def _scan_blocks(self):
+        """블록 머리말을 순서대로 읽어 인덱스 생성 (끝이 잘리거나 CRC가 맞지 않는 블록부터 무시)"""
+        rows = []
+        position, size = FILE_HEADER.size, len(self.mm)
+        while position + BLOCK_HEADER.size <= size:
+            magic, code, start, end, length, count, crc = BLOCK_HEADER.unpack_from(self.mm, position)
+            offset = position + BLOCK_HEADER.size
+            if magic != BLOCK_MAGIC or offset + length > size or zlib.crc32(self.mm[offset:offset + length]) != crc:
+                break
+            rows.append((code, start, end, offset, length, count))
+            position = offset + length
+        return np.array(rows, dtype=INDEX_DTYPE)
+
+    def close(self):
+        self.mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def codes(self):
+        """저장된 종목코드 목록"""
+        return sorted(c.decode() for c in np.unique(self.index["code"]))
+
+    def read(self, code, start=None, end=None):
+        """종목의 [start, end] 구간 틱 조회 (epoch ms, TICK_DTYPE 구조화 배열)"""
+        blocks = self.index["code"] == code.encode()
+        if start is not None:
+            blocks &= self.index["end"] >= start
+        if end is not None:
+            blocks &= self.index["start"] <= end
+        parts = []
+        for row in self.index[blocks]:
+            offset, length = int(row["offset"]), int(row["length"])
+            parts.append(decode_block(self._decompress(self.mm[offset:offset + length]), int(row["count"])))
+        if not parts:
+            return np.zeros(0, dtype=TICK_DTYPE)
+        ticks = np.concatenate(parts)
+        if len(parts) > 1:  # 블록은 종목별로 시간 순 기록되지만 안전하게 정렬
+            ticks = ticks[np.argsort(ticks["timestamp"], kind="stable")]
+        if start is not None or end is not None:
+            t = ticks["timestamp"]
+            keep = np.ones(len(ticks), dtype=bool)
+            if start is not None:
+                keep &= t >= start
+            if end is not None:
+                keep &= t <= end
+            ticks = ticks[keep]
+        return ticks
+
+
+class TickRecorder:
+    """실시간 주식체결을 일자별 틱 저장 파일에 기록하는 클래스 (실시간 등록은 다른 기능이 담당)
+
+    flush_interval초마다 블록을 채우지 못한 종목의 버퍼도 파일에 내보내, 비정상 종료 시 손실을 그 구간으로 제한합니다.
+    """
+
+    def __init__(self, kiwoom_api, directory=None, flush_interval=None):
+        self.api = kiwoom_api
+        self.directory = directory or Config.TICK_ARCHIVE_DIR
+        self.flush_interval = flush_interval or Config.TICK_ARCHIVE_FLUSH_INTERVAL
+        self.writer = None
+        self.timer = QTimer()
+        self.timer.timeout.connect(self.flush)
+
+    def start(self):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(self.directory, f"ticks_{date.today():%Y%m%d}_{int(time.time())}.kta")
+            self.writer = TickArchiveWriter(path)
+            self.api.add_real_data_handler(REAL_TYPE_TRADE, self.on_trade)
+            self.timer.start(int(self.flush_interval * 1000))
+            logger.info(f"틱 저장 시작: {path}")
+            return True
+        except Exception as e:
+            logger.log_error("TICK_RECORDER", str(e))
+            return False
+
+    def stop(self):
+        if self.writer is None:
+            return
+        self.timer.stop()
+        self.api.remove_real_data_handler(REAL_TYPE_TRADE, self.on_trade)
+        try:
+            self.writer.close()
+            logger.info(f"틱 저장 종료: {self.writer.ticks}틱, {self.writer.bytes_written:,}바이트")
+        except Exception as e:
+            logger.log_error("TICK_RECORDER", str(e))
+        self.writer = None
+
+    def flush(self):
+        """버퍼에 남은 틱을 블록으로 기록 (주기적으로 호출)"""
+        if self.writer is None:
+            return
+        try:
+            self.writer.flush()
+        except Exception as e:
+            logger.log_error("TICK_RECORDER", str(e))
+
+    def on_trade(self, code, real_type):
+        """주식체결 수신 시 (수신 시각, 현재가, 체결량) 기록"""
+        try:
+            price = abs(int(self.api.ocx.GetCommRealData(code, FID_PRICE).strip()))
+            volume = int(self.api.ocx.GetCommRealData(code, FID_VOLUME).strip())
+        except ValueError:
+            return
+        self.writer.append(code, int(time.time() * 1000), price, volume)
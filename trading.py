@@ -2,16 +2,35 @@ import time
 from PyQt5.QtCore import QEventLoop
 from logger import logger
 from config import Config
+from metrics import metrics, timed
+from quotes import QuoteSnapshot
+from order_queue import OrderQueue
+from venue import VENUE_KRX, venue_code, split_venue
 
 class Trading:
     """거래 기능 클래스"""
     
-    def __init__(self, kiwoom_api):
+    ORDER_RQNAMES = ("매수주문", "매도주문", "주문취소", "주문정정")
+    KW_MAX_CODES = 100  # CommKwRqData 1회 최대 종목 수
+    KW_SCREENS = ("2006", "2007", "2008")  # 복수종목 조회 화면번호 (화면번호마다 동시에 한 건만 요청)
+    RISK_REJECTED = -999  # 주문 전 리스크 검사 거부 결과코드
+    
+    def __init__(self, kiwoom_api, accno=None, strategy="default"):
         self.api = kiwoom_api
+        self.accno = accno or Config.ACCNO
+        self.account_password = Config.get_account_password(self.accno)
+        self.strategy = strategy
+        self.owner = f"{self.accno}:{strategy}"  # 요청 제한 공정 분배 단위
+        self.book = self.api.get_account_book(self.accno)
+        self.risk = self.api.get_risk_engine(self.accno)
+        self.screen_offset = self.api.register_trading(self) * 10
         self.order_event_loop = QEventLoop()
         self.tr_event_loop = QEventLoop()
         self.order_result = {}
         self.tr_data = {}
+        self._inflight = set()  # 응답 대기 중인 TR 요청명
+        self.last_quotes = None  # 마지막 복수종목 시세 스냅샷
+        self.order_queue = OrderQueue(self)  # 일괄 주문 대기열
         
         # 이벤트 핸들러 연결
         self._connect_trading_events()
@@ -27,8 +46,140 @@ class Trading:
         
         # logger.info("거래 이벤트 핸들러 연결 완료")
     
-    def buy_stock(self, code, quantity, price=0, order_type="시장가"):
-        """주식 매수 주문"""
+    def _screen(self, screen_no):
+        """인스턴스별 화면번호 (인스턴스마다 10개씩 분리)"""
+        return f"{int(screen_no) + self.screen_offset:04d}"
+    
+    def _rqname(self, rqname):
+        """인스턴스별 요청명 (다른 계좌/전략의 수신 이벤트와 구분)"""
+        return f"{rqname}|{self.owner}"
+    
+    def _parse_rqname(self, rqname):
+        """수신 요청명에서 기본 요청명 추출 (다른 인스턴스의 요청이면 None)"""
+        base, sep, owner = rqname.partition("|")
+        if sep and owner == self.owner:
+            return base
+        return None
+    
+    def _send_tr(self, rqname, trcode, screen_no, inputs):
+        """TR 요청 전송 (응답은 기다리지 않음, 전송 성공 시 True)"""
+        self.tr_data.pop(trcode, None)
+        self.api.tr_limiter.acquire(self.owner)
+        for key, value in inputs.items():
+            self.api.ocx.SetInputValue(key, value)
+        full_rqname = self._rqname(rqname)
+        metrics.mark(full_rqname)
+        metrics.inc("tr_requests_total", trcode=trcode)
+        result = self.api.ocx.CommRqData(full_rqname, trcode, 0, self._screen(screen_no))
+        if result != 0:
+            metrics.cancel(full_rqname)
+            logger.log_error("COMM_RQ_DATA", f"{trcode} 요청 실패 (에러코드: {result})")
+            return False
+        self._inflight.add(rqname)
+        return True
+    
+    def _send_kw_tr(self, rqname, codes, screen_no):
+        """복수종목 조회 TR 전송 (CommKwRqData, 응답은 기다리지 않음)"""
+        self.api.tr_limiter.acquire(self.owner)
+        full_rqname = self._rqname(rqname)
+        metrics.mark(full_rqname)
+        metrics.inc("tr_requests_total", trcode="OPTKWFID")
+        result = self.api.ocx.CommKwRqData(";".join(codes), 0, len(codes), 0, full_rqname, self._screen(screen_no))
+        if result != 0:
+            metrics.cancel(full_rqname)
+            logger.log_error("COMM_KW_RQ_DATA", f"복수종목 조회 실패 (에러코드: {result})")
+            return False
+        self._inflight.add(rqname)
+        return True
+    
+    def wait_for_responses(self, rqnames, timeout=None, first=False):
+        """전송한 TR의 응답이 모두(first=True면 하나라도) 수신될 때까지 대기 (시간 초과 시 False)"""
+        deadline = time.monotonic() + (timeout or Config.TR_TIMEOUT)
+        pending = all if first else any
+        while pending(rqname in self._inflight for rqname in rqnames):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not self.api.wait_event_loop(self.tr_event_loop, remaining):
+                for rqname in rqnames:
+                    if rqname in self._inflight:
+                        self._inflight.discard(rqname)
+                        metrics.cancel(self._rqname(rqname))
+                        logger.log_error("COMM_RQ_DATA", f"{rqname} 응답 시간 초과")
+                return False
+        return True
+    
+    def _request_tr(self, rqname, trcode, screen_no, inputs):
+        """TR 요청 후 수신 대기"""
+        if self._send_tr(rqname, trcode, screen_no, inputs):
+            self.wait_for_responses([rqname])
+        return self.tr_data.get(trcode, {})
+    
+    def _account_inputs(self):
+        """계좌 조회 TR 공통 입력값"""
+        return {
+            "계좌번호": self.accno,
+            "비밀번호": self.account_password,
+            "비밀번호입력매체구분": "00",
+            "조회구분": "2",  # 조회구분 = 1:합산, 2:개별
+        }
+    
+    def _send_order(self, rqname, screen_no, order_type, code, quantity, price, hoga, org_order_no="", venue=""):
+        """주문 전송 후 접수 결과 대기 (SendOrder 결과코드 반환, 리스크 검사 거부 시 RISK_REJECTED)"""
+        self.order_result = {}
+        reason = self.risk.check(order_type, code, quantity, price, org_order_no)
+        if reason:
+            metrics.inc("risk_rejects_total", order_type=order_type)
+            logger.error(f"{rqname} 리스크 검사 거부 ({code}): {reason}")
+            return self.RISK_REJECTED
+        
+        self.api.order_limiter.acquire(self.owner)
+        metrics.mark(self._rqname(rqname))
+        metrics.inc("orders_total", order_type=order_type)
+        result = self.api.ocx.SendOrder(
+            self._rqname(rqname),
+            self._screen(screen_no),  # 화면번호
+            self.accno,  # 계좌번호
+            order_type,  # 주문타입 (1:신규매수, 2:신규매도, 3:매수취소, 4:매도취소, 5:매수정정, 6:매도정정)
+            venue_code(code, venue),  # 종목코드 (NXT는 '_NX' 접미사)
+            quantity,  # 주문수량
+            price,  # 주문가격
+            hoga,  # 거래구분
+            org_order_no  # 원주문번호
+        )
+        
+        if result == 0:
+            logger.info(f"{rqname} 전송 성공, 결과 대기 중...")
+            if not self.api.wait_event_loop(self.order_event_loop, Config.TR_TIMEOUT):
+                metrics.cancel(self._rqname(rqname))
+                logger.log_error("SEND_ORDER", f"{rqname} 접수 결과 시간 초과")
+            order_no = self.order_result.get("order_no")
+            if order_no and order_type in (1, 2, 5, 6):
+                if org_order_no:  # 정정: 정정 수량만큼 원주문 미체결 감소
+                    original = self.book.orders.get(org_order_no, {})
+                    self.book.update_order(
+                        org_order_no,
+                        unfilled=max(original.get("unfilled", 0) - quantity, 0),
+                        state="정정",
+                    )
+                fields = {}
+                if order_no not in self.book.orders:  # 체결잔고가 먼저 도착했으면 체결 정보 유지
+                    fields = {"unfilled": quantity, "filled": 0, "state": "접수"}
+                self.book.update_order(
+                    order_no,
+                    code=code,
+                    order_type=1 if order_type in (1, 5) else 2,
+                    quantity=quantity,
+                    price=price,
+                    strategy=self.strategy,
+                    org_order_no=org_order_no,
+                    venue=venue or VENUE_KRX,
+                    **fields
+                )
+        else:
+            metrics.cancel(self._rqname(rqname))
+        return result
+    
+    def buy_stock(self, code, quantity, price=0, order_type="시장가", venue=""):
+        """주식 매수 주문 (venue: KRX/NXT, 비어있으면 KRX)"""
         try:
             if not self.api.connected:
                 logger.error("API가 연결되지 않았습니다.")
@@ -46,23 +197,10 @@ class Trading:
                 logger.error(f"지원하지 않는 주문 타입: {order_type}")
                 return False
             
-            # 주문 실행
-            self.order_result = {}
-            result = self.api.ocx.SendOrder(
-                "매수주문",
-                "0101",  # 화면번호
-                Config.ACCNO,  # 계좌번호 : 8105608311
-                1,  # 주문타입 (1:신규매수)
-                code,  # 종목코드
-                quantity,  # 주문수량
-                price,  # 주문가격
-                order_type_code,  # 거래구분
-                ""  # 원주문번호
-            )
+            # 주문 실행 (1:신규매수)
+            result = self._send_order("매수주문", "0101", 1, code, quantity, price, order_type_code, venue=venue)
             
             if result == 0:
-                logger.info("매수 주문 전송 성공, 결과 대기 중...")
-                self.order_event_loop.exec_()
                 if self.order_result.get("order_no"):
                     logger.log_trade("매수", code, quantity, price, quantity * price)
                     return True
@@ -77,8 +215,8 @@ class Trading:
             logger.log_error("BUY_STOCK", str(e))
             return False
     
-    def sell_stock(self, code, quantity, price=0, order_type="시장가"):
-        """주식 매도 주문"""
+    def sell_stock(self, code, quantity, price=0, order_type="시장가", venue=""):
+        """주식 매도 주문 (venue: KRX/NXT, 비어있으면 KRX)"""
         try:
             if not self.api.connected:
                 logger.error("API가 연결되지 않았습니다.")
@@ -97,23 +235,10 @@ class Trading:
                 logger.error(f"지원하지 않는 주문 타입: {order_type}")
                 return False
             
-            # 주문 실행
-            self.order_result = {}
-            result = self.api.ocx.SendOrder(
-                "매도주문",
-                "0102",  # 화면번호
-                Config.ACCNO,  # 계좌번호 : 8105608311
-                2,  # 주문타입 (2:신규매도)
-                code,  # 종목코드
-                quantity,  # 주문수량
-                price,  # 주문가격
-                order_type_code,  # 거래구분
-                ""  # 원주문번호
-            )
+            # 주문 실행 (2:신규매도)
+            result = self._send_order("매도주문", "0102", 2, code, quantity, price, order_type_code, venue=venue)
             
             if result == 0:
-                logger.info("매도 주문 전송 성공, 결과 대기 중...")
-                self.order_event_loop.exec_()
                 if self.order_result.get("order_no"):
                     logger.log_trade("매도", code, quantity, price, quantity * price)
                     return True
@@ -139,23 +264,12 @@ class Trading:
                 logger.info(f"시뮬레이션 모드: 주문 취소 {order_no}")
                 # return True
             
-            # 주문 취소
-            self.order_result = {}
-            result = self.api.ocx.SendOrder(
-                "주문취소",
-                "0103",  # 화면번호
-                Config.ACCNO,  # 계좌번호 : 8105608311
-                3,  # 주문타입 (3:취소주문)
-                code,  # 종목코드
-                quantity,  # 주문수량
-                0,  # 주문가격
-                "1",  # 거래구분
-                order_no  # 원주문번호
-            )
+            # 주문 취소 (3:매수취소, 4:매도취소)
+            order = self.book.orders.get(order_no, {})
+            cancel_type = 4 if order.get("order_type") == 2 else 3
+            result = self._send_order("주문취소", "0103", cancel_type, code, quantity, 0, "1", order_no, order.get("venue", ""))
             
             if result == 0:
-                logger.info(f"주문 취소 요청 전송: {order_no}, 결과 대기 중...")
-                self.order_event_loop.exec_()
                 if self.order_result.get("order_no"):
                     logger.info(f"주문 취소 접수: {self.order_result['order_no']}")
                     return True
@@ -170,6 +284,33 @@ class Trading:
             logger.log_error("CANCEL_ORDER", str(e))
             return False
     
+    def amend_order(self, order_no, code, quantity, price):
+        """주문 정정 (미체결 지정가 주문의 가격 변경, 취소 후 재주문보다 주문 횟수 절약)"""
+        try:
+            if not self.api.connected:
+                logger.error("API가 연결되지 않았습니다.")
+                return False
+            
+            # 주문 정정 (5:매수정정, 6:매도정정)
+            order = self.book.orders.get(order_no, {})
+            amend_type = 6 if order.get("order_type") == 2 else 5
+            result = self._send_order("주문정정", "0104", amend_type, code, quantity, price, "00", order_no, order.get("venue", ""))
+            
+            if result == 0:
+                if self.order_result.get("order_no"):
+                    logger.info(f"주문 정정 접수: {order_no} -> {self.order_result['order_no']} ({price:,}원)")
+                    return True
+                else:
+                    logger.error("주문 정정이 거부되었습니다.")
+                    return False
+            else:
+                logger.log_error("AMEND_ORDER", f"주문 정정 실패 (에러코드: {result})")
+                return False
+                
+        except Exception as e:
+            logger.log_error("AMEND_ORDER", str(e))
+            return False
+    
     def get_stock_price(self, code):
         """현재가 조회"""
         try:
@@ -194,6 +335,40 @@ class Trading:
             logger.log_error("GET_STOCK_PRICE", str(e))
             return 0
     
+    def get_quotes(self, codes):
+        """복수 종목 시세 일괄 조회 (CommKwRqData/OPTKWFID, 100종목 단위로 나누어 요청)"""
+        try:
+            if not self.api.connected:
+                logger.error("API가 연결되지 않았습니다.")
+                return QuoteSnapshot([])
+
+            codes = list(dict.fromkeys(codes))  # 순서 유지 중복 제거
+            self.tr_data["OPTKWFID"] = {}
+            free_screens = list(self.KW_SCREENS)
+            active = {}  # 응답 대기 중인 요청명 -> 화면번호
+            for n, start in enumerate(range(0, len(codes), self.KW_MAX_CODES)):
+                # 화면번호가 모두 사용 중이면 응답이 하나라도 올 때까지 대기 후 화면번호 회수
+                while not free_screens:
+                    self.wait_for_responses(list(active), first=True)
+                    for rqname in [r for r in active if r not in self._inflight]:
+                        free_screens.append(active.pop(rqname))
+                chunk = codes[start:start + self.KW_MAX_CODES]
+                rqname = f"quotes_req_{n}"
+                screen_no = free_screens.pop(0)
+                if self._send_kw_tr(rqname, chunk, screen_no):
+                    active[rqname] = screen_no
+                else:
+                    free_screens.append(screen_no)
+
+            self.wait_for_responses(list(active))
+            rows = [row for chunk_rows in self.tr_data["OPTKWFID"].values() for row in chunk_rows]
+            self.last_quotes = QuoteSnapshot.from_rows(codes, rows)
+            return self.last_quotes
+
+        except Exception as e:
+            logger.log_error("GET_QUOTES", str(e))
+            return QuoteSnapshot([])
+    
     def get_stock_name(self, code):
         """종목명 조회"""
         try:
@@ -201,7 +376,7 @@ class Trading:
                 logger.error("API가 연결되지 않았습니다.")
                 return ""
             
-            name = self.api.get_master_code_name(code)
+            name = self.api.master_cache.get_name(code) or self.api.get_master_code_name(code)
             if name:
                 logger.debug(f"{code} 종목명: {name}")
                 return name
@@ -229,7 +404,8 @@ class Trading:
                 # "방화벽": self.api.get_login_info("FIREW_SECGB"),
                 # "보유계좌목록": self.api.get_login_info("ACCLIST"),
                 # "계좌번호": self.api.get_login_info("ACCNO")
-                "계좌번호": Config.ACCNO
+                "계좌번호": self.accno,
+                "전략": self.strategy
             }
             
             # logger.info("계좌 정보 조회 완료")
@@ -246,14 +422,8 @@ class Trading:
                 logger.error("API가 연결되지 않았습니다.")
                 return 0
 
-            self.tr_data.pop('opw00018', None)
-            self.api.ocx.SetInputValue("계좌번호", Config.ACCNO)
-            self.api.ocx.SetInputValue("비밀번호", Config.ACCNO_PASSWORD)
-            self.api.ocx.SetInputValue("비밀번호입력매체구분", "00")
-            self.api.ocx.SetInputValue("조회구분", "2")
-            self.api.ocx.CommRqData("opw00018_req", "opw00018", 0, "2000")
-            self.tr_event_loop.exec_()
-            return self.tr_data.get('opw00018', {}).get('total_investment', 0)
+            data = self._request_tr("opw00018_req", "opw00018", "2000", self._account_inputs())
+            return data.get('total_investment', 0)
 
         except Exception as e:
             logger.log_error("GET_TOTAL_INVESTMENT", str(e))
@@ -266,14 +436,8 @@ class Trading:
                 logger.error("API가 연결되지 않았습니다.")
                 return 0
 
-            self.tr_data.pop('opw00001', None)
-            self.api.ocx.SetInputValue("계좌번호", Config.ACCNO)
-            self.api.ocx.SetInputValue("비밀번호", Config.ACCNO_PASSWORD)
-            self.api.ocx.SetInputValue("비밀번호입력매체구분", "00")
-            self.api.ocx.SetInputValue("조회구분", "2")
-            self.api.ocx.CommRqData("opw00001_req", "opw00001", 0, "2001")
-            self.tr_event_loop.exec_()
-            return self.tr_data.get('opw00001', {}).get('available_funds', 0)
+            data = self._request_tr("opw00001_req", "opw00001", "2001", self._account_inputs())
+            return data.get('available_funds', 0)
 
         except Exception as e:
             logger.log_error("GET_AVAILABLE_FUNDS", str(e))
@@ -286,19 +450,42 @@ class Trading:
                 logger.error("API가 연결되지 않았습니다.")
                 return []
 
-            self.tr_data.pop('opw00018', None)
-            self.api.ocx.SetInputValue("계좌번호", Config.ACCNO)
-            self.api.ocx.SetInputValue("비밀번호", Config.ACCNO_PASSWORD)
-            self.api.ocx.SetInputValue("비밀번호입력매체구분", "00")
-            self.api.ocx.SetInputValue("조회구분", "2")     # 조회구분 = 1:합산, 2:개별
-            self.api.ocx.CommRqData("opw00018_req", "opw00018", 0, "2002")
-            self.tr_event_loop.exec_()
-            return self.tr_data.get('opw00018', {}).get('holdings', [])
+            data = self._request_tr("opw00018_req", "opw00018", "2002", self._account_inputs())
+            return data.get('holdings', [])
 
         except Exception as e:
             logger.log_error("GET_HOLDINGS", str(e))
             return []
 
+    def request_account_snapshot(self):
+        """계좌 조회 TR(opw00018, opw00001) 동시 전송 (응답은 wait_account_snapshot으로 대기)"""
+        try:
+            if not self.api.connected:
+                logger.error("API가 연결되지 않았습니다.")
+                return False
+
+            sent = self._send_tr("opw00018_req", "opw00018", "2002", self._account_inputs())
+            sent = self._send_tr("opw00001_req", "opw00001", "2001", self._account_inputs()) and sent
+            return sent
+
+        except Exception as e:
+            logger.log_error("REQUEST_ACCOUNT_SNAPSHOT", str(e))
+            return False
+
+    def wait_account_snapshot(self, timeout=None):
+        """계좌 조회 TR 응답 대기 후 총 투자금액/주문 가능 금액/보유 종목 반환"""
+        self.wait_for_responses(["opw00018_req", "opw00001_req"], timeout)
+        return {
+            "total_investment": self.tr_data.get("opw00018", {}).get("total_investment", 0),
+            "available_funds": self.tr_data.get("opw00001", {}).get("available_funds", 0),
+            "holdings": self.tr_data.get("opw00018", {}).get("holdings", []),
+        }
+
+    def get_account_snapshot(self):
+        """계좌 스냅샷 조회 (opw00018 한 번으로 총 투자금액과 보유 종목을 함께 조회)"""
+        self.request_account_snapshot()
+        return self.wait_account_snapshot()
+
     def get_stocks(self):
         """거래량 상위 종목 조회"""
         try:
@@ -316,11 +503,10 @@ class Trading:
             # self.api.ocx.SetInputValue("장운영구분", "0"); # (0:전체조회, 1:장중, 2:장전시간외, 3:장후시간외)
             # self.api.ocx.SetInputValue("거래소구분", "1"); # (1:KRX, 2:NXT, 3:통합, 공백시 KRX 시세조회)
 
-            self.tr_data.pop("OPT10030", None)
-            self.api.ocx.SetInputValue("시장구분", "000")
-            self.api.ocx.CommRqData("volume_rank_req", "OPT10030", 0, "2003")
-            self.tr_event_loop.exec_()
-            return self.tr_data.get("OPT10030", {}).get("stocks", [])
+            data = self._request_tr("volume_rank_req", "OPT10030", "2003", {
+                "시장구분": "000",
+            })
+            return data.get("stocks", [])
 
         except Exception as e:
             logger.log_error("GET_STOCKS", str(e))
@@ -343,25 +529,91 @@ class Trading:
             # self.api.ocx.SetInputValue("가격구분", "0"); # (0:전체조회, 2:5만원이상, 5:1만원이상, 6:5천원이상, 8:1천원이상, 9:10만원이상)
             # self.api.ocx.SetInputValue("거래소구분", "1"); # (1:KRX, 2:NXT, 3:통합, 공백시 KRX 시세조회)
 
-            self.tr_data.pop("OPT10023", None)
-            self.api.ocx.SetInputValue("종목조건", "0")
-            self.api.ocx.SetInputValue("시장구분", "000")
-            self.api.ocx.CommRqData("upsurge_volume_rank_req", "OPT10023", 0, "2004")
-            self.tr_event_loop.exec_()
-            return self.tr_data.get("OPT10023", {}).get("upsurge_stocks", [])
+            data = self._request_tr("upsurge_volume_rank_req", "OPT10023", "2004", {
+                "종목조건": "0",
+                "시장구분": "000",
+            })
+            return data.get("upsurge_stocks", [])
 
         except Exception as e:
             logger.log_error("GET_UPSURGE_STOCKS", str(e))
             return []
 
 
+    def get_open_orders(self):
+        """미체결 주문 조회 (opt10075)"""
+        try:
+            if not self.api.connected:
+                logger.error("API가 연결되지 않았습니다.")
+                return []
+
+            data = self._request_tr("open_orders_req", "opt10075", "2005", {
+                "계좌번호": self.accno,
+                "전체종목구분": "0",  # 0:전체, 1:종목
+                "매매구분": "0",  # 0:전체, 1:매도, 2:매수
+                "종목코드": "",
+                "체결구분": "1",  # 0:전체, 2:체결, 1:미체결
+            })
+            return data.get("orders", [])
+
+        except Exception as e:
+            logger.log_error("GET_OPEN_ORDERS", str(e))
+            return []
+
+    def resync(self):
+        """재연결 후 보유 종목/주문가능금액/미체결 주문 재동기화"""
+        try:
+            self.get_holdings()
+            self.get_available_funds()
+            open_orders = self.get_open_orders()
+            if "opt10075" not in self.tr_data:
+                return False
+
+            # 장부상 미체결이지만 서버에 없는 주문은 연결 끊김 중 체결/취소된 것으로 처리
+            open_order_nos = {o["order_no"] for o in open_orders}
+            for order in self.book.get_open_orders():
+                if order["order_no"] not in open_order_nos:
+                    self.book.update_order(order["order_no"], unfilled=0, state="확인필요")
+            logger.info(f"[{self.accno}] 재동기화 완료: 보유 {len(self.book.get_holdings())}종목, 미체결 {len(open_order_nos)}건")
+            return True
+
+        except Exception as e:
+            logger.log_error("RESYNC", str(e))
+            return False
+
+    @timed("Trading.OnReceiveChejanData", label="gubun")
     def _on_receive_chejan_data(self, gubun, item_cnt, fid_list):
         """체결잔고 데이터 수신"""
         try:
+            # 다른 계좌의 체결잔고는 무시
+            if self.api.ocx.GetChejanData(9201).strip() != self.accno:
+                return
+            
             if gubun == "0":  # 주문체결통보
                 logger.debug("주문체결통보 수신")
+                order_no = self.api.ocx.GetChejanData(9203).strip()
+                if order_no:
+                    self.book.update_order(
+                        order_no,
+                        code=self._chejan_code(),
+                        order_type=2 if self.api.ocx.GetChejanData(907).strip() == "1" else 1,  # 매도수구분 (1:매도, 2:매수)
+                        state=self.api.ocx.GetChejanData(913).strip(),  # 주문상태
+                        quantity=self._chejan_int(900),  # 주문수량
+                        price=self._chejan_int(901),  # 주문가격
+                        unfilled=self._chejan_int(902),  # 미체결수량
+                        filled=self._chejan_int(911),  # 체결량 (누적)
+                        filled_price=self._chejan_int(910),  # 체결가
+                    )
             elif gubun == "1":  # 잔고통보
                 logger.debug("잔고통보 수신")
+                self.book.update_position(
+                    self._chejan_code(),
+                    name=self.api.ocx.GetChejanData(302).strip(),  # 종목명
+                    quantity=self._chejan_int(930),  # 보유수량
+                    purchase_price=self._chejan_int(931),  # 매입단가
+                    current_price=self._chejan_int(10),  # 현재가
+                    realized_pnl=self._chejan_int(990, signed=True),  # 당일실현손익(유가)
+                )
             elif gubun == "3":  # 특이신호
                 logger.debug("특이신호 수신")
             elif gubun == "4":  # 주문체결통보
@@ -370,8 +622,25 @@ class Trading:
         except Exception as e:
             logger.log_error("CHEJAN_DATA", str(e))
     
+    def _chejan_code(self):
+        """체결잔고 종목코드 (앞의 'A'와 시장 접미사 제거)"""
+        code = self.api.ocx.GetChejanData(9001).strip()
+        return split_venue(code[1:] if code.startswith('A') else code)[0]
+    
+    def _chejan_int(self, fid, signed=False):
+        """체결잔고 숫자 항목 조회 (부호 제거 옵션)"""
+        value = self.api.ocx.GetChejanData(fid).strip()
+        try:
+            value = int(value.replace(',', ''))
+        except (ValueError, AttributeError):
+            return 0
+        return value if signed else abs(value)
+    
+    @timed("Trading.OnReceiveMsg", label="trcode")
     def _on_receive_msg(self, screen_no, rqname, trcode, msg):
         """메시지 수신"""
+        if rqname and self._parse_rqname(rqname) is None:
+            return
         try:
             logger.debug(f"거래 메시지: {msg}")
             
@@ -385,10 +654,17 @@ class Trading:
         except Exception as e:
             logger.log_error("RECEIVE_MSG", str(e)) 
 
+    @timed("Trading.OnReceiveTrData", label="trcode")
     def _on_receive_tr_data(self, screen_no, rqname, trcode, recordname, prev_next, data_len, error_code, message, splm_msg):
         """TR 데이터 수신"""
+        base = self._parse_rqname(rqname)
+        if base is None:
+            return
+        self._inflight.discard(base)
+        if base not in self.ORDER_RQNAMES:
+            metrics.elapsed(rqname, "tr_latency_seconds", trcode=trcode)
         try:
-            if rqname == "opw00018_req":
+            if base == "opw00018_req":
                 total = self.api.ocx.GetCommData(trcode, rqname, 0, "총매입금액")
                 try:
                     total = int(total.strip().replace(',', ''))
@@ -399,6 +675,7 @@ class Trading:
                 count = int(self.api.ocx.GetRepeatCnt(trcode, rqname))
                 for i in range(count):
                     code = self.api.ocx.GetCommData(trcode, rqname, i, "종목번호").strip()
+                    code = code[1:] if code.startswith('A') else code  # 체결잔고 종목코드와 통일
                     name = self.api.ocx.GetCommData(trcode, rqname, i, "종목명").strip()
                     qty = self.api.ocx.GetCommData(trcode, rqname, i, "보유수량").strip()
                     prcs = self.api.ocx.GetCommData(trcode, rqname, i, "매입가").strip()
@@ -429,16 +706,18 @@ class Trading:
                     'total_investment': total,
                     'holdings': holdings
                 }
+                self.book.update_holdings(holdings, total)
 
-            elif rqname == "opw00001_req":
+            elif base == "opw00001_req":
                 available = self.api.ocx.GetCommData(trcode, rqname, 0, "주문가능금액")
                 try:
                     available = int(available.strip().replace(',', ''))
                 except (ValueError, AttributeError):
                     available = 0
                 self.tr_data['opw00001'] = {'available_funds': available}
+                self.book.available_funds = available
 
-            elif rqname == "volume_rank_req":
+            elif base == "volume_rank_req":
                 stocks = []
                 count = int(self.api.ocx.GetRepeatCnt(trcode, rqname))
                 for i in range(count):
@@ -471,7 +750,7 @@ class Trading:
 
                 self.tr_data["OPT10030"] = {"stocks": stocks[:20]}
 
-            elif rqname == "upsurge_volume_rank_req":
+            elif base == "upsurge_volume_rank_req":
                 upsurge_stocks = []
                 count = int(self.api.ocx.GetRepeatCnt(trcode, rqname))
                 for i in range(count):
@@ -506,17 +785,62 @@ class Trading:
 
                 self.tr_data["OPT10023"] = {"upsurge_stocks": upsurge_stocks[:20]}
 
+            elif base.startswith("quotes_req_"):
+                quotes = []
+                count = int(self.api.ocx.GetRepeatCnt(trcode, rqname))
+                for i in range(count):
+                    quote = {"code": self.api.ocx.GetCommData(trcode, rqname, i, "종목코드").strip()}
+                    for key, item in (("price", "현재가"), ("change", "전일대비"), ("volume", "거래량"), ("ask", "매도호가"), ("bid", "매수호가")):
+                        try:
+                            quote[key] = int(self.api.ocx.GetCommData(trcode, rqname, i, item).strip().replace(',', ''))
+                        except (ValueError, AttributeError):
+                            quote[key] = 0
+                    # 가격 항목의 부호(+/-)는 등락 표시이므로 제거
+                    for key in ("price", "ask", "bid"):
+                        quote[key] = abs(quote[key])
+                    quotes.append(quote)
+
+                self.tr_data.setdefault("OPTKWFID", {})[base] = quotes
+
+            elif base == "open_orders_req":
+                orders = []
+                count = int(self.api.ocx.GetRepeatCnt(trcode, rqname))
+                for i in range(count):
+                    order_no = self.api.ocx.GetCommData(trcode, rqname, i, "주문번호").strip()
+                    code = self.api.ocx.GetCommData(trcode, rqname, i, "종목코드").strip()
+                    state = self.api.ocx.GetCommData(trcode, rqname, i, "주문상태").strip()
+                    side = self.api.ocx.GetCommData(trcode, rqname, i, "주문구분").strip()  # +매수, -매도 등
+                    values = {}
+                    for key, item in (("quantity", "주문수량"), ("price", "주문가격"), ("unfilled", "미체결수량"), ("filled", "체결량")):
+                        try:
+                            values[key] = int(self.api.ocx.GetCommData(trcode, rqname, i, item).strip().replace(',', ''))
+                        except (ValueError, AttributeError):
+                            values[key] = 0
+
+                    order = self.book.update_order(
+                        order_no,
+                        code=code,
+                        state=state,
+                        order_type=2 if "매도" in side else 1,
+                        **values
+                    )
+                    orders.append(dict(order))
+
+                self.tr_data["opt10075"] = {"orders": orders}
+
         except Exception as e:
             logger.log_error("RECEIVE_TR_DATA", str(e))
         finally:
             self.tr_event_loop.exit()
 
+    @timed("Trading.OnOrderResult", label="rqname")
     def _on_order_result(self, screen_no, rqname, trcode, recordname, prev_next, data_len, error_code, message, splm_msg):
         """주문 처리 결과 수신"""
+        base = self._parse_rqname(rqname)
+        if base not in self.ORDER_RQNAMES:
+            return
+        metrics.elapsed(rqname, "order_latency_seconds", rqname=base)
         try:
-            if rqname not in ("매수주문", "매도주문", "주문취소"):
-                return
-
             order_no = self.api.ocx.GetCommData(trcode, rqname, 0, "주문번호").strip()
             state = self.api.ocx.GetCommData(trcode, rqname, 0, "주문상태").strip()
             qty = self.api.ocx.GetCommData(trcode, rqname, 0, "주문수량").strip()
@@ -0,0 +1,178 @@
+import os
+import re
+from datetime import date
+import numpy as np
+from logger import logger
+from master_cache import run_in_chunks
+
+MARKET_KOSPI, MARKET_KOSDAQ = 0, 1
+PRICE_BANDS = (1000, 2000, 5000, 10000, 50000, 100000)  # 가격대 구간 경계 (price_band: 0 ~ 6)
+_MARGIN_PATTERN = re.compile(r"증거금(\d+)%")
+
+
+class Universe:
+    """종목 속성 인덱스 (하루 한 번 종목 마스터에서 생성, 컬럼별 NumPy 배열로 벡터화 필터링)
+
+    예) 코스피, 관리종목/우선주 제외, 5천원 이상:
+        universe.select(universe.is_kospi & ~universe.is_admin & ~universe.is_preferred & (universe.last_price >= 5000))
+    """
+
+    MARKETS = {"0": MARKET_KOSPI, "10": MARKET_KOSDAQ}
+    ETF_MARKET = "8"
+    ETN_MARKET = "60"
+    BOOL_COLUMNS = ("is_etf", "is_etn", "is_preferred", "is_spac", "is_admin", "is_halted", "is_liquidation", "is_warning")
+    INT_COLUMNS = ("market", "last_price", "listed_shares", "market_cap", "margin_rate", "price_band")
+
+    def __init__(self, path):
+        self.path = path
+        self.date = ""
+        self._set_columns([], {})
+
+    def _set_columns(self, codes, columns):
+        self.codes = np.asarray(codes, dtype="U6")
+        self.index = {code: i for i, code in enumerate(codes)}
+        n = len(codes)
+        for name in self.BOOL_COLUMNS:
+            setattr(self, name, np.asarray(columns.get(name, np.zeros(n)), dtype=bool))
+        for name in self.INT_COLUMNS:
+            setattr(self, name, np.asarray(columns.get(name, np.zeros(n)), dtype=np.int64))
+
+    def __len__(self):
+        return len(self.codes)
+
+    @property
+    def is_kospi(self):
+        return self.market == MARKET_KOSPI
+
+    @property
+    def is_kosdaq(self):
+        return self.market == MARKET_KOSDAQ
+
+    def is_fresh(self):
+        """오늘 생성된 인덱스인지 확인"""
+        return self.date == date.today().isoformat() and len(self.codes) > 0
+
+    # 생성/저장
+    def load(self):
+        """디스크에서 인덱스 로드 (OCX 호출 없음)"""
+        try:
+            if not self.path or not os.path.exists(self.path):
+                return False
+            with np.load(self.path) as data:
+                self.date = str(data["date"])
+                self._set_columns(data["codes"].tolist(), {name: data[name] for name in self.BOOL_COLUMNS + self.INT_COLUMNS})
+            return self.is_fresh()
+        except Exception as e:
+            logger.log_error("UNIVERSE_LOAD", str(e))
+            return False
+
+    def save(self):
+        """인덱스를 디스크에 저장"""
+        try:
+            if not self.path:
+                return
+            tmp_path = self.path + ".tmp.npz"
+            columns = {name: getattr(self, name) for name in self.BOOL_COLUMNS + self.INT_COLUMNS}
+            np.savez(tmp_path, date=self.date, codes=self.codes, **columns)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.log_error("UNIVERSE_SAVE", str(e))
+
+    def refresh(self, kiwoom_api):
+        """OCX 종목 마스터에서 속성을 읽어 인덱스 생성 (종목당 마스터 조회는 하루 한 번)"""
+        for _ in self._refresh_steps(kiwoom_api):
+            pass
+
+    def _refresh_steps(self, kiwoom_api):
+        """인덱스 생성 단계 (종목마다 한 단계, 완료 시 컬럼 교체)"""
+        names = kiwoom_api.master_cache.names
+        etfs = set(c for c in kiwoom_api.get_code_list_by_market(self.ETF_MARKET).split(';') if c)
+        etns = set(c for c in kiwoom_api.get_code_list_by_market(self.ETN_MARKET).split(';') if c)
+
+        codes = []
+        seen = set()
+        rows = {name: [] for name in self.BOOL_COLUMNS + self.INT_COLUMNS}
+        # ETF/ETN은 유가증권시장 상장 (시장별 목록에 없으면 코스피로 추가)
+        markets = list(self.MARKETS.items())
+        markets += [(self.ETF_MARKET, MARKET_KOSPI), (self.ETN_MARKET, MARKET_KOSPI)]
+        for market, market_id in markets:
+            for code in kiwoom_api.get_code_list_by_market(market).split(';'):
+                if not code or code in seen:
+                    continue
+                seen.add(code)
+                name = names.get(code) or kiwoom_api.get_master_code_name(code)
+                state = kiwoom_api.get_master_stock_state(code)
+                construction = kiwoom_api.get_master_construction(code)
+                try:
+                    last_price = abs(int(str(kiwoom_api.get_master_last_price(code)).strip() or 0))
+                except ValueError:
+                    last_price = 0
+                try:
+                    listed_shares = int(kiwoom_api.get_master_listed_stock_cnt(code) or 0)
+                except (TypeError, ValueError):
+                    listed_shares = 0
+                margin = _MARGIN_PATTERN.search(state)
+
+                codes.append(code)
+                rows["market"].append(market_id)
+                rows["is_etf"].append(code in etfs)
+                rows["is_etn"].append(code in etns)
+                rows["is_preferred"].append(code[-1] != "0" and code not in etfs and code not in etns)
+                rows["is_spac"].append("스팩" in name)
+                rows["is_admin"].append("관리종목" in state)
+                rows["is_halted"].append("거래정지" in state)
+                rows["is_liquidation"].append("정리매매" in state)
+                rows["is_warning"].append(construction not in ("", "정상"))
+                rows["last_price"].append(last_price)
+                rows["listed_shares"].append(listed_shares)
+                rows["margin_rate"].append(int(margin.group(1)) if margin else 0)
+                yield
+
+        columns = dict(rows)
+        columns["market_cap"] = np.asarray(rows["last_price"], dtype=np.int64) * np.asarray(rows["listed_shares"], dtype=np.int64)
+        columns["price_band"] = np.searchsorted(PRICE_BANDS, np.asarray(rows["last_price"], dtype=np.int64), side="right")
+        self._set_columns(codes, columns)
+        self.date = date.today().isoformat()
+        self.save()
+        logger.info(f"종목 속성 인덱스 생성: {len(codes)}종목")
+
+    def ensure(self, kiwoom_api):
+        """인덱스가 오늘자가 아니면 생성"""
+        if not self.is_fresh() and not self.load():
+            self.refresh(kiwoom_api)
+
+    def ensure_async(self, kiwoom_api, on_done=None):
+        """인덱스가 오늘자가 아니면 이벤트 루프에서 나누어 생성 (완료 시 on_done 호출)"""
+        if self.is_fresh() or self.load():
+            if on_done:
+                on_done()
+            return
+        run_in_chunks(self._refresh_steps(kiwoom_api), on_done=on_done)
+
+    # 조회
+    def select(self, mask):
+        """조건 배열이 True인 종목코드 목록"""
+        return self.codes[mask].tolist()
+
+    def tradable(self):
+        """일반 매매 가능 종목 조건 (거래정지/정리매매/관리종목 제외)"""
+        return ~(self.is_halted | self.is_liquidation | self.is_admin)
+
+    def mask_of(self, codes):
+        """종목코드 목록에 해당하는 조건 배열 (순위 조회 결과 등과 교차 필터용)"""
+        mask = np.zeros(len(self.codes), dtype=bool)
+        idx = [self.index[c] for c in codes if c in self.index]
+        mask[idx] = True
+        return mask
+
+    def get(self, code):
+        """단일 종목 속성 (없으면 None)"""
+        i = self.index.get(code)
+        if i is None:
+            return None
+        record = {"code": code}
+        for name in self.BOOL_COLUMNS:
+            record[name] = bool(getattr(self, name)[i])
+        for name in self.INT_COLUMNS:
+            record[name] = int(getattr(self, name)[i])
+        return record
@@ -0,0 +1,150 @@
+from datetime import datetime
+from logger import logger
+from metrics import metrics
+
+VENUE_KRX, VENUE_NXT = "KRX", "NXT"
+VENUE_SUFFIX = {VENUE_KRX: "", VENUE_NXT: "_NX"}  # 실시간 등록/주문 종목코드 접미사
+
+# 시장별 거래 시간 (HHMMSS 구간, NXT: 프리마켓, 메인마켓, 애프터마켓)
+VENUE_SESSIONS = {
+    VENUE_KRX: ((90000, 153000),),
+    VENUE_NXT: ((80000, 85000), (90030, 152000), (153000, 200000)),
+}
+
+REAL_TYPE_HOGA = "주식호가잔량"
+
+
+def venue_code(code, venue):
+    """시장별 종목코드 (KRX는 그대로, NXT는 '_NX' 접미사)"""
+    return code + VENUE_SUFFIX.get(venue, "")
+
+
+def split_venue(code):
+    """시장별 종목코드를 (종목코드, 시장)으로 분리"""
+    for venue, suffix in VENUE_SUFFIX.items():
+        if suffix and code.endswith(suffix):
+            return code[:-len(suffix)], venue
+    return code, VENUE_KRX
+
+
+def open_venues(now=None):
+    """현재 거래 가능한 시장 목록"""
+    now = now or datetime.now()
+    hhmmss = now.hour * 10000 + now.minute * 100 + now.second
+    return [venue for venue, sessions in VENUE_SESSIONS.items() if any(start <= hhmmss < end for start, end in sessions)]
+
+
+class ConsolidatedQuote:
+    """종목별 통합 최우선호가 (시장별 최우선호가 중 가장 좋은 가격)"""
+
+    __slots__ = ("code", "tops", "best_ask", "ask_size", "ask_venue", "best_bid", "bid_size", "bid_venue")
+
+    def __init__(self, code):
+        self.code = code
+        self.tops = {}  # 시장 -> (매도호가, 매도잔량, 매수호가, 매수잔량)
+        self.best_ask = self.ask_size = self.best_bid = self.bid_size = 0
+        self.ask_venue = self.bid_venue = ""
+
+    def update(self, venues):
+        """venues 시장의 최우선호가로 통합 호가 재계산 (가격이 같으면 잔량이 많은 시장)"""
+        asks = [(top[0], -top[1], venue) for venue, top in self.tops.items() if venue in venues and top[0]]
+        bids = [(-top[2], -top[3], venue) for venue, top in self.tops.items() if venue in venues and top[2]]
+        if asks:
+            ask, size, self.ask_venue = min(asks)
+            self.best_ask, self.ask_size = ask, -size
+        else:
+            self.best_ask, self.ask_size, self.ask_venue = 0, 0, ""
+        if bids:
+            bid, size, self.bid_venue = min(bids)
+            self.best_bid, self.bid_size = -bid, -size
+        else:
+            self.best_bid, self.bid_size, self.bid_venue = 0, 0, ""
+
+    def to_dict(self):
+        return {
+            "code": self.code,
+            "ask": self.best_ask,
+            "ask_size": self.ask_size,
+            "ask_venue": self.ask_venue,
+            "bid": self.best_bid,
+            "bid_size": self.bid_size,
+            "bid_venue": self.bid_venue,
+            "venues": {venue: dict(zip(("ask", "ask_size", "bid", "bid_size"), top)) for venue, top in self.tops.items()},
+        }
+
+
+class VenueBook:
+    """KRX/NXT 호가 통합 및 시장 선택 주문 클래스
+
+    - 두 시장의 주식호가잔량을 OrderBookStore로 함께 받고, 수신한 종목의 통합 최우선호가만 갱신합니다.
+    - 매수는 매도호가가 낮은 시장, 매도는 매수호가가 높은 시장으로 주문하며 가격이 같으면 잔량이 많은 시장을 선택합니다.
+    - 거래 시간이 아닌 시장은 통합 호가와 주문 대상에서 제외합니다. (NXT 프리/애프터마켓에는 NXT만 사용)
+    """
+
+    def __init__(self, kiwoom_api, venues=(VENUE_KRX, VENUE_NXT)):
+        self.api = kiwoom_api
+        self.venues = tuple(venues)
+        self.quotes = {}  # 종목코드 -> ConsolidatedQuote
+
+    def attach(self):
+        """실시간 데이터 처리기로 등록 (OrderBookStore 갱신 이후 호출됨)"""
+        self.api.add_real_data_handler(REAL_TYPE_HOGA, self.on_real_data)
+
+    def detach(self):
+        self.api.remove_real_data_handler(REAL_TYPE_HOGA, self.on_real_data)
+
+    def subscribe(self, codes):
+        """종목별 전 시장 호가 실시간 등록"""
+        self.api.order_books.subscribe([venue_code(code, venue) for code in codes for venue in self.venues], "venue_book")
+
+    def unsubscribe(self, codes=None):
+        """종목별 전 시장 호가 참조 해제 (codes가 없으면 전체)"""
+        if codes is not None:
+            codes = [venue_code(code, venue) for code in codes for venue in self.venues]
+        self.api.order_books.unsubscribe(codes, "venue_book")
+
+    def on_real_data(self, code, real_type):
+        """주식호가잔량 수신 시 해당 종목 통합 호가 갱신"""
+        base, venue = split_venue(code)
+        if venue not in self.venues:
+            return
+        book = self.api.order_books.get(code)
+        if book is None:
+            return
+        quote = self.quotes.get(base)
+        if quote is None:
+            quote = self.quotes[base] = ConsolidatedQuote(base)
+        levels = book.levels
+        quote.tops[venue] = (int(levels[0, 0]), int(levels[2, 0]), int(levels[1, 0]), int(levels[3, 0]))
+        quote.update(open_venues() or self.venues)
+
+    def best(self, code):
+        """통합 최우선호가 (없으면 None)"""
+        return self.quotes.get(code)
+
+    # 주문
+    def route(self, side, code, now=None):
+        """주문 시장 선택 (매수는 통합 매도호가 시장, 매도는 통합 매수호가 시장)"""
+        venues = [venue for venue in open_venues(now) if venue in self.venues]
+        if not venues:
+            return VENUE_KRX
+        quote = self.quotes.get(code)
+        if quote is None or len(venues) == 1:
+            return venues[0]
+        quote.update(venues)
+        venue = quote.ask_venue if side == "buy" else quote.bid_venue
+        return venue or venues[0]
+
+    def buy(self, trading, code, quantity, price=0, order_type="시장가"):
+        """시장 선택 후 매수 주문"""
+        venue = self.route("buy", code)
+        metrics.inc("venue_orders_total", venue=venue)
+        logger.debug(f"매수 주문 시장: {code} {venue}")
+        return trading.buy_stock(code, quantity, price, order_type, venue=venue)
+
+    def sell(self, trading, code, quantity, price=0, order_type="시장가"):
+        """시장 선택 후 매도 주문"""
+        venue = self.route("sell", code)
+        metrics.inc("venue_orders_total", venue=venue)
+        logger.debug(f"매도 주문 시장: {code} {venue}")
+        return trading.sell_stock(code, quantity, price, order_type, venue=venue)